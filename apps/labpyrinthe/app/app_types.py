@@ -19,3 +19,5 @@ class AppTypes:
     SET_APPTYPE = (
         "SET_APPTYPE"  
     ) #: identifie une information de définition de type d'application
+    # initialisation du jeu :
+    INIT_GAME = "INIT_GAME"  #: [app -> bus] tous les composants sont initialisés
@@ -46,6 +46,7 @@ class AppManager(appcomp.APPComp):
         address=None,
         interface=INTERFACE_CONSOLE,
         guiclass=guicons.GUIConsole,
+        business_process=False,
     ):
         """
         Constructeur :
@@ -59,6 +60,8 @@ class AppManager(appcomp.APPComp):
                         AppManager.INTERFACE_PYGAME (standalone et client)
             guiclass : classe à instancier pour la GUI 
                         (GUIConsole par défaut en mode console)     
+            business_process : exécute le GameManager dans un process dédié
+                        (hors GIL des composants réseau et interface)
         """
         # init superclasse appcomp.APPComp:
         appcomp.APPComp.__init__(self)
@@ -80,6 +83,8 @@ class AppManager(appcomp.APPComp):
             self.interface = interface
         # réseau :
         self.param_address = address
+        # métier :
+        self.business_process = business_process
         # initialisation de l'interface :
         self._init_interface()
         # attente de la GUI :
@@ -92,7 +97,11 @@ class AppManager(appcomp.APPComp):
         """
         while self._wait_GUI:
             # Routage des tâches
+            self._wakeup_event.clear()
             self.handleAPPQueues()
+            # attente bloquante de la prochaine tâche :
+            if self._wait_GUI and not self.has_pending_tasks():
+                self._wakeup_event.wait(AppManager.IDLE_TIMEOUT)
 
     def on_GUI_Ready(self, exobj):
         """
@@ -124,9 +133,10 @@ class AppManager(appcomp.APPComp):
         """
         # appli démarrée
         self.app_started = True
-        # on lance l'initialisation du jeu :
-        task = lambda: self.gameMngr.init_game()
-        self.sendBusinessTask(task)
+        # on lance l'initialisation du jeu (objet d'échange : transmissible à un
+        # GameManager exécuté dans un process dédié) :
+        channel = appcomp.APPComp.BUSINESS_CHANNEL
+        self.set_APP_info(channel, {"info": AppTypes.INIT_GAME})
 
     #-----> Initialisation du réseau
     def _init_network(self, appaddress):
@@ -140,6 +150,10 @@ class AppManager(appcomp.APPComp):
         # cas particulier :
         if self.type_app == AppManager.APP_STANDALONE:
             return
+        # export optionnel des métriques réseau :
+        metrics_path = None
+        metrics_format = None
+        metrics_interval = 10
         if appaddress != None and appaddress != (None, None):
             address = appaddress
         else:
@@ -152,7 +166,9 @@ class AppManager(appcomp.APPComp):
                 path_file = self.game_path + "/tcp_config.txt"
                 net_txt = cio.load_text_file(path_file, splitlines=False)
                 # net_txt de la forme host=&port=
-                list_var_txt = net_txt.split("&")
+                # (+ optionnellement &metrics=chemin&metrics_format=json|prometheus
+                # &metrics_interval=secondes)
+                list_var_txt = net_txt.strip().split("&")
                 for var_txt in list_var_txt:
                     if var_txt.find("=") != -1:
                         splitted_var = var_txt.split("=")
@@ -162,6 +178,12 @@ class AppManager(appcomp.APPComp):
                             host = value
                         elif name == "port":
                             port = int(value)
+                        elif name == "metrics":
+                            metrics_path = value
+                        elif name == "metrics_format":
+                            metrics_format = value
+                        elif name == "metrics_interval":
+                            metrics_interval = float(value)
                 address = (host, port)
             except Exception:
                 pass
@@ -176,6 +198,12 @@ class AppManager(appcomp.APPComp):
         elif self.type_app == AppManager.APP_CLIENT:
             # client :
             self.TCPMngr = ctcp.CustomTCPThreadedClient(address, auto_connect=True)
+        if metrics_path != None:
+            if not os.path.isabs(metrics_path):
+                metrics_path = self.game_path + "/" + metrics_path
+            self.TCPMngr.metrics.start_periodic_export(
+                metrics_path, metrics_interval, metrics_format
+            )
         self.register_child_component(self.TCPMngr)
 
     def allow_new_connections(self, allow):
@@ -189,8 +217,16 @@ class AppManager(appcomp.APPComp):
     #-----> Initialisation du jeu
     def _init_game(self):
         """
-        Instancie le GameManager.
+        Instancie le GameManager (ou l'enregistre pour un process dédié).
         """
+        if self.business_process:
+            self.gameMngr = None
+            self.register_process_component(
+                GameManager,
+                args=(self.type_app, self.game_path),
+                channelname=appcomp.APPComp.BUSINESS_CHANNEL,
+            )
+            return
         self.gameMngr = GameManager(self.type_app, self.game_path)
         self.register_child_component(self.gameMngr)
 
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # imports
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
+from labpyproject.apps.labpyrinthe.bus.commands.compact_codec import CompactCodec
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = ["CommandHelper"]
@@ -128,7 +129,7 @@ class CommandHelper:
     translate_cmd = classmethod(translate_cmd)
 
     #-----> Sérialisation/désérialisation des commandes
-    def format_game_cmd(cls, code_cmd, com_uid, kwargs):
+    def format_game_cmd(cls, code_cmd, com_uid, kwargs, codec=None):
         """
         Formate un message cmd + args lié au jeu
         
@@ -136,6 +137,7 @@ class CommandHelper:
             code_cmd (str): la commande
             com_uid (int): id unique de commande
             **kwargs : dict d'arguments à "applatir"
+            codec (str): None (format texte par défaut) ou CompactCodec.CODEC_NAME
         
         Return:
             str
@@ -143,6 +145,8 @@ class CommandHelper:
         .. note::    
            Devrait être récursif (cf xml en V2)
         """
+        if codec == CompactCodec.CODEC_NAME:
+            return CompactCodec.encode_game_cmd(code_cmd, com_uid, kwargs)
         msg = "gamecmd=" + code_cmd
         msg += "&comuid=" + com_uid
         if kwargs != None:
@@ -188,7 +192,10 @@ class CommandHelper:
         
         Args:
             msg (str): chaine conforme à l'expression régulière LabHelper.REGEXP_GAME 
+                ou message compact (CompactCodec)
         """
+        if CompactCodec.is_compact(msg):
+            return CompactCodec.decode_game_cmd(msg)
         if msg != None and LabHelper.REGEXP_GAME.match(msg):
             listp = msg.split("&")
             kwargs = dict()
@@ -53,6 +53,7 @@ from labpyproject.apps.labpyrinthe.bus.commands.gamble_datas import PseudoAction
 from labpyproject.apps.labpyrinthe.bus.commands.targets import TargetObject
 from labpyproject.apps.labpyrinthe.bus.commands.targets import TargetPath
 from labpyproject.apps.labpyrinthe.bus.commands.targets import TargetPathStep
+from labpyproject.apps.labpyrinthe.bus.commands.cmd_profiler import CommandProfiler
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = ["CommandManager"]
@@ -172,6 +173,8 @@ class CommandManager:
         self._currentgambleid = None
         # enregistrement des commandes invalides : k=gambleid, v=cmd
         self._discardedcmddict = dict()
+        # instrumentation optionnelle (CommandProfiler) :
+        self._profiler = None
 
     #-----> A- Interface publique
     def re_initialise(self):
@@ -214,6 +217,32 @@ class CommandManager:
         """
         self._liste_robots = listrobot
 
+    #-----> Instrumentation
+    def enable_profiling(self, enabled=True):
+        """
+        Active ou désactive l'instrumentation par étapes de compute_cmd_for_autobot.
+        
+        Args:
+            enabled (boolean)
+        
+        Returns:
+            CommandProfiler or None: le profiler actif (mesures conservées jusqu'à
+            sa désactivation)
+        """
+        if enabled and self._profiler == None:
+            self._profiler = CommandProfiler()
+            self._profiler.install(self)
+        elif not enabled and self._profiler != None:
+            self._profiler.uninstall()
+            self._profiler = None
+        return self._profiler
+
+    def get_profiler(self):
+        """
+        Retourne le CommandProfiler actif ou None.
+        """
+        return self._profiler
+
     #-----> Validation / application
     def analyse_cmd_for_robot(self, cmd, robot):
         """
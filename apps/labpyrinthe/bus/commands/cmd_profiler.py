@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation optionnelle du pilotage des robots 
+(CommandManager.compute_cmd_for_autobot).
+
+Le profiler remplace, sur l'instance de CommandManager uniquement et le temps de
+son installation, les méthodes à mesurer par des enveloppes :
+
+* temps (horloge murale) et nombre d'appels des étapes de compute_cmd_for_autobot
+  (CommandProfiler.STAGES, temps inclusifs),
+* nombre d'appels des recherches récursives (CommandProfiler.SEARCHES),
+* succès / échecs du cache de chemins de GambleDataSet (get_TargetPath_in_cache).
+
+Désinstallé (cas par défaut), il n'a aucun coût. Les mesures sont enregistrées
+par coup (un enregistrement par appel à compute_cmd_for_autobot) puis agrégées
+par robot, exportables en JSON ou CSV.
+"""
+# imports
+import time
+import json
+import csv
+import io
+from labpyproject.apps.labpyrinthe.bus.commands.gamble_datas import GambleDataSet
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["CommandProfiler"]
+# classe
+class CommandProfiler:
+    """
+    Profiler par étapes de CommandManager.compute_cmd_for_autobot.
+    """
+
+    # statique :
+    ENTRY_POINT = "compute_cmd_for_autobot"  #: méthode englobant un coup
+    STAGES = [
+        "_update_usefull_sets",
+        "_get_gamble_datas_for_bot",
+        "_add_scores_to_gamble_datas",
+        "_select_new_temp_target",
+        "_evaluate_adjacent_cases",
+        "_schedule_next_gambles",
+        "_search_next_command",
+        "_force_cmd_choice_for_autobot",
+    ]  #: étapes chronométrées
+    SEARCHES = [
+        "_xlook_for_steps",
+        "_search_long_TargetPath",
+        "_search_grenade_combinaisons",
+    ]  #: recherches (récursives) dont on compte les appels
+    CACHE_METHOD = "get_TargetPath_in_cache"  #: accès au cache de chemins du coup
+    CACHE_MISS = "not in cache"  #: valeur retournée par CACHE_METHOD en cas d'échec
+    # méthodes
+    def __init__(self):
+        """
+        Constructeur
+        """
+        # CommandManager instrumenté :
+        self._cmdMngr = None
+        # méthode originale de GambleDataSet :
+        self._orig_cache_method = None
+        # enregistrements par coup :
+        self.records = list()
+        self._current = None
+
+    #-----> Installation
+    def install(self, cmdMngr):
+        """
+        Instrumente l'instance de CommandManager.
+
+        Args:
+            cmdMngr (CommandManager)
+        """
+        if self._cmdMngr != None:
+            self.uninstall()
+        self._cmdMngr = cmdMngr
+        cmdMngr.__dict__[CommandProfiler.ENTRY_POINT] = self._wrap_entry_point(
+            getattr(cmdMngr, CommandProfiler.ENTRY_POINT)
+        )
+        for name in CommandProfiler.STAGES:
+            cmdMngr.__dict__[name] = self._wrap_stage(name, getattr(cmdMngr, name))
+        for name in CommandProfiler.SEARCHES:
+            cmdMngr.__dict__[name] = self._wrap_search(name, getattr(cmdMngr, name))
+        # cache de chemins : méthode de classe (un GambleDataSet par coup)
+        self._orig_cache_method = GambleDataSet.__dict__[CommandProfiler.CACHE_METHOD]
+        setattr(
+            GambleDataSet,
+            CommandProfiler.CACHE_METHOD,
+            self._wrap_cache(self._orig_cache_method),
+        )
+
+    def uninstall(self):
+        """
+        Restaure les méthodes originales.
+        """
+        if self._cmdMngr == None:
+            return
+        names = [CommandProfiler.ENTRY_POINT]
+        names.extend(CommandProfiler.STAGES)
+        names.extend(CommandProfiler.SEARCHES)
+        for name in names:
+            self._cmdMngr.__dict__.pop(name, None)
+        setattr(GambleDataSet, CommandProfiler.CACHE_METHOD, self._orig_cache_method)
+        self._orig_cache_method = None
+        self._cmdMngr = None
+        self._current = None
+
+    def reset(self):
+        """
+        Efface les mesures.
+        """
+        self.records = list()
+        self._current = None
+
+    #-----> Enveloppes
+    def _wrap_entry_point(self, method):
+        profiler = self
+
+        def wrapper(robot, gamblenumber, gamblecount, gambleid):
+            record = profiler._create_record(robot, gamblenumber, gamblecount, gambleid)
+            profiler._current = record
+            t0 = time.perf_counter()
+            try:
+                return method(robot, gamblenumber, gamblecount, gambleid)
+            finally:
+                record["total"] = time.perf_counter() - t0
+                profiler.records.append(record)
+                profiler._current = None
+
+        return wrapper
+
+    def _wrap_stage(self, name, method):
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            record = profiler._current
+            if record == None:
+                return method(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stage = record["stages"][name]
+                stage["time"] += time.perf_counter() - t0
+                stage["calls"] += 1
+
+        return wrapper
+
+    def _wrap_search(self, name, method):
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            record = profiler._current
+            if record != None:
+                record["searches"][name] += 1
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    def _wrap_cache(self, method):
+        profiler = self
+
+        def wrapper(gdSet, key):
+            result = method(gdSet, key)
+            record = profiler._current
+            if record != None:
+                if isinstance(result, str) and result == CommandProfiler.CACHE_MISS:
+                    record["cache"]["misses"] += 1
+                else:
+                    record["cache"]["hits"] += 1
+            return result
+
+        return wrapper
+
+    def _create_record(self, robot, gamblenumber, gamblecount, gambleid):
+        """
+        Crée l'enregistrement d'un coup.
+        """
+        record = {
+            "bot": getattr(robot, "uid", None),
+            "behavior": getattr(robot, "behavior", None),
+            "gambleid": gambleid,
+            "gamblenumber": gamblenumber,
+            "gamblecount": gamblecount,
+            "total": 0,
+            "stages": dict(),
+            "searches": dict(),
+            "cache": {"hits": 0, "misses": 0},
+        }
+        for name in CommandProfiler.STAGES:
+            record["stages"][name] = {"time": 0, "calls": 0}
+        for name in CommandProfiler.SEARCHES:
+            record["searches"][name] = 0
+        return record
+
+    #-----> Agrégation
+    def get_bots_summary(self):
+        """
+        Agrège les enregistrements par robot.
+
+        Returns:
+            dict: {uid: {"gambles":, "total":, "stages":, "searches":, "cache":}}
+        """
+        summary = dict()
+        for record in self.records:
+            botdict = summary.get(record["bot"], None)
+            if botdict == None:
+                botdict = summary[record["bot"]] = {
+                    "behavior": record["behavior"],
+                    "gambles": 0,
+                    "total": 0,
+                    "stages": dict(),
+                    "searches": dict(),
+                    "cache": {"hits": 0, "misses": 0, "hit_rate": None},
+                }
+                for name in CommandProfiler.STAGES:
+                    botdict["stages"][name] = {"time": 0, "calls": 0}
+                for name in CommandProfiler.SEARCHES:
+                    botdict["searches"][name] = 0
+            botdict["gambles"] += 1
+            botdict["total"] += record["total"]
+            for name, stage in record["stages"].items():
+                botdict["stages"][name]["time"] += stage["time"]
+                botdict["stages"][name]["calls"] += stage["calls"]
+            for name, count in record["searches"].items():
+                botdict["searches"][name] += count
+            botdict["cache"]["hits"] += record["cache"]["hits"]
+            botdict["cache"]["misses"] += record["cache"]["misses"]
+        for botdict in summary.values():
+            cache = botdict["cache"]
+            cache["hit_rate"] = CommandProfiler.get_hit_rate(
+                cache["hits"], cache["misses"]
+            )
+        return summary
+
+    def get_hit_rate(cls, hits, misses):
+        """
+        Taux de succès du cache (None si aucun accès).
+        """
+        if hits + misses == 0:
+            return None
+        return hits / (hits + misses)
+
+    get_hit_rate = classmethod(get_hit_rate)
+
+    #-----> Export
+    def to_json(self, indent=None):
+        """
+        Export JSON : enregistrements par coup et synthèse par robot.
+
+        Returns:
+            str
+        """
+        summary = dict()
+        for uid, botdict in self.get_bots_summary().items():
+            summary[str(uid)] = botdict
+        datas = {"gambles": self.records, "bots": summary}
+        return json.dumps(datas, indent=indent)
+
+    def to_csv(self):
+        """
+        Export CSV : une ligne par coup (temps des étapes en secondes, nombre
+        d'appels des recherches, accès au cache).
+
+        Returns:
+            str
+        """
+        header = ["bot", "behavior", "gambleid", "gamblenumber", "gamblecount", "total"]
+        header.extend(CommandProfiler.STAGES)
+        header.extend(CommandProfiler.SEARCHES)
+        header.extend(["cache_hits", "cache_misses"])
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(header)
+        for record in self.records:
+            row = [
+                record["bot"],
+                record["behavior"],
+                record["gambleid"],
+                record["gamblenumber"],
+                record["gamblecount"],
+                record["total"],
+            ]
+            for name in CommandProfiler.STAGES:
+                row.append(record["stages"][name]["time"])
+            for name in CommandProfiler.SEARCHES:
+                row.append(record["searches"][name])
+            row.extend([record["cache"]["hits"], record["cache"]["misses"]])
+            writer.writerow(row)
+        return output.getvalue()
+
+    def save(self, path, fmt="json"):
+        """
+        Enregistre les mesures dans le fichier path.
+
+        Args:
+            path (str)
+            fmt (str): "json" ou "csv"
+        """
+        if fmt == "csv":
+            content = self.to_csv()
+        else:
+            content = self.to_json(indent=2)
+        with open(path, "w", newline="") as f:
+            f.write(content)
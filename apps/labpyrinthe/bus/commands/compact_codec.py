@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Codec compact des commandes de jeu.
+
+Alternative à la sérialisation "clef=valeur&..." de CommandHelper : les valeurs
+sont encodées en jetons typés (types conservés au décodage, pas de regexp), les
+dicts de cases étant encodés en un seul jeton via un schéma de champs typés
+propre à chaque type de case.
+
+Le transport réseau (core.net.custom_TCP) étant textuel (str utf-8), l'encodage
+reste une chaine de caractères. Les jetons sont séparés par
+CompactCodec.TOKEN_SEP, et débutent par un caractère de type :
+
+* ``N``, ``T``, ``F`` : None, True, False
+* ``i<int>`` / ``f<float>`` / ``s<chaine>`` : entier, flottant, chaine
+* ``l<n>`` / ``t<n>`` : liste / tuple, suivi de ses n jetons
+* ``d<n>`` : dict, suivi de n paires de jetons clef, valeur
+* ``c<schema><masque>`` : dict de case, masque hexa de présence des champs du
+  schéma, suivi des valeurs séparées par CompactCodec.FIELD_SEP (dans le même jeton)
+
+Message complet : ``<PREFIX><code><SEP><comuid><SEP><kwargs>``.
+"""
+# imports
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["CompactCodec"]
+# classe
+class CompactCodec:
+    """
+    Helper statique d'encodage / décodage compact des commandes de jeu.
+
+    .. note::
+       Les séparateurs (caractères de contrôle) sont retirés des chaines encodées.
+    """
+
+    CODEC_NAME = "compact1"  #: nom du codec (négociation)
+    PREFIX = "gc1:"  #: marqueur de début de message compact
+    TOKEN_SEP = "\x1f"  #: séparateur de jetons
+    FIELD_SEP = "\x1e"  #: séparateur de champs d'un dict de case
+    NONE_FIELD = "\x1d"  #: valeur None d'un champ de case
+    # types de champs :
+    FIELD_INT = "i"  #: champ entier
+    FIELD_BOOL = "b"  #: champ booléen
+    FIELD_FLOAT = "f"  #: champ flottant
+    FIELD_STR = "s"  #: champ chaine
+    FIELD_ANY = "a"  #: champ scalaire de type variable (jeton typé)
+    # schémas de cases (champs ordonnés et typés) :
+    CASE_FIELDS = [
+        ("x", FIELD_INT),
+        ("y", FIELD_INT),
+        ("type_case", FIELD_STR),
+        ("face", FIELD_ANY),
+        ("visible", FIELD_BOOL),
+    ]  #: champs de Case
+    BONUS_FIELDS = CASE_FIELDS + [("bonus_type", FIELD_STR)]  #: champs de CaseBonus
+    DANGER_FIELDS = CASE_FIELDS + [
+        ("danger_type", FIELD_STR),
+        ("danger_impact", FIELD_INT),
+    ]  #: champs de CaseDanger
+    GRENADE_FIELDS = DANGER_FIELDS + [
+        ("x_start", FIELD_ANY),
+        ("y_start", FIELD_ANY),
+    ]  #: champs de CaseGrenade
+    ROBOT_FIELDS = CASE_FIELDS + [
+        ("alive", FIELD_BOOL),
+        ("uid", FIELD_STR),
+        ("human", FIELD_BOOL),
+        ("number", FIELD_ANY),
+        ("human_number", FIELD_ANY),
+        ("behavior", FIELD_STR),
+        ("vitesse", FIELD_INT),
+        ("current_vitesse", FIELD_INT),
+        ("current_gamble_count", FIELD_INT),
+        ("current_gamble_number", FIELD_INT),
+        ("has_mine", FIELD_BOOL),
+        ("has_grenade", FIELD_BOOL),
+        ("puissance_mine", FIELD_INT),
+        ("puissance_grenade", FIELD_INT),
+        ("portee_grenade", FIELD_INT),
+        ("ambition", FIELD_FLOAT),
+        ("instinct_survie", FIELD_FLOAT),
+        ("aggressivite", FIELD_FLOAT),
+        ("curiosite", FIELD_FLOAT),
+        ("efficacite", FIELD_FLOAT),
+        ("intelligence", FIELD_FLOAT),
+        ("color", FIELD_STR),
+        ("order", FIELD_ANY),
+        ("total_killed_count", FIELD_INT),
+        ("innocent_killed_count", FIELD_INT),
+        ("earned_bonus", FIELD_INT),
+    ]  #: champs de CaseRobot (dict complet ou partiel)
+    SCHEMAS = {
+        "r": ROBOT_FIELDS,
+        "b": BONUS_FIELDS,
+        "d": DANGER_FIELDS,
+        "g": GRENADE_FIELDS,
+    }  #: schémas indexés par identifiant
+    SCHEMAS_BY_TYPECASE = {
+        LabHelper.CASE_ROBOT: "r",
+        LabHelper.CASE_BONUS: "b",
+        LabHelper.CASE_DANGER: "d",
+        LabHelper.CASE_GRENADE: "g",
+    }  #: identifiant de schéma par type de case
+    # index nom de champ -> (rang, type) par schéma :
+    _SCHEMAS_INDEX = {
+        sid: {f[0]: (i, f[1]) for i, f in enumerate(fields)}
+        for sid, fields in SCHEMAS.items()
+    }
+    # cache des listes (nom, convertisseur) par (schéma, masque) :
+    _DECODE_SPECS = dict()
+    # valeurs des jetons constants :
+    _CONST_TOKENS = {"N": None, "T": True, "F": False}
+
+    #-----> Messages
+    def is_compact(cls, msg):
+        """
+        Indique si msg est un message compact
+        """
+        return isinstance(msg, str) and msg.startswith(CompactCodec.PREFIX)
+
+    is_compact = classmethod(is_compact)
+
+    def encode_game_cmd(cls, code_cmd, com_uid, kwargs):
+        """
+        Equivalent compact de CommandHelper.format_game_cmd
+
+        Args:
+            code_cmd (str): la commande
+            com_uid (str): id unique de commande
+            kwargs (dict): arguments (types conservés)
+
+        Returns:
+            str
+        """
+        parts = list()
+        cls._encode_value(str(code_cmd), parts)
+        cls._encode_value(com_uid, parts)
+        if kwargs == None:
+            kwargs = dict()
+        cls._encode_value(kwargs, parts)
+        return CompactCodec.PREFIX + CompactCodec.TOKEN_SEP.join(parts)
+
+    encode_game_cmd = classmethod(encode_game_cmd)
+
+    def decode_game_cmd(cls, msg):
+        """
+        Méthode réciproque de encode_game_cmd
+
+        Returns:
+            tuple: cmd, kwargs ou None, None si le message est invalide
+        """
+        if not cls.is_compact(msg):
+            return None, None
+        tokens = iter(msg[len(CompactCodec.PREFIX) :].split(CompactCodec.TOKEN_SEP))
+        try:
+            cmd = cls._decode_value(tokens)
+            comuid = cls._decode_value(tokens)
+            kwargs = cls._decode_value(tokens)
+        except (ValueError, IndexError, KeyError, StopIteration):
+            return None, None
+        if not isinstance(cmd, str) or not isinstance(kwargs, dict):
+            return None, None
+        kwargs["comuid"] = comuid
+        return cmd, kwargs
+
+    decode_game_cmd = classmethod(decode_game_cmd)
+
+    #-----> Encodage
+    def _encode_value(cls, val, parts):
+        """
+        Ajoute à parts les jetons encodant val
+        """
+        # rq : bool avant int (bool sous classe de int)
+        if val is None:
+            parts.append("N")
+        elif val is True:
+            parts.append("T")
+        elif val is False:
+            parts.append("F")
+        elif isinstance(val, str):
+            parts.append("s" + cls._clean_str(val))
+        elif isinstance(val, int):
+            parts.append("i" + str(val))
+        elif isinstance(val, float):
+            parts.append("f" + repr(val))
+        elif isinstance(val, dict):
+            token = cls._encode_case_dict(val)
+            if token != None:
+                parts.append(token)
+            else:
+                parts.append("d" + str(len(val)))
+                for k, v in val.items():
+                    parts.append("s" + cls._clean_str(str(k)))
+                    cls._encode_value(v, parts)
+        elif isinstance(val, (list, tuple)):
+            if isinstance(val, list):
+                parts.append("l" + str(len(val)))
+            else:
+                parts.append("t" + str(len(val)))
+            for v in val:
+                cls._encode_value(v, parts)
+        else:
+            # objets : représentation texte (comme format_game_cmd)
+            parts.append("s" + cls._clean_str(str(val)))
+
+    _encode_value = classmethod(_encode_value)
+
+    def _encode_case_dict(cls, dictval):
+        """
+        Encode un dict de case en un jeton unique via son schéma, retourne None
+        si le dict n'est pas conforme à un schéma.
+        """
+        sid = cls._get_schema_id(dictval)
+        if sid == None:
+            return None
+        index = CompactCodec._SCHEMAS_INDEX[sid]
+        mask = 0
+        for k in dictval.keys():
+            mask |= 1 << index[k][0]
+        fields = ["c" + sid + format(mask, "x")]
+        for name, ftype in CompactCodec.SCHEMAS[sid]:
+            if name not in dictval:
+                continue
+            val = dictval[name]
+            vtype = type(val)
+            if val is None:
+                fields.append(CompactCodec.NONE_FIELD)
+            elif ftype == CompactCodec.FIELD_INT and vtype is int:
+                fields.append(str(val))
+            elif ftype == CompactCodec.FIELD_STR and vtype is str:
+                fields.append(cls._clean_str(val))
+            elif ftype == CompactCodec.FIELD_BOOL and vtype is bool:
+                fields.append("1" if val else "0")
+            elif ftype == CompactCodec.FIELD_FLOAT and vtype in (int, float):
+                fields.append(repr(float(val)))
+            elif ftype == CompactCodec.FIELD_ANY and vtype in (str, int, float):
+                if vtype is str:
+                    fields.append("s" + cls._clean_str(val))
+                elif vtype is int:
+                    fields.append("i" + str(val))
+                else:
+                    fields.append("f" + repr(val))
+            else:
+                # type inattendu : encodage générique
+                return None
+        return CompactCodec.FIELD_SEP.join(fields)
+
+    _encode_case_dict = classmethod(_encode_case_dict)
+
+    def _get_schema_id(cls, dictval):
+        """
+        Retourne l'identifiant de schéma applicable à un dict de case ou None
+        """
+        if "type_case" in dictval.keys():
+            tc = dictval["type_case"]
+            if tc not in CompactCodec.SCHEMAS_BY_TYPECASE.keys():
+                return None
+            sid = CompactCodec.SCHEMAS_BY_TYPECASE[tc]
+        elif "uid" in dictval.keys():
+            # dict partiel de robot (CaseRobot.get_properties_dict(full=False))
+            sid = "r"
+        else:
+            return None
+        index = CompactCodec._SCHEMAS_INDEX[sid]
+        for k in dictval.keys():
+            if k not in index:
+                return None
+        return sid
+
+    _get_schema_id = classmethod(_get_schema_id)
+
+    def _clean_str(cls, chaine):
+        """
+        Retire les séparateurs d'une chaine
+        """
+        if chaine.isprintable():
+            return chaine
+        for c in (
+            CompactCodec.TOKEN_SEP,
+            CompactCodec.FIELD_SEP,
+            CompactCodec.NONE_FIELD,
+        ):
+            chaine = chaine.replace(c, "")
+        return chaine
+
+    _clean_str = classmethod(_clean_str)
+
+    #-----> Décodage
+    def _decode_value(cls, tokens):
+        """
+        Décode la valeur débutant au prochain jeton de l'itérateur tokens
+        """
+        tok = next(tokens)
+        tag = tok[0]
+        if tag == "s":
+            return tok[1:]
+        elif tag == "i":
+            return int(tok[1:])
+        elif tag in CompactCodec._CONST_TOKENS:
+            return CompactCodec._CONST_TOKENS[tag]
+        elif tag == "c":
+            return cls._decode_case_dict(tok)
+        elif tag == "f":
+            return float(tok[1:])
+        elif tag == "d":
+            dictval = dict()
+            for i in range(int(tok[1:])):
+                k = next(tokens)[1:]
+                dictval[k] = cls._decode_value(tokens)
+            return dictval
+        elif tag == "l":
+            return [cls._decode_value(tokens) for i in range(int(tok[1:]))]
+        elif tag == "t":
+            return tuple([cls._decode_value(tokens) for i in range(int(tok[1:]))])
+        raise ValueError("unknown tag " + tag)
+
+    _decode_value = classmethod(_decode_value)
+
+    def _decode_case_dict(cls, tok):
+        """
+        Décode un jeton de dict de case
+        """
+        values = tok.split(CompactCodec.FIELD_SEP)
+        head = values.pop(0)
+        spec = cls._get_decode_spec(head[1], int(head[2:], 16))
+        if len(spec) != len(values):
+            raise ValueError("invalid case token")
+        nonefield = CompactCodec.NONE_FIELD
+        return {
+            name: (None if v == nonefield else conv(v))
+            for (name, conv), v in zip(spec, values)
+        }
+
+    _decode_case_dict = classmethod(_decode_case_dict)
+
+    def _get_decode_spec(cls, sid, mask):
+        """
+        Retourne (en cache) la liste de (nom, convertisseur) des champs présents
+        pour le schéma sid et le masque mask.
+        """
+        key = (sid, mask)
+        if key not in CompactCodec._DECODE_SPECS:
+            convdict = {
+                CompactCodec.FIELD_INT: int,
+                CompactCodec.FIELD_BOOL: "1".__eq__,
+                CompactCodec.FIELD_FLOAT: float,
+                CompactCodec.FIELD_STR: str,
+                CompactCodec.FIELD_ANY: cls._decode_scalar,
+            }
+            spec = list()
+            i = 0
+            for name, ftype in CompactCodec.SCHEMAS[sid]:
+                if mask & (1 << i):
+                    spec.append((name, convdict[ftype]))
+                i += 1
+            CompactCodec._DECODE_SPECS[key] = spec
+        return CompactCodec._DECODE_SPECS[key]
+
+    _get_decode_spec = classmethod(_get_decode_spec)
+
+    def _decode_scalar(cls, tok):
+        """
+        Décode un jeton scalaire (champ de type FIELD_ANY)
+        """
+        return cls._decode_value(iter([tok]))
+
+    _decode_scalar = classmethod(_decode_scalar)
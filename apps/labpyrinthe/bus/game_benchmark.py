@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Banc de mesure** de bout en bout de la boucle de jeu (`GameManager.game_loop`).
+
+Un **HeadlessGameManager** (standalone, mode démo) joue des parties entre bots
+sans GUI ni composant réseau :
+
+* les envois réseau (`sendNetworkContent`, `fire_game_event`) sont neutralisés
+  et dénombrés,
+* les ordres d'affichage suivis (publication / mise à jour de carte, animations)
+  sont confirmés immédiatement comme le ferait une GUI instantanée,
+* les animations sont jouées en résolution pixel (pas de temporisation).
+
+Les parties s'enchainent (nouvelle carte à chaque fin de partie) jusqu'à atteindre
+le nombre de coups demandé, pour une difficulté (`GameConfiguration`), des
+dimensions de carte et un nombre de bots donnés.
+
+**Mesures :**
+
+* débit (coups par seconde)
+* durée d'un coup (p50, p99, moyenne, max en ms), globale et par fenêtre de coups
+  successifs afin de repérer la dérive des temps de coups en fin de partie
+* mémoire : nombre d'objets suivis par le gc, pic RSS (Unix) et, optionnellement,
+  mémoire allouée (tracemalloc, ralentit sensiblement l'exécution)
+* optionnellement, synthèse par robot du CommandProfiler
+
+.. admonition:: Exemple
+
+   ::
+
+      python -m labpyproject.apps.labpyrinthe.bus.game_benchmark -d 3 -W 26 -H 26 -g 5000 -o bench.json
+"""
+# imports
+import sys
+import gc
+import time
+import json
+import platform
+import argparse
+import tracemalloc
+import labpyproject.core.random.custom_random as cr
+from labpyproject.apps.labpyrinthe.app.app_types import AppTypes
+from labpyproject.apps.labpyrinthe.bus.game_manager import GameManager
+from labpyproject.apps.labpyrinthe.bus.helpers.game_configuration import (
+    GameConfiguration,
+)
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
+
+try:
+    import resource
+except ImportError:
+    # plateforme non Unix
+    resource = None
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["HeadlessGameManager", "GameBenchmark"]
+# classes
+#-----> GameManager sans GUI ni réseau
+class HeadlessGameManager(GameManager):
+    """
+    GameManager standalone dont les sorties GUI et réseau sont neutralisées.
+    """
+
+    def __init__(self, width=None, height=None, bots=None):
+        """
+        Constructeur
+
+        Args:
+            width (int): largeur de carte imposée ou None (tirée par la difficulté)
+            height (int): hauteur de carte imposée ou None
+            bots (int): nombre de bots imposé ou None
+        """
+        GameManager.__init__(self, AppTypes.APP_STANDALONE, None)
+        # surcharges de configuration :
+        self.forced_width = width
+        self.forced_height = height
+        self.forced_bots = bots
+        # ordres d'affichage en attente de confirmation :
+        self._pending_gui_orders = list()
+        # dénombrement des envois neutralisés :
+        self.gui_cmd_count = 0
+        self.net_event_count = 0
+
+    #-----> Sorties neutralisées
+    def sendGuiCmd(self, exobj):
+        """
+        Pas de GUI : les ordres d'affichage suivis sont mis en attente de
+        confirmation (voir flush_gui_orders).
+        """
+        self.gui_cmd_count += 1
+        if exobj.dictargs.get("gui_order", None) != None:
+            self._pending_gui_orders.append(exobj.dictargs)
+
+    def sendNetworkContent(self, msg, confirmrecept, uid=None):
+        """
+        Pas de réseau.
+        """
+        self.net_event_count += 1
+
+    def fire_game_event(self, code, dictargs=None, uid=None, suffix=""):
+        """
+        Pas de réseau (évite la sérialisation des commandes).
+        """
+        self.net_event_count += 1
+
+    def flush_gui_orders(self):
+        """
+        Confirme les ordres d'affichage suivis en attente (y compris ceux émis
+        par les callbacks appliqués).
+
+        Returns:
+            int: nombre d'ordres confirmés
+        """
+        count = 0
+        while len(self._pending_gui_orders) > 0:
+            dictargs = self._pending_gui_orders.pop(0)
+            self.on_content_published(dictargs)
+            count += 1
+        return count
+
+    #-----> Création de partie
+    def _configure_partie(self, gamedict):
+        """
+        Configure le niveau puis applique les surcharges de dimensions et de
+        nombre de bots.
+        """
+        GameManager._configure_partie(self, gamedict)
+        GameConfiguration.override_partie(
+            width=self.forced_width, height=self.forced_height, bots=self.forced_bots
+        )
+
+    def create_partie(self, difficulty):
+        """
+        Crée et démarre une partie de démo (sans choix utilisateur).
+
+        Args:
+            difficulty (int): niveau entre 1 et 3
+        """
+        self.clean_delayed_actions(True)
+        self._pending_gui_orders = list()
+        self.re_initialise()
+        self.on_game_choice_made(
+            {"indice": difficulty, "mode": GameManager.GAME_MODE_DEMO}
+        )
+        self._define_game(None)
+        # publication initiale => démarrage de la partie
+        self.flush_gui_orders()
+
+
+#-----> Banc de mesure
+class GameBenchmark:
+    """
+    Orchestration des parties de mesure et export JSON des résultats.
+    """
+
+    # statique :
+    DEFAULT_GAMBLES = 2000  #: nombre de coups mesurés par défaut
+    DEFAULT_WINDOW = 250  #: nombre de coups par fenêtre de statistiques
+    DEFAULT_SAMPLE_EVERY = 100  #: périodicité des échantillons mémoire (en coups)
+    MAX_LOOPS_PER_GAMBLE = 10000  #: itérations de game_loop max par coup
+    # méthodes
+    def __init__(
+        self,
+        difficulty=1,
+        width=None,
+        height=None,
+        bots=None,
+        gambles=DEFAULT_GAMBLES,
+        window=DEFAULT_WINDOW,
+        sample_every=DEFAULT_SAMPLE_EVERY,
+        trace_memory=False,
+        profile_cmds=False,
+        seed=0,
+    ):
+        """
+        Constructeur
+
+        Args:
+            difficulty (int): niveau GameConfiguration entre 1 et 3
+            width (int): largeur des cartes ou None (tirée par la difficulté)
+            height (int): hauteur des cartes ou None (tirée par la difficulté)
+            bots (int): nombre de bots ou None (défini par la difficulté)
+            gambles (int): nombre total de coups à jouer
+            window (int): nombre de coups par fenêtre de statistiques
+            sample_every (int): périodicité des échantillons mémoire (en coups)
+            trace_memory (bool): active tracemalloc
+            profile_cmds (bool): active le CommandProfiler
+            seed (int): graine des tirages (partie n : seed + n)
+        """
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.bots = bots
+        self.gambles = max(1, int(gambles))
+        self.window = max(1, int(window))
+        self.sample_every = max(1, int(sample_every))
+        self.trace_memory = trace_memory
+        self.profile_cmds = profile_cmds
+        self.seed = seed
+        # résultats :
+        self.durations = list()
+        self.parties = list()
+        self.memory_samples = list()
+        self.elapsed = 0
+        self.gameMngr = None
+        self.cmd_profile = None
+
+    #-----> Séquence globale
+    def run(self):
+        """
+        Joue les parties jusqu'à atteindre le nombre de coups demandé et retourne
+        le dict de résultats.
+
+        Returns:
+            dict: {"meta":dict, "results":dict}
+        """
+        # animations sans temporisation :
+        resolution = LabHelper.ANIMATION_RESOLUTION
+        LabHelper.ANIMATION_RESOLUTION = LabHelper.ANIMATION_RESOLUTION_PIXEL
+        if self.trace_memory:
+            tracemalloc.start()
+        try:
+            self.gameMngr = HeadlessGameManager(
+                width=self.width, height=self.height, bots=self.bots
+            )
+            if self.profile_cmds:
+                self.gameMngr.labMngr.enable_cmd_profiling(True)
+            gc.collect()
+            self._sample_memory()
+            t0 = time.perf_counter()
+            numpartie = 0
+            while len(self.durations) < self.gambles:
+                cr.CustomRandom.seed(self.seed + numpartie)
+                self._play_partie(numpartie)
+                numpartie += 1
+            self.elapsed = time.perf_counter() - t0
+            self._sample_memory()
+            if self.profile_cmds:
+                profiler = self.gameMngr.labMngr.enable_cmd_profiling(True)
+                self.cmd_profile = profiler.get_bots_summary()
+                self.gameMngr.labMngr.enable_cmd_profiling(False)
+        finally:
+            cr.CustomRandom.seed(None)
+            LabHelper.ANIMATION_RESOLUTION = resolution
+            if self.trace_memory:
+                tracemalloc.stop()
+        return self.get_report()
+
+    def _play_partie(self, numpartie):
+        """
+        Crée une partie et joue ses coups (jusqu'à la fin de partie ou au nombre
+        de coups demandé).
+        """
+        gm = self.gameMngr
+        t0 = time.perf_counter()
+        gm.create_partie(self.difficulty)
+        w, h = gm.labMngr.get_dimensions()
+        partiedict = {
+            "partie": numpartie,
+            "w": w,
+            "h": h,
+            "bots": len(gm.playerlist),
+            "creation_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "gambles": 0,
+            "ended": False,
+        }
+        self.parties.append(partiedict)
+        while gm.partie_started and len(self.durations) < self.gambles:
+            gamblenumber = gm.gamblenumber
+            loops = 0
+            t0 = time.perf_counter()
+            while gm.partie_started and gm.gamblenumber == gamblenumber:
+                gm.game_loop()
+                gm.flush_gui_orders()
+                loops += 1
+                if loops > GameBenchmark.MAX_LOOPS_PER_GAMBLE:
+                    msg = "Coup " + str(gamblenumber) + " bloqué"
+                    raise RuntimeError(msg + " (partie " + str(numpartie) + ")")
+            self.durations.append(time.perf_counter() - t0)
+            partiedict["gambles"] += 1
+            if len(self.durations) % self.sample_every == 0:
+                self._sample_memory()
+        partiedict["ended"] = not gm.partie_started
+        gm.stop_game_loop()
+
+    def _sample_memory(self):
+        """
+        Echantillon mémoire courant.
+        """
+        sample = {
+            "gamble": len(self.durations),
+            "gc_objects": len(gc.get_objects()),
+            "maxrss_kb": None,
+            "traced_kb": None,
+        }
+        if resource != None:
+            sample["maxrss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if self.trace_memory:
+            sample["traced_kb"] = round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+        self.memory_samples.append(sample)
+
+    #-----> Rapport
+    def get_report(self):
+        """
+        Retourne le dict exporté en JSON.
+
+        Returns:
+            dict: {"meta":dict, "results":dict}
+        """
+        meta = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "difficulty": self.difficulty,
+            "width": self.width,
+            "height": self.height,
+            "bots": self.bots,
+            "gambles": self.gambles,
+            "window": self.window,
+            "trace_memory": self.trace_memory,
+            "seed": self.seed,
+        }
+        gambles_per_s = None
+        if self.elapsed > 0:
+            gambles_per_s = round(len(self.durations) / self.elapsed, 2)
+        windows = list()
+        i = 0
+        while i < len(self.durations):
+            chunk = self.durations[i : i + self.window]
+            windowdict = {"from": i, "to": i + len(chunk)}
+            windowdict.update(GameBenchmark._get_duration_stats(sorted(chunk)))
+            windows.append(windowdict)
+            i += self.window
+        memory = {"samples": self.memory_samples, "growth": None}
+        if len(self.memory_samples) > 1:
+            first, last = self.memory_samples[0], self.memory_samples[-1]
+            memory["growth"] = {
+                "gc_objects": last["gc_objects"] - first["gc_objects"],
+                "maxrss_kb": None,
+                "traced_kb": None,
+            }
+            for key in ["maxrss_kb", "traced_kb"]:
+                if last[key] != None:
+                    memory["growth"][key] = round(last[key] - first[key], 1)
+        results = {
+            "elapsed_s": round(self.elapsed, 3),
+            "gambles_played": len(self.durations),
+            "gambles_per_s": gambles_per_s,
+            "gamble_ms": GameBenchmark._get_duration_stats(sorted(self.durations)),
+            "windows": windows,
+            "parties": self.parties,
+            "memory": memory,
+            "cmd_profile": self.cmd_profile,
+        }
+        return {"meta": meta, "results": results}
+
+    def save(self, path):
+        """
+        Sauvegarde le rapport au format JSON.
+
+        Args:
+            path (str): chemin du fichier
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_report(), f, indent=2)
+
+    def _get_duration_stats(cls, durations):
+        """
+        Statistiques en ms à partir d'une liste triée de durées en s.
+        """
+        if len(durations) == 0:
+            return {"p50": None, "p99": None, "mean": None, "max": None}
+        return {
+            "p50": round(cls.get_percentile(durations, 50) * 1000, 3),
+            "p99": round(cls.get_percentile(durations, 99) * 1000, 3),
+            "mean": round(sum(durations) * 1000 / len(durations), 3),
+            "max": round(durations[-1] * 1000, 3),
+        }
+
+    _get_duration_stats = classmethod(_get_duration_stats)
+
+    def get_percentile(cls, sortedvalues, percent):
+        """
+        Percentile (rang le plus proche) d'une liste triée non vide.
+
+        Args:
+            sortedvalues (list): valeurs triées
+            percent (float): entre 0 et 100
+        """
+        rank = int(round(percent / 100 * (len(sortedvalues) - 1)))
+        return sortedvalues[max(0, min(rank, len(sortedvalues) - 1))]
+
+    get_percentile = classmethod(get_percentile)
+
+
+# script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la boucle de jeu")
+    parser.add_argument("-d", "--difficulty", type=int, choices=[1, 2, 3], default=1)
+    parser.add_argument("-W", "--width", type=int, default=None)
+    parser.add_argument("-H", "--height", type=int, default=None)
+    parser.add_argument("-b", "--bots", type=int, default=None)
+    parser.add_argument(
+        "-g", "--gambles", type=int, default=GameBenchmark.DEFAULT_GAMBLES
+    )
+    parser.add_argument(
+        "-w", "--window", type=int, default=GameBenchmark.DEFAULT_WINDOW
+    )
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--profile-cmds", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="game_benchmark.json")
+    args = parser.parse_args()
+    bench = GameBenchmark(
+        difficulty=args.difficulty,
+        width=args.width,
+        height=args.height,
+        bots=args.bots,
+        gambles=args.gambles,
+        window=args.window,
+        trace_memory=args.trace_memory,
+        profile_cmds=args.profile_cmds,
+        seed=args.seed,
+    )
+    report = bench.run()
+    bench.save(args.output)
+    results = report["results"]
+    print(
+        results["gambles_played"],
+        "coups en",
+        results["elapsed_s"],
+        "s :",
+        results["gambles_per_s"],
+        "coups/s",
+        results["gamble_ms"],
+    )
+    for windowdict in results["windows"]:
+        print(windowdict)
+    print("mémoire :", results["memory"]["growth"])
+    sys.exit(0)
@@ -21,6 +21,7 @@ from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseRobot
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseBonus
 from labpyproject.apps.labpyrinthe.bus.model.player import LabPlayer
 from labpyproject.apps.labpyrinthe.bus.commands.cmd_helper import CommandHelper
+from labpyproject.apps.labpyrinthe.bus.commands.compact_codec import CompactCodec
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = ["GameManager"]
@@ -108,6 +109,7 @@ class GameManager(appcomp.BUSINESSComp):
     SHOW_MESSAGE = "SHOW_MESSAGE"  #: [svr-> clt] affichage d'un message
     ENTER_CMD = "ENTER_CMD"  #: [svr-> clt] demande une action de jeu
     BUILD_LAB = "BUILD_LAB"  #: [svr-> clt] publication intégrale de la carte
+    UPDATE_LAB_DELTA = "UPDATE_LAB_DELTA"  #: [svr-> clt] resynchro partielle de la carte (delta depuis la dernière version validée)
     UPDATE_XTRAS = "UPDATE_XTRAS"  #: [svr-> clt] mise à jour mines et bonus
     UPDATE_BOTS = "UPDATE_BOTS"  #: [svr-> clt] mise à jour des joueurs
     REORDER_BOTS = "REORDER_BOTS"  #: [svr-> clt] modification de l'ordre des joueurs
@@ -132,6 +134,19 @@ class GameManager(appcomp.BUSINESSComp):
     ) #: [clt -> svr] efface les actions empilées (non implémenté)
     CHECK_CHANGELOG_KEY = "CHECK_CHANGELOG_KEY"  #: [clt -> svr] retourne la clef de vérification de synchro de la carte
     BUILD_LAB_DONE = "BUILD_LAB_DONE"  #: [clt -> svr] indique que la publication de la carte est achevée
+    SET_CODEC = "SET_CODEC"  #: [clt -> svr] annonce le codec compact supporté par le client
+    # codes de commande encodés via le codec compact (si négocié avec le client)
+    COMPACT_CODEC_CODES = [
+        BUILD_LAB,
+        UPDATE_LAB_DELTA,
+        UPDATE_XTRAS,
+        UPDATE_BOTS,
+        REORDER_BOTS,
+        PLAY_CMD,
+        UPDATE_GAMBLE_CONTEXT,
+    ]  #: [svr] codes commandes sérialisés via CompactCodec pour les clients compatibles
+    # nombre de changelogs conservés par le serveur pour les resynchros par delta
+    CHANGELOG_HISTORY_SIZE = 10  #: [svr] profondeur de l'historique de changelogs (au delà : BUILD_LAB)
     # codes de commande à envoyer sans accusé de réception
     UNCONFIRMED_CODES = [SHOW_MESSAGE]  #: code de commande sans accusé de réception
     # Interractions BUS / GUI :
@@ -193,6 +208,8 @@ class GameManager(appcomp.BUSINESSComp):
             self.uid = "lpsvr"
         # list d'uid de requêtes :
         self.requestuidlist = list()
+        # codecs négociés par client (uid -> nom de codec) :
+        self._clients_codec = dict()
         # Manager principal du jeu?
         if self.type_app == AppTypes.APP_CLIENT:
             self.master = False
@@ -248,6 +265,8 @@ class GameManager(appcomp.BUSINESSComp):
         self._wait_start_time = 0
         # - clef de synchro
         self._gamble_key = None
+        # - historique des coords modifiées par version de carte (resynchro par delta)
+        self._changelogs_history = dict()
         # - tour de jeu
         self.gamble_start_time = None
         self.current_player_indice = None
@@ -291,6 +310,20 @@ class GameManager(appcomp.BUSINESSComp):
             elif self.check_creation:
                 # process de création de partie (sync clients)
                 self.manage_creation_loop()
+        # boucles de jeu ou de création : travail périodique (hors réception de
+        # tâches, voir ThreadableComp.set_periodic_tempo)
+        self._update_periodic_tempo()
+
+    def _update_periodic_tempo(self):
+        """
+        Active le travail périodique du thread tant que les boucles de jeu ou de
+        création doivent avancer sans tâche entrante.
+        """
+        tempo = None
+        if self.master and (self.partie_started or self.check_creation):
+            tempo = appcomp.ThreadableComp.THREAD_TEMPO
+        if tempo != self._periodic_tempo:
+            self.set_periodic_tempo(tempo)
 
     def is_master(self):
         """
@@ -299,6 +332,14 @@ class GameManager(appcomp.BUSINESSComp):
         return self.master
 
     #-----> A- Tâches : NET & GUI
+    #-----> A.0- Réception tâches APP :
+    def handle_APP_info(self, exobj):
+        """
+        L'application envoie une info (signal d'initialisation du jeu).
+        """
+        if exobj.dictargs.get("info", None) == AppTypes.INIT_GAME:
+            self.init_game()
+
     #-----> A.1- Réception tâches GUI :
     def on_GUI_Ready(self, exobj):
         """
@@ -502,6 +543,9 @@ class GameManager(appcomp.BUSINESSComp):
         if self.type_app == AppTypes.APP_SERVER:
             # contexte serveur :
             if netcode == ctcp.CustomRequestHelper.ASK_FOR_UID:
+                # nouvelle connection : codec par défaut jusqu'à annonce
+                if uid in self._clients_codec.keys():
+                    del self._clients_codec[uid]
                 # enregistrement d'un client distant (on le suppose humain)
                 self.player_connected(uid)
             elif netcode == ctcp.CustomRequestHelper.SET_CLIENT_READ_INFOS:
@@ -593,6 +637,9 @@ class GameManager(appcomp.BUSINESSComp):
         elif cmd == GameManager.BUILD_LAB_DONE:
             handler = self.server_register_client_lab_resync
             args = kwargs
+        elif cmd == GameManager.SET_CODEC:
+            handler = self.server_register_client_codec
+            args = kwargs
         # Application
         if handler != None:
             if args != None:
@@ -619,6 +666,10 @@ class GameManager(appcomp.BUSINESSComp):
             # publication ou republication intégrale
             handler = self._buid_labyrinthe
             args = kwargs
+        elif cmd == GameManager.UPDATE_LAB_DELTA:
+            # republication partielle
+            handler = self._update_lab_delta
+            args = kwargs
         elif cmd == GameManager.UPDATE_XTRAS:
             # mise à jour danger et bonus
             handler = self._update_XTras
@@ -800,12 +851,46 @@ class GameManager(appcomp.BUSINESSComp):
         """
         # sérialisation et envoi :
         comuid = self._generate_request_uid(suffix)
-        msg = CommandHelper.format_game_cmd(code, comuid, dictargs)
+        confirmrecept = self._filter_confirmrecept_with_code(code)
         if self.type_app == AppTypes.APP_SERVER:
             uid = self._filter_clients_with_code(code, uid=uid)
-        confirmrecept = self._filter_confirmrecept_with_code(code)
+            # une sérialisation par codec négocié :
+            codecdict = self._group_clients_by_codec(code, uid)
+            if len(codecdict) > 0:
+                for codec, listuid in codecdict.items():
+                    msg = CommandHelper.format_game_cmd(
+                        code, comuid, dictargs, codec=codec
+                    )
+                    self.sendNetworkContent(msg, confirmrecept, uid=listuid)
+                return
+        msg = CommandHelper.format_game_cmd(code, comuid, dictargs)
         self.sendNetworkContent(msg, confirmrecept, uid=uid)
 
+    def _group_clients_by_codec(self, code, uid):
+        """
+        Regroupe les clients destinataires par codec de sérialisation.
+        
+        Args:
+            code (str): code de commande
+            uid: id ou liste d'ids
+        
+        Returns:
+            dict: {codec: liste d'uids} (codec None : format texte par défaut)
+        """
+        if isinstance(uid, list):
+            listuid = uid
+        else:
+            listuid = [uid]
+        codecdict = dict()
+        for u in listuid:
+            codec = None
+            if code in GameManager.COMPACT_CODEC_CODES:
+                codec = self._clients_codec.get(u, None)
+            if codec not in codecdict.keys():
+                codecdict[codec] = list()
+            codecdict[codec].append(u)
+        return codecdict
+
     def _filter_clients_with_code(self, code, uid=None):
         """
         Filtre les clients si uid est indéfini en fonction du code de commande.
@@ -1021,6 +1106,7 @@ class GameManager(appcomp.BUSINESSComp):
         self.gamble_XTras_updated = False
         self.wait_clients_gamble_keys = False
         self._gamble_key = None
+        self._changelogs_history = dict()
         self.wait_client_resync = False
         self.wait_clients_XTras_keys = False
         self.gamble_ended = False
@@ -1619,9 +1705,10 @@ class GameManager(appcomp.BUSINESSComp):
         Synchro du labyrinthe des clients distants
         
         Args:
-            case : parmi BUILD_LAB, UPDATE_XTRAS, UPDATE_BOTS, REORDER_BOTS
+            case : parmi BUILD_LAB, UPDATE_LAB_DELTA, UPDATE_XTRAS, UPDATE_BOTS, REORDER_BOTS
             listuid : uid ou liste d'uid de joueurs concernés par l'envoi ou None (ie tous les joueurs)
-            dictargs : dict associé aux derniers bonus/dangers ajoutés ou à la liste de bots (cas part déconnection)
+            dictargs : dict associé aux derniers bonus/dangers ajoutés, à la liste de bots (cas part déconnection)
+                ou au delta de resynchro
         """
         msgdict = None
         # En fonction du cas :
@@ -1631,8 +1718,8 @@ class GameManager(appcomp.BUSINESSComp):
             # on ajoute les infos de type de partie
             msgdict["mode"] = self.current_game_mode
             msgdict["level"] = self.current_game_level
-        elif case == GameManager.UPDATE_XTRAS:
-            # bonus et dangers venant d'être ajoutés :
+        elif case in [GameManager.UPDATE_XTRAS, GameManager.UPDATE_LAB_DELTA]:
+            # bonus et dangers venant d'être ajoutés ou delta de resynchro :
             msgdict = dictargs
         elif case == GameManager.UPDATE_BOTS:
             # mise à jour de la liste de bots :
@@ -1656,6 +1743,27 @@ class GameManager(appcomp.BUSINESSComp):
         # rebuid :
         self.update_players_labyrinthe(GameManager.BUILD_LAB, listuid=uid)
 
+    def _resync_clients_labyrinthe(self, uidlist):
+        """
+        Resynchronise les clients de uidlist : par delta depuis leur dernière 
+        version validée lorsque l'historique de changelogs le permet, par 
+        publication intégrale (BUILD_LAB) sinon.
+        """
+        fulllist = list()
+        for uid in uidlist:
+            player = self.get_player_by_uid(uid)
+            cltdict = self._sync_clients_dict[player]
+            listcoords = self._get_delta_coords_for_client(cltdict)
+            if listcoords != None:
+                dictargs = self.labMngr.get_delta_datas(listcoords)
+                self.update_players_labyrinthe(
+                    GameManager.UPDATE_LAB_DELTA, listuid=uid, dictargs=dictargs
+                )
+            else:
+                fulllist.append(uid)
+        if len(fulllist) > 0:
+            self.update_players_labyrinthe(GameManager.BUILD_LAB, listuid=fulllist)
+
     def master_closing_gamble(self):
         """
         Pré finalisation du coup par le master.
@@ -1705,7 +1813,7 @@ class GameManager(appcomp.BUSINESSComp):
                 # marqueur
                 self.wait_clients_XTras_keys = True
                 # clef de comparaison
-                self._gamble_key = self.create_changelog_key()
+                self._register_gamble_key()
                 # message :
                 self.sendNetworkMessage("Ajout de bonus et de mines...")
                 # mise à jour
@@ -1791,6 +1899,29 @@ class GameManager(appcomp.BUSINESSComp):
         # affichage
         self.publish_carte(clb)
 
+    def _update_lab_delta(self, kwargs):
+        """
+        Resynchronisation partielle du labyrinthe (delta transmis par le serveur)
+        """
+        if not self.carte_builded:
+            # pas de version de référence : publication intégrale
+            self.fire_game_event(GameManager.GET_FULL_LAB, suffix="clt")
+            return
+        self.lock_NET_tasks()
+        # version de la carte :
+        if "carte_version" in kwargs.keys():
+            self.carte_version = kwargs["carte_version"]
+        # init changelog :
+        self.init_changelogs()
+        # parsing
+        self.labMngr.apply_lab_delta(kwargs)
+        # callbalck (client)
+        clb = None
+        if self.type_app == AppTypes.APP_CLIENT:
+            clb = self.client_confirm_lab_resync
+        # affichage
+        self.publish_carte(clb)
+
     def _reorder_bots(self, kwargs):
         """
         La liste des robots a été ré ordonnée avant de démarrer la partie
@@ -2207,7 +2338,7 @@ class GameManager(appcomp.BUSINESSComp):
             # init du process de surveillance
             self._start_wait_sync_process()
             # contrôle de cohérence des clients :
-            self._gamble_key = self.create_changelog_key()
+            self._register_gamble_key()
             self.wait_clients_gamble_keys = True
             # infos
             self.affiche_partie_infos_for_server()
@@ -2272,6 +2403,11 @@ class GameManager(appcomp.BUSINESSComp):
         """
         # Enregistrement
         self.uid = uid
+        # Annonce du codec compact au serveur :
+        if self.type_app == AppTypes.APP_CLIENT:
+            self.fire_game_event(
+                GameManager.SET_CODEC, {"codec": CompactCodec.CODEC_NAME}
+            )
         # Envoi à la GUI
         code = appcomp.GUIExchangeObject.SET_BUS_INFO
         obj = ExchangeHelper.createGUIObj(
@@ -2309,6 +2445,17 @@ class GameManager(appcomp.BUSINESSComp):
             )
             self._register_new_player(uid, False, True, publish=publish)
 
+    def server_register_client_codec(self, dictargs):
+        """
+        Enregistre le codec de sérialisation annoncé par un client distant
+        (codec texte par défaut si non supporté).
+        """
+        uid = dictargs["uid"]
+        if dictargs.get("codec", None) == CompactCodec.CODEC_NAME:
+            self._clients_codec[uid] = CompactCodec.CODEC_NAME
+        elif uid in self._clients_codec.keys():
+            del self._clients_codec[uid]
+
     def player_joignable(self, uid):
         """
         Indique que la connexion bilatérale avec le client est établie.
@@ -2507,6 +2654,8 @@ class GameManager(appcomp.BUSINESSComp):
                     "carte_version": player.sync_marker,
                     "joignable": player.joignable,
                     "sync_key": None,
+                    "sync_coords": None,
+                    "acked_version": None,
                     "lab_sync": True,
                     "lab_sync_done": False,
                 }
@@ -2539,6 +2688,43 @@ class GameManager(appcomp.BUSINESSComp):
         return key
 
     #-----> D.1- Cohérence (serveur)
+    def _register_gamble_key(self):
+        """
+        Crée la clef de comparaison du coup et archive les coords modifiées 
+        pour la version de carte courante (resynchro par delta).
+        """
+        self._gamble_key = self.create_changelog_key()
+        self._changelogs_history[
+            self.carte_version
+        ] = self.labMngr.get_changelogs_coords()
+        # on ne conserve que les dernières versions :
+        minversion = self.carte_version - GameManager.CHANGELOG_HISTORY_SIZE
+        for v in [v for v in self._changelogs_history.keys() if v <= minversion]:
+            del self._changelogs_history[v]
+
+    def _get_delta_coords_for_client(self, cltdict):
+        """
+        Retourne la liste des coords à resynchroniser pour le client décrit par
+        cltdict ou None si une publication intégrale est nécessaire (client
+        trop en retard ou sans version validée).
+        """
+        acked = cltdict["acked_version"]
+        if acked == None:
+            return None
+        if self.carte_version - acked > GameManager.CHANGELOG_HISTORY_SIZE:
+            return None
+        coordsset = set()
+        v = acked + 1
+        while v <= self.carte_version:
+            if v not in self._changelogs_history.keys():
+                return None
+            coordsset.update(self._changelogs_history[v])
+            v += 1
+        # coords modifiées (à tort) par le client :
+        if cltdict["sync_coords"] != None:
+            coordsset.update(cltdict["sync_coords"])
+        return list(coordsset)
+
     def _start_wait_sync_process(self):
         """
         Initie le process de contrôle de cohérence en enregistrement le t0.
@@ -2570,6 +2756,11 @@ class GameManager(appcomp.BUSINESSComp):
         # enregistrement de la clef
         clientkey = dictargs["changelogs_key"]
         self._sync_clients_dict[player]["sync_key"] = clientkey
+        # coords modifiées par le client :
+        if "changelogs_coords" in dictargs.keys():
+            self._sync_clients_dict[player][
+                "sync_coords"
+            ] = self.labMngr.parse_numbered_coords(dictargs["changelogs_coords"])
 
     def server_check_players_changelog_keys(self, callback):
         """
@@ -2603,6 +2794,7 @@ class GameManager(appcomp.BUSINESSComp):
             elif cltkey == self._gamble_key:
                 # la clef est bonne :
                 cltdict["lab_sync"] = True
+                cltdict["acked_version"] = self.carte_version
                 count += 1
             elif cltkey != None:
                 # la clef n'est pas bonne, on resynchronise le client :
@@ -2623,11 +2815,15 @@ class GameManager(appcomp.BUSINESSComp):
                 cltdict = self._sync_clients_dict[player]
                 # ré initialisation des clefs de changelog
                 cltdict["sync_key"] = None
+                sync_coords = cltdict["sync_coords"]
+                cltdict["sync_coords"] = None
                 # marqueur de resynchro
                 lab_sync = cltdict["lab_sync"]
                 if player.joignable and not lab_sync:
                     uid_to_resync.append(player.uid)
                     cltdict["lab_sync_done"] = False
+                    # conservé pour le calcul du delta :
+                    cltdict["sync_coords"] = sync_coords
                 else:
                     cltdict["lab_sync_done"] = True
             if len(uid_to_resync) > 0:
@@ -2635,8 +2831,8 @@ class GameManager(appcomp.BUSINESSComp):
                 self._register_uid_list_to_sync(uidlist=uid_to_resync)
                 # init du process de surveillance
                 self._start_wait_sync_process()
-                # ordre de resynchro
-                self.update_players_labyrinthe(GameManager.BUILD_LAB, uid_to_resync)
+                # ordre de resynchro (delta ou publication intégrale)
+                self._resync_clients_labyrinthe(uid_to_resync)
                 # info autres clients;
                 othersuid = [
                     x for x in self._get_clients_uid_list() if x not in uid_to_resync
@@ -2668,8 +2864,10 @@ class GameManager(appcomp.BUSINESSComp):
             self.on_player_status_changed(uid)
         # contrôle de synchro :
         if client_cversion == self.carte_version:
+            cltdict = self._sync_clients_dict[player]
+            cltdict["acked_version"] = client_cversion
+            cltdict["sync_coords"] = None
             if self.wait_client_resync:
-                cltdict = self._sync_clients_dict[player]
                 cltdict["lab_sync"] = True
                 cltdict["lab_sync_done"] = True
         else:
@@ -2761,6 +2959,9 @@ class GameManager(appcomp.BUSINESSComp):
             "uid": self.uid,
             "carte_version": self.carte_version,
             "changelogs_key": self.create_changelog_key(),
+            "changelogs_coords": self.labMngr.number_coords_list(
+                self.labMngr.get_changelogs_coords()
+            ),
         }
         self.fire_game_event(
             GameManager.CHECK_CHANGELOG_KEY, dictargs=dictargs, suffix="clt"
@@ -3164,6 +3365,8 @@ class GameManager(appcomp.BUSINESSComp):
         obj = ExchangeHelper.createGUIObj(
             code, {"info": GameManager.NET_INFOS, "dictdatas": dictargs}
         )
+        # état complet : remplace une publication encore en attente
+        obj.coalesce_key = GameManager.NET_INFOS
         # Envoi à la GUI
         self.sendGuiCmd(obj)
 
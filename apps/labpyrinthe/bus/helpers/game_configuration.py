@@ -60,6 +60,8 @@ class GameConfiguration:
     # Bonus pouvant être appliqués
     _ENSURE_BONUS_DENSITY = False
     _BONUS_POLICY = {"vitesse": None, "mine": None, "grenade": None}
+    # Nombre de bots imposé (benchmarks), None : défini par la densité
+    _FORCED_BOTS_NUMBER = None
     # Méthodes statiques
     #-----> Initialisation
     def set_difficulty(cls, val):
@@ -80,9 +82,32 @@ class GameConfiguration:
         Re initialise la classe avant la définition d'une nouvelle partie
         """
         cls._DIFFICULTY = None
+        cls._FORCED_BOTS_NUMBER = None
 
     re_initialise = classmethod(re_initialise)
 
+    def override_partie(cls, width=None, height=None, bots=None):
+        """
+        Surcharge les dimensions de la carte et/ou le nombre de bots tirés par
+        set_difficulty (benchmarks), puis redéfinit la liste de comportements.
+        
+        Args:
+            width (int): largeur de la carte ou None
+            height (int): hauteur de la carte ou None
+            bots (int): nombre de bots ou None
+        """
+        if not cls.is_game_configured():
+            return
+        if width != None:
+            cls._W_RANGE = int(width)
+        if height != None:
+            cls._H_RANGE = int(height)
+        if bots != None:
+            cls._FORCED_BOTS_NUMBER = int(bots)
+        cls._BEHAVIOR_LIST = cls._define_bots_behaviors_list()
+
+    override_partie = classmethod(override_partie)
+
     def _configureGame(cls):
         """
         Définit les paramètres statiques en fonction du niveau de difficulté
@@ -348,6 +373,8 @@ class GameConfiguration:
         """
         Retourne le nombre de bots à ajouter
         """
+        if cls._FORCED_BOTS_NUMBER != None:
+            return cls._FORCED_BOTS_NUMBER
         dens = cls.get_initial_density("bots")
         num = min(math.ceil(cls._W_RANGE * cls._H_RANGE * dens), 15)
         return num
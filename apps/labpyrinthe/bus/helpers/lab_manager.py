@@ -594,6 +594,17 @@ class LabManager:
             # paramétrage du cmdMngr :
             self._sync_commandMngr()
 
+    def apply_lab_delta(self, kwargs):
+        """
+        Applique une resynchronisation partielle du labyrinthe transmise par
+        le master (slave).
+        """
+        if not self.gameMngr.is_master():
+            # Délégation au parseur
+            self._liste_robots = self._labParser.apply_delta_datas(kwargs)
+            # paramétrage du cmdMngr :
+            self._sync_commandMngr()
+
     def rebuild_labyrinthe(self, kwargs):
         """
         En cas de désynchronisation en mode slave, on reparse intégralement
@@ -685,6 +696,14 @@ class LabManager:
         # Délégation au parseur
         return self._labParser.get_parsing_datas()
 
+    def get_delta_datas(self, listcoords):
+        """
+        Retourne un dictionnaire à sérialiser limité aux coords de listcoords 
+        (resynchro partielle d'un client).
+        """
+        # Délégation au parseur
+        return self._labParser.get_delta_datas(listcoords)
+
     def get_bots_datas(self, full=True):
         """
         Retourne un dictionnaire à sérialiser comprenant toutes les données relatives 
@@ -709,6 +728,30 @@ class LabManager:
         chlogs = self._lablevel.get_change_log()
         return chlogs["key"]
 
+    def get_changelogs_coords(self):
+        """
+        Retourne la liste des coords modifiées depuis le dernier appel à 
+        init_changelogs.
+        """
+        if self._lablevel:
+            chlogs = self._lablevel.get_change_log()
+            return list(chlogs["coords"])
+        return list()
+
+    def number_coords_list(self, listcoords):
+        """
+        Retourne la liste d'entiers associée à une liste de coords (sérialisation).
+        """
+        w = self.get_dimensions()[0]
+        return [self._labParser.number_coords(c, w) for c in listcoords]
+
+    def parse_numbered_coords(self, numlist):
+        """
+        Réciproque de number_coords_list.
+        """
+        w = self.get_dimensions()[0]
+        return self._labParser.parse_numbered_coords(numlist, w)
+
     def init_step_changelogs(self):
         """
         Ré initiazlise les logs d'étape.
@@ -733,6 +776,15 @@ class LabManager:
             robot, gamblenumber, gamblecount, gambleid
         )
 
+    def enable_cmd_profiling(self, enabled=True):
+        """
+        Active ou désactive l'instrumentation du calcul des commandes des robots
+        (voir CommandManager.enable_profiling).
+        
+        Retour : CommandProfiler ou None
+        """
+        return self._cmdMngr.enable_profiling(enabled)
+
     def analyse_cmd_for_robot(self, cmd, uid):
         """
         Analyse une commande pour le robot d'id uid
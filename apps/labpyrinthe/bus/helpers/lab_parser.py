@@ -21,6 +21,13 @@ class LabParser:
     **Parseur de Labyrinthes**
     """
 
+    # types de cases XTras remplacés lors d'une resynchro par delta :
+    DELTA_XTRAS_TYPES = [
+        LabHelper.CASE_BONUS,
+        LabHelper.CASE_DANGER,
+        LabHelper.CASE_GRENADE,
+    ]  #: types de cases XTras exportés coord par coord (delta)
+
     def __init__(self):
         """
         Constructeur
@@ -107,10 +114,15 @@ class LabParser:
                 newcase = Case(xc, yc, typecase, face)
                 self._lablevel.set_case(newcase)
 
-    def _parse_xtras_layers(self, kwargs):
+    def _parse_xtras_layers(self, kwargs, sync_coords=False):
         """
         Traite les couches additionnelles (robot, bonus, danger) non comprises dans
         la carte txt
+        
+        Args:
+            kwargs (dict): dict de parsing
+            sync_coords (bool): si True les robots existants sont également replacés
+                aux coords transmises (resynchro par delta)
         """
         for k in kwargs.keys():
             typecase = self._extract_typecase_from_uid(k)
@@ -127,6 +139,8 @@ class LabParser:
                         case = CaseRobot(objdict)
                         self._liste_robots.append(case)
                     else:
+                        if sync_coords:
+                            self._sync_robot_coords(caserobot, objdict)
                         caserobot.update_dyn_props(objdict)
                 elif typecase == LabHelper.CASE_BONUS:
                     case = CaseBonus(objdict)
@@ -137,6 +151,48 @@ class LabParser:
                 if case != None:
                     self._lablevel.set_case(case)
 
+    def _sync_robot_coords(self, caserobot, objdict):
+        """
+        Replace au besoin un robot existant aux coords décrites dans objdict
+        """
+        x = caserobot.parseInt(objdict.get("x", None))
+        y = caserobot.parseInt(objdict.get("y", None))
+        if None not in (x, y) and (x, y) != (caserobot.x, caserobot.y):
+            self._lablevel.move_case(caserobot, x, y)
+
+    def apply_delta_datas(self, kwargs):
+        """
+        Applique une resynchronisation partielle générée par get_delta_datas : 
+        les cases de base et XTras des coords modifiées sont remplacées, les 
+        robots mis à jour.
+        """
+        w, h = self._lablevel.get_dimensions()
+        listcoords = self.parse_numbered_coords(kwargs["delta_coords"], w)
+        basetxt = str(kwargs["delta_base"])
+        # couches de base et XTras :
+        i = 0
+        for coords in listcoords:
+            x, y = coords
+            # XTras antérieurs :
+            for tc in LabParser.DELTA_XTRAS_TYPES:
+                oldcase = self._lablevel.get_layer(tc).get_case(x, y)
+                if oldcase != None:
+                    self._lablevel.delete_case(oldcase)
+            # case de base :
+            if i < len(basetxt):
+                role = LabHelper.get_role_of_char(basetxt[i])
+                if role == LabHelper.CASE_MUR and (
+                    x in (0, w - 1) or y in (0, h - 1)
+                ):
+                    role = LabHelper.CASE_MUR_PERIMETRE
+                if role in LabHelper.LINKED_CASETYPES:
+                    face = LabHelper.get_repr_for_role(role)
+                    self._lablevel.set_case(Case(x, y, role, face))
+            i += 1
+        # robots et XTras transmis :
+        self._parse_xtras_layers(kwargs, sync_coords=True)
+        return self._liste_robots
+
     def _get_case_robot_by_uid(self, uid):
         """
         Retourne la case robot de self._liste_robots d'uid uid ou None
@@ -238,6 +294,59 @@ class LabParser:
         # retour :
         return msgdict
 
+    def get_delta_datas(self, listcoords):
+        """
+        Retourne un dict à sérialiser permettant de resynchroniser un client 
+        sur les seules coords de listcoords : 
+        
+        * delta_coords : coords numérotées (voir number_coords)
+        * delta_base : caractères de parsing de la couche de base associés
+        * dicts des XTras situés sur ces coords
+        * dicts complets des robots
+        """
+        flatmatrice = self._lablevel.get_flat_matrice(full=False)
+        w = flatmatrice.get_dimensions()[0]
+        numlist = list()
+        basetxt = ""
+        xtraslist = list()
+        for coords in sorted(set(listcoords)):
+            x, y = int(coords[0]), int(coords[1])
+            case = flatmatrice.get_case(x, y)
+            if case == None:
+                continue
+            numlist.append(self.number_coords((x, y), w))
+            basetxt += LabHelper.get_txt_for_role(case.type_case)
+            for tc in LabParser.DELTA_XTRAS_TYPES:
+                xcase = self._lablevel.get_layer(tc).get_case(x, y)
+                if xcase != None:
+                    xtraslist.append(xcase)
+        # dict de retour :
+        msgdict = self.get_parsedicts_for_listcases(xtraslist)
+        msgdict.update(self.get_bots_datas(full=True))
+        msgdict["delta_coords"] = numlist
+        msgdict["delta_base"] = basetxt
+        return msgdict
+
+    def number_coords(self, coords, w):
+        """
+        Retourne un entier associé aux coords (x, y) pour une largeur w
+        """
+        return int(coords[0]) + int(coords[1]) * w
+
+    def parse_numbered_coords(self, numlist, w):
+        """
+        Réciproque de number_coords pour une liste (éventuellement désérialisée) 
+        d'entiers
+        """
+        listcoords = list()
+        if not isinstance(numlist, list):
+            numlist = [numlist]
+        for n in numlist:
+            if LabHelper.REGEXP_INT.match(str(n)):
+                n = int(n)
+                listcoords.append((n % w, n // w))
+        return listcoords
+
     def _create_parsing_uid(self, name, i):
         """
         Crée un uid pour une case additionnelle
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Micro benchmarks** du modèle de carte (`Matrice`, `LabLevel`).
+
+Pour chaque dimension de carte (carrée), une carte est générée par
+`LabGenerator.create_random_carte` puis peuplée de robots et de mines, les tirages
+étant rendus reproductibles par `CustomRandom.seed`. Les opérations mesurées :
+
+* Matrice : ``set_case``, ``get_case``, ``get_case_by_type``, ``get_submatrice``,
+  ``get_sublosange`` (sans cache et cache de niveau 2 chaud), ``get_signature``
+* LabLevel : ``_update_flat_matrices`` (complet et partiel après déplacement d'un
+  robot), change logs (enregistrement de déplacements et génération de clef)
+* LabLevel : ``xlook_for_cases_impacted`` (cache d'impacts vidé),
+  ``get_bot_move_zone`` / ``get_bot_attack_zone``
+
+Chaque mesure est répétée, le résultat retenu étant le temps par opération
+(meilleur, médian) en microsecondes. Les résultats sont sauvegardés au format
+JSON afin de suivre les régressions entre deux versions.
+
+.. admonition:: Exemple
+
+   ::
+
+      python -m labpyproject.apps.labpyrinthe.bus.model.matrix_benchmark -s 18 26 40 -o bench.json
+
+.. note::
+   Le maximum de jeu est de 26x26 (voir GameConfiguration), les dimensions
+   supérieures permettent d'évaluer le passage à l'échelle.
+"""
+# imports
+import sys
+import time
+import json
+import platform
+import argparse
+import labpyproject.core.random.custom_random as cr
+from labpyproject.apps.labpyrinthe.bus.helpers.lab_generator import LabGenerator
+from labpyproject.apps.labpyrinthe.bus.helpers.lab_parser import LabParser
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import Matrice
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import Case
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseRobot
+from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseDanger
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["MatrixBenchmark"]
+# classe
+class MatrixBenchmark:
+    """
+    Banc de micro benchmarks de Matrice et LabLevel.
+    """
+
+    # statique :
+    DEFAULT_SIZES = [12, 18, 26, 40, 60]  #: dimensions de cartes par défaut
+    DEFAULT_REPEAT = 5  #: nombre de répétitions de chaque mesure
+    BOTS_DENSITY = 0.03  #: proportion de cases vides occupées par un robot
+    DANGERS_DENSITY = 0.08  #: proportion de cases vides occupées par une mine
+    SAMPLES_COUNT = 200  #: nombre de zones tirées pour les sous matrices
+    BEHAVIORS = [
+        CaseRobot.BEHAVIOR_WINNER,
+        CaseRobot.BEHAVIOR_HUNTER,
+        CaseRobot.BEHAVIOR_TOURIST,
+        CaseRobot.BEHAVIOR_BUILDER,
+        CaseRobot.BEHAVIOR_SAPPER,
+    ]  #: comportements des robots générés
+    IMPACTS = [1, 5, 9, 13, 17, 25]  #: puissances de mines
+    # méthodes
+    def __init__(self, sizes=None, repeat=DEFAULT_REPEAT, seed=0):
+        """
+        Constructeur
+
+        Args:
+            sizes (list): dimensions des cartes (carrées)
+            repeat (int): nombre de répétitions par mesure
+            seed (int): graine des tirages (cartes, robots, mines, zones)
+        """
+        self.sizes = sizes
+        if self.sizes == None:
+            self.sizes = list(MatrixBenchmark.DEFAULT_SIZES)
+        self.repeat = max(1, int(repeat))
+        self.seed = seed
+        # contexte de la dimension en cours :
+        self._lablevel = None
+        self._robots = None
+        self._dangers = None
+        self._rects = None
+        self._losanges = None
+        # résultats :
+        self.results = list()
+
+    #-----> Séquence globale
+    def run(self):
+        """
+        Joue l'ensemble des mesures pour chaque dimension et retourne le dict de
+        résultats.
+
+        Returns:
+            dict: {"meta":dict, "results":list}
+        """
+        try:
+            for size in self.sizes:
+                self._create_level(size)
+                self._run_matrice_benchs(size)
+                self._run_lablevel_benchs(size)
+        finally:
+            # retour aux tirages non reproductibles :
+            cr.CustomRandom.seed(None)
+        return self.get_report()
+
+    def get_report(self):
+        """
+        Retourne le dict exporté en JSON.
+
+        Returns:
+            dict: {"meta":dict, "results":list}
+        """
+        meta = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": self.sizes,
+            "repeat": self.repeat,
+            "seed": self.seed,
+        }
+        return {"meta": meta, "results": self.results}
+
+    def save(self, path):
+        """
+        Sauvegarde le rapport au format JSON.
+
+        Args:
+            path (str): chemin du fichier
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_report(), f, indent=2)
+
+    #-----> Génération des niveaux
+    def _create_level(self, size):
+        """
+        Génère (de façon reproductible) le LabLevel de dimension size.
+        """
+        cr.CustomRandom.seed(self.seed * 1000 + size)
+        lignes = LabGenerator.create_random_carte(
+            fullrandom=False, width=size, height=size
+        )
+        lablevel, liste_robots = LabParser().parse_labyrinthe({"cartetxt": lignes})
+        self._lablevel = lablevel
+        vides = list(lablevel.get_typecase_set(LabHelper.CASE_VIDE))
+        vides.sort(key=lambda c: (c.y, c.x))
+        cr.CustomRandom.shuffle(vides)
+        nbbots = max(2, int(len(vides) * MatrixBenchmark.BOTS_DENSITY))
+        nbdangers = max(1, int(len(vides) * MatrixBenchmark.DANGERS_DENSITY))
+        # robots :
+        self._robots = list()
+        for i in range(nbbots):
+            case = vides.pop()
+            dictrobot = CaseRobot.get_default_dict()
+            dictrobot["uid"] = "bench" + str(i)
+            dictrobot["behavior"] = MatrixBenchmark.BEHAVIORS[
+                i % len(MatrixBenchmark.BEHAVIORS)
+            ]
+            dictrobot["face"] = CaseRobot.get_char_repr(dictrobot["behavior"])
+            dictrobot["human"] = False
+            dictrobot["x"] = case.x
+            dictrobot["y"] = case.y
+            dictrobot["number"] = i + 1
+            dictrobot["vitesse"] = cr.CustomRandom.randrange(1, 4)
+            dictrobot["has_grenade"] = True
+            dictrobot["portee_grenade"] = cr.CustomRandom.randrange(1, 5)
+            dictrobot["puissance_grenade"] = cr.CustomRandom.choice(
+                MatrixBenchmark.IMPACTS
+            )
+            robot = CaseRobot(dictrobot)
+            lablevel.set_case(robot)
+            self._robots.append(robot)
+        # mines :
+        self._dangers = list()
+        for i in range(nbdangers):
+            case = vides.pop()
+            dangerdict = CaseDanger.get_default_dict()
+            dangerdict["x"] = case.x
+            dangerdict["y"] = case.y
+            dangerdict["danger_type"] = CaseDanger.DANGER_MINE
+            dangerdict["danger_impact"] = cr.CustomRandom.choice(
+                MatrixBenchmark.IMPACTS
+            )
+            danger = CaseDanger(dangerdict)
+            lablevel.set_case(danger)
+            self._dangers.append(danger)
+        lablevel.update_cache()
+        # zones tirées pour les sous matrices :
+        self._rects = list()
+        self._losanges = list()
+        for i in range(MatrixBenchmark.SAMPLES_COUNT):
+            w = cr.CustomRandom.randrange(2, max(3, size // 2))
+            h = cr.CustomRandom.randrange(2, max(3, size // 2))
+            x = cr.CustomRandom.randrange(0, size - w + 1)
+            y = cr.CustomRandom.randrange(0, size - h + 1)
+            self._rects.append((x, y, w, h))
+            dim = cr.CustomRandom.choice([3, 5, 7, 9])
+            xc = cr.CustomRandom.randrange(0, size)
+            yc = cr.CustomRandom.randrange(0, size)
+            self._losanges.append((xc, yc, dim))
+
+    #-----> Mesures
+    def _measure(self, size, name, ops, setup, func):
+        """
+        Répète self.repeat fois setup() puis func() (non chronométré / chronométré)
+        et enregistre le temps par opération.
+
+        Args:
+            size (int): dimension de la carte
+            name (str): nom de la mesure
+            ops (int): nombre d'opérations effectuées par func
+            setup (function or None): préparation (retourne le contexte passé à func)
+            func (function): opérations mesurées
+        """
+        durations = list()
+        for i in range(self.repeat):
+            ctx = None
+            if setup != None:
+                ctx = setup()
+            t0 = time.perf_counter()
+            func(ctx)
+            durations.append(time.perf_counter() - t0)
+        durations.sort()
+        ops = max(1, ops)
+        self.results.append(
+            {
+                "size": size,
+                "bench": name,
+                "ops": ops,
+                "best_us_per_op": round(durations[0] * 1e6 / ops, 3),
+                "median_us_per_op": round(
+                    durations[len(durations) // 2] * 1e6 / ops, 3
+                ),
+            }
+        )
+
+    def _run_matrice_benchs(self, size):
+        """
+        Mesures sur Matrice (copie sans cache de l'applat complet).
+        """
+        flat = self._lablevel.get_flat_matrice()
+        coords = sorted(flat.get_inner_dict().keys())
+        typecases = [
+            LabHelper.CASE_VIDE,
+            LabHelper.CASE_MUR,
+            LabHelper.CASE_PORTE,
+            LabHelper.CASE_ROBOT,
+            LabHelper.CASE_DANGER,
+        ]
+        # set_case : cases neuves dans une matrice vide
+        def setup_set():
+            cases = [Case(x, y, LabHelper.CASE_VIDE, " ") for (x, y) in coords]
+            return (Matrice(), cases)
+
+        def run_set(ctx):
+            mat, cases = ctx
+            for c in cases:
+                mat.set_case(c)
+
+        self._measure(size, "matrice.set_case", len(coords), setup_set, run_set)
+        # get_case :
+        mat = flat.copy()
+
+        def run_get(ctx):
+            for (x, y) in coords:
+                mat.get_case(x, y)
+
+        self._measure(size, "matrice.get_case", len(coords), None, run_get)
+        # get_case_by_type :
+        def run_bytype(ctx):
+            for tc in typecases:
+                mat.get_case_by_type(tc)
+
+        self._measure(size, "matrice.get_case_by_type", len(typecases), None, run_bytype)
+        # sous matrices sans cache :
+        def run_sub(ctx):
+            for (x, y, w, h) in self._rects:
+                mat.get_submatrice(x, y, w, h, strictmode=False)
+
+        self._measure(size, "matrice.get_submatrice", len(self._rects), None, run_sub)
+
+        def run_losange(ctx):
+            for (xc, yc, dim) in self._losanges:
+                mat.get_sublosange(xc, yc, dim)
+
+        self._measure(
+            size, "matrice.get_sublosange", len(self._losanges), None, run_losange
+        )
+        # sous matrices, cache de niveau 2 chaud :
+        def setup_cached():
+            cmat = flat.copy()
+            cmat.set_matrice_cache(2)
+            for (x, y, w, h) in self._rects:
+                cmat.get_submatrice(x, y, w, h, strictmode=False)
+            for (xc, yc, dim) in self._losanges:
+                cmat.get_sublosange(xc, yc, dim)
+            return cmat
+
+        def run_sub_cached(cmat):
+            for (x, y, w, h) in self._rects:
+                cmat.get_submatrice(x, y, w, h, strictmode=False)
+
+        self._measure(
+            size,
+            "matrice.get_submatrice.cached",
+            len(self._rects),
+            setup_cached,
+            run_sub_cached,
+        )
+
+        def run_losange_cached(cmat):
+            for (xc, yc, dim) in self._losanges:
+                cmat.get_sublosange(xc, yc, dim)
+
+        self._measure(
+            size,
+            "matrice.get_sublosange.cached",
+            len(self._losanges),
+            setup_cached,
+            run_losange_cached,
+        )
+        # signature :
+        def run_signature(ctx):
+            mat.get_signature()
+
+        self._measure(size, "matrice.get_signature", 1, None, run_signature)
+
+    def _run_lablevel_benchs(self, size):
+        """
+        Mesures sur LabLevel.
+        """
+        lablevel = self._lablevel
+        robots = self._robots
+        # applats complets :
+        def setup_full():
+            lablevel.discard_cache(None, full=True)
+
+        def run_flat(ctx):
+            lablevel._update_flat_matrices()
+
+        self._measure(
+            size, "lablevel._update_flat_matrices.full", 1, setup_full, run_flat
+        )
+        lablevel.update_cache()
+        # applats partiels (après déplacement d'un robot) :
+        def setup_partial():
+            self._move_robot_back_and_forth(robots[0])
+            lablevel.discard_cache(LabHelper.CASE_ROBOT)
+
+        self._measure(
+            size, "lablevel._update_flat_matrices.partial", 1, setup_partial, run_flat
+        )
+        lablevel.update_cache()
+        # change logs : enregistrement de déplacements puis clef
+        def setup_logs():
+            lablevel.init_level_before_changes()
+
+        def run_logs(ctx):
+            for robot in robots:
+                self._move_robot_back_and_forth(robot)
+            lablevel.get_change_log()
+            lablevel.get_step_change_log()
+
+        self._measure(
+            size, "lablevel.change_logs", 2 * len(robots), setup_logs, run_logs
+        )
+        lablevel.init_level_before_changes()
+        lablevel.update_cache()
+        # impacts récursifs des mines (cache d'impacts vidé) :
+        def setup_impacts():
+            lablevel._init_impact_cache()
+
+        def run_impacts(ctx):
+            for danger in self._dangers:
+                lablevel.xlook_for_cases_impacted(danger)
+
+        self._measure(
+            size,
+            "lablevel.xlook_for_cases_impacted",
+            len(self._dangers),
+            setup_impacts,
+            run_impacts,
+        )
+        # zones des robots :
+        def run_move_zone(ctx):
+            for robot in robots:
+                lablevel.get_bot_move_zone(robot)
+
+        self._measure(
+            size, "lablevel.get_bot_move_zone", len(robots), None, run_move_zone
+        )
+
+        def run_attack_zone(ctx):
+            for robot in robots:
+                lablevel.get_bot_attack_zone(robot)
+
+        self._measure(
+            size, "lablevel.get_bot_attack_zone", len(robots), None, run_attack_zone
+        )
+
+    def _move_robot_back_and_forth(self, robot):
+        """
+        Déplace le robot sur une case vide adjacente puis le ramène (deux
+        déplacements, position finale inchangée).
+        """
+        flat = self._lablevel.get_flat_matrice()
+        x, y = int(robot.x), int(robot.y)
+        for (dx, dy) in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            case = flat.get_case(x + dx, y + dy)
+            if case != None and case.type_case == LabHelper.CASE_VIDE:
+                self._lablevel.move_case(robot, x + dx, y + dy)
+                self._lablevel.move_case(robot, x, y)
+                return
+
+
+# script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro benchmarks Matrice / LabLevel")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("-r", "--repeat", type=int, default=MatrixBenchmark.DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="matrix_benchmark.json")
+    args = parser.parse_args()
+    bench = MatrixBenchmark(sizes=args.sizes, repeat=args.repeat, seed=args.seed)
+    report = bench.run()
+    bench.save(args.output)
+    for res in report["results"]:
+        print(
+            res["size"],
+            res["bench"],
+            res["best_us_per_op"],
+            "us/op (best)",
+            res["median_us_per_op"],
+            "us/op (median)",
+        )
+    sys.exit(0)
@@ -6,10 +6,12 @@
 # imports :
 import threading
 from labpyproject.core.app import app_components as appcomp
+from labpyproject.core.app.sampling_profiler import SamplingProfiler
 from labpyproject.apps.labpyrinthe.app.app_types import AppTypes
 from labpyproject.apps.labpyrinthe.bus.game_manager import GameManager
 from labpyproject.apps.labpyrinthe.gui.skinBase.GUIBase import GUIBaseThreaded
 from labpyproject.apps.labpyrinthe.gui.skinConsole.pub_helper import PublicationHelper
+from labpyproject.apps.labpyrinthe.gui.skinConsole.screen_renderer import ScreenRenderer
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = ["GUIConsole", "ThreadInput"]
@@ -17,14 +19,28 @@ __all__ = ["GUIConsole", "ThreadInput"]
 class GUIConsole(GUIBaseThreaded):
     """
     Interface graphique de type console
+    
+    Les saisies débutant par GUIConsole.PROFILER_CMD pilotent le profiler par
+    échantillonnage (non transmises au GameManager) : ::
+    
+        !profile start [période en ms]
+        !profile stop
+        !profile save [chemin] [composant]
+        !profile reset
+        !profile (statut)
     """
 
+    # statique :
+    PROFILER_CMD = "!profile"  #: préfixe des commandes du profiler
+    PROFILER_FILE = "labpyrinthe.collapsed"  #: fichier d'export par défaut
+    RENDER_MODE = None  #: mode de sortie (voir ScreenRenderer, auto par défaut)
+
     def __init__(self):
         """
         Constructeur
         """
-        # chaine txt précédement publiée
-        self._prev_txt = ""
+        # sortie des écrans (complète ou différentielle) :
+        self._renderer = ScreenRenderer(mode=GUIConsole.RENDER_MODE)
         # Helper de publication :
         self._pubHelper = PublicationHelper()
         # initialisation générique du composant d'interface
@@ -93,6 +109,10 @@ class GUIConsole(GUIBaseThreaded):
         """
         Callback appelé par le Thread d'input lorsque l'utilisateur a répondu.
         """
+        # commande locale du profiler :
+        if self._handle_profiler_cmd(reponse):
+            self.let_user_send_command()
+            return
         # réponse :
         self._reponse_input = reponse
         if self._question_object != None:
@@ -114,6 +134,46 @@ class GUIConsole(GUIBaseThreaded):
         # input libre :
         self.let_user_send_command()
 
+    def _handle_profiler_cmd(self, reponse):
+        """
+        Pilote le SamplingProfiler si reponse est une commande profiler.
+        
+        Returns:
+            boolean: True si la saisie a été prise en charge
+        """
+        if not isinstance(reponse, str):
+            return False
+        params = reponse.split()
+        if len(params) == 0 or params[0] != GUIConsole.PROFILER_CMD:
+            return False
+        profiler = SamplingProfiler()
+        action = params[1] if len(params) > 1 else None
+        msg = None
+        try:
+            if action == "start":
+                interval = None
+                if len(params) > 2:
+                    interval = float(params[2]) / 1000
+                profiler.start(interval=interval)
+            elif action == "stop":
+                profiler.stop()
+            elif action == "reset":
+                profiler.reset()
+            elif action == "save":
+                path = params[2] if len(params) > 2 else GUIConsole.PROFILER_FILE
+                tag = params[3] if len(params) > 3 else None
+                profiler.save(path, tag=tag)
+                msg = "Profil enregistré dans " + path
+            elif action != None:
+                msg = "Usage : " + GUIConsole.PROFILER_CMD
+                msg += " [start [ms] | stop | save [chemin] [composant] | reset]"
+        except (ValueError, OSError) as e:
+            msg = "Profiler : " + str(e)
+        if msg == None:
+            msg = profiler.get_status()
+        self.show_message(msg, False)
+        return True
+
     #-----> implémentation d'AbstractGUIComp
     def handle_choice(self, obj):
         """
@@ -343,15 +403,19 @@ class GUIConsole(GUIBaseThreaded):
         """
         Sur formatage
         """
+        if self._renderer.is_diff_mode():
+            # l'écran est réécrit en place
+            return txt
         eol = "\n"
         margin = eol * 10
         screen = margin + txt
         return screen
 
     def _do_print(self, screen):
-        if screen != self._prev_txt:
-            self._prev_txt = str(screen)
-            print(screen, flush=True)
+        """
+        Impression de l'écran (voir ScreenRenderer)
+        """
+        self._renderer.render(screen)
 
 
 #-----> Gestion non bloquante de l'input texte :
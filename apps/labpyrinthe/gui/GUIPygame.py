@@ -53,6 +53,8 @@ class GUIPygame(wgt.Root, GUIBaseNoThread):
         self._surface_partie = self.skin.get_image("screens", "bg_partie")
         # initialisation GUIBase :
         GUIBaseNoThread.__init__(self)
+        # réveil de la boucle pygame à chaque tâche entrante :
+        self.add_queue_listener(self.get_wakeup_event())
         # démarrage méthode run : dans le script de lancement
         # après création de l'AppManager.
 
@@ -64,6 +66,28 @@ class GUIPygame(wgt.Root, GUIBaseNoThread):
         """
         # Traitement de la pile d'échanges :
         self.process_task()
+        # Images de la carte pré-calculées après un resize :
+        if self.zone_carte != None:
+            self.zone_carte.check_resize_batch()
+
+    def has_pending_frame_work(self):
+        """
+        Surcharge de Root : animation en cours, tâches en attente ou images de la
+        carte en cours de pré-calcul, la boucle doit tourner à la cadence nominale.
+        """
+        if self.zone_carte != None and self.zone_carte.resize_batch != None:
+            return True
+        return self.is_animation_running() or self.has_pending_cmd()
+
+    def get_idle_timeout(self):
+        """
+        Surcharge de Root : l'attente est bornée par la prochaine action différée.
+        """
+        timeout = wgt.Root.get_idle_timeout(self)
+        next_timer = self.timer_service.get_next_timeout()
+        if next_timer != None:
+            timeout = min(timeout, next_timer)
+        return timeout
 
     def shutdown(self):
         """
@@ -4,13 +4,13 @@
 **Superclasses des GUIs du jeu : logique applicative**
 """
 # imports
-import time
 from labpyproject.core.app import app_components as appcomp
 from labpyproject.apps.labpyrinthe.app.app_types import AppTypes
 from labpyproject.apps.labpyrinthe.bus.game_manager import GameManager
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
 from labpyproject.apps.labpyrinthe.gui.skinBase.zone_partie_base import ZonePartieBase
 from labpyproject.apps.labpyrinthe.gui.skinBase.zone_command_base import ZoneCommandBase
+from labpyproject.apps.labpyrinthe.gui.skinBase.tweens import Easing, Tween, TweenEngine
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = ["GUIBase", "GUIBaseNoThread", "GUIBaseThreaded"]
@@ -26,6 +26,16 @@ class GUIBase():
     CONFIG_RESIZE = "CONFIG_RESIZE" #: mode resize 
     CONFIG_MENU = "CONFIG_MENU" #: mode menu (accueil)
     CONFIG_GAME = "CONFIG_GAME" #: mode jeu (partie en cours)
+    ANIMATION_EASING = Easing.EASE_IN_OUT_QUAD #: easing des animations de mouvement
+    #: contenus pouvant être traités pendant la lecture d'animations
+    CONCURRENT_CONTENTS = [
+        GameManager.CONTENT_ANIM_PIXEL,
+        GameManager.CONTENT_MESSAGE,
+        GameManager.CONTENT_GAMBLE_CTX,
+        GameManager.CONTENT_PLAYER_STATUS,
+        GameManager.CONTENT_PARTIE_SERVER,
+        GameManager.CONTENT_HELP,
+    ]
     # méthodes
     def __init__(self):
         """
@@ -55,11 +65,11 @@ class GUIBase():
         self.screen_content = None  # AbstractScreenContent
         self.screen_wait = None  # AbstractScreenWait
         self.create_interface()
-        # animation :
-        self.animation_running = False
-        self.animation_callback = None
-        self.animation_dict = None
-        self.animation_origdict = None
+        # animations :
+        self.tween_engine = TweenEngine()
+        # objets d'échange différés jusqu'à la fin des animations :
+        self._deferred_exobjs = list()
+        self._replaying_deferred = False
         # Mémorisation de l'objet d'échange :
         self._current_GUIExObj = None
 
@@ -71,6 +81,8 @@ class GUIBase():
         Rq : GUIConsole héritant de SatelliteComp, handleTask est appelée
         nativement dans la méthode run de son thread.
         """
+        # actions différées échues (même si le dépilement est suspendu) :
+        self.run_delayed_actions()
         # traitement :
         self.handleTask()
 
@@ -79,13 +91,79 @@ class GUIBase():
         Permet de désactiver temporairement le dépilement des tâches. 
         Appelée dans les méthodes handleTask de GUIBaseNoThread et
         GUIBaseThreaded
+        
+        Rq : fait progresser les animations puis traite les objets d'échange
+        différés, le dépilement n'est plus bloqué pendant les animations
+        (voir defer_exchange_object).
+        """
+        # animations :
+        self.tween_engine.update()
+        # objets différés :
+        self._replay_deferred_exchange_objects()
+        return self.is_task_processing_allowed()
+
+    def is_task_processing_allowed(self):
+        """
+        Indique si le dépilement des tâches est autorisé (sans effet de bord,
+        voir GUIBaseThreaded.has_pending_tasks).
+        """
+        # à subclasser au besoin
+        return True
+
+    def defer_exchange_object(self, exobj):
+        """
+        Diffère le traitement d'un objet d'échange ne pouvant être traité
+        pendant la lecture d'animations (mise à jour de la carte, infos
+        métier...), ou reçu après un objet déjà différé (l'ordre est conservé).
+        Appelée dans les méthodes handleExchangeObject de GUIBaseNoThread et
+        GUIBaseThreaded.
+        
+        Args:
+            exobj (GUIExchangeObject)
+            
+        Returns:
+            boolean: True si l'objet est différé
+        """
+        if self._replaying_deferred:
+            return False
+        if len(self._deferred_exobjs) > 0 or (
+            self.tween_engine.is_running()
+            and not self.is_concurrent_exchange_object(exobj)
+        ):
+            self._deferred_exobjs.append(exobj)
+            return True
+        return False
+
+    def is_concurrent_exchange_object(self, exobj):
+        """
+        Indique si l'objet d'échange peut être traité pendant la lecture
+        d'animations.
+        """
+        if exobj.typeexchange == appcomp.GUIExchangeObject.SHOW_CONTENT:
+            return exobj.dictargs["content"] in GUIBase.CONCURRENT_CONTENTS
+        return False
+
+    def has_deferred_exchange_objects(self):
+        """
+        Indique si des objets d'échange sont en attente de traitement.
         """
-        allow = True
-        if self.animation_running:
-            # animation en cours, on bloque les tâches :
-            allow = False
-            self.animation_callback()
-        return allow
+        return len(self._deferred_exobjs) > 0
+
+    def _replay_deferred_exchange_objects(self):
+        """
+        Traite dans l'ordre les objets d'échange différés, jusqu'au premier
+        objet ne pouvant être traité pendant des animations en cours.
+        """
+        self._replaying_deferred = True
+        while len(self._deferred_exobjs) > 0:
+            exobj = self._deferred_exobjs[0]
+            if self.tween_engine.is_running() and not self.is_concurrent_exchange_object(
+                exobj
+            ):
+                break
+            self._deferred_exobjs.pop(0)
+            self.handleExchangeObject(exobj)
+        self._replaying_deferred = False
 
     #-----> implémentation d'AbstractGUIComp
     def handleTask(self):
@@ -241,53 +319,52 @@ class GUIBase():
             self.on_app_type_defined()
 
     #-----> Animation :
-    def start_animation_pixel(self, dictanim, dictargs):
+    def is_animation_running(self):
         """
-        Démarre une animation de mouvement.
+        Indique si des animations sont en cours de lecture.
         """
-        # marqueur :
-        self.animation_running = True
-        self.animation_dict = dictanim
-        self.animation_origdict = dictargs
-        self.animation_callback = self.play_animation_pixel
-        # initialisation :
-        case = self.animation_dict["case"]
-        x = self.animation_dict["x1"]
-        y = self.animation_dict["y1"]
-        self.zone_carte.move_case(case, x, y)
+        return self.tween_engine.is_running()
 
-    def play_animation_pixel(self):
+    def start_animation_pixel(self, case, coords1, coords2, duration, dictargs):
         """
-        Joue une étape d'animation de mouvement. 
-        Rq : appelée dans allow_task_processing si self.animation_running = True
+        Démarre une animation de mouvement de case, jouée simultanément aux
+        autres animations en cours. Une animation en cours sur la même case
+        est achevée au préalable.
+        
+        Rq : GameManager enchaîne les coups, chaque coup attendant la
+        confirmation de son animation (voir GameManager.apply_gamble) : les
+        mouvements des robots d'un même tour restent donc joués l'un après
+        l'autre.
+        
+        Args:
+            case (Case): case à déplacer
+            coords1, coords2 (tuple): coordonnées (x, y) de départ et d'arrivée
+            duration (float): durée en secondes
+            dictargs (dict): dict de l'ordre d'affichage, confirmé en fin
+                d'animation (voir on_content_published)
+        """
+        tween = Tween(
+            coords1,
+            coords2,
+            duration,
+            onupdate=lambda coords: self.zone_carte.move_case(case, *coords),
+            oncomplete=lambda: self.on_content_published(dictargs),
+            easing=self.ANIMATION_EASING,
+            key=self.get_animation_key(case),
+        )
+        self.tween_engine.add_tween(tween)
+
+    def get_animation_key(self, case):
+        """
+        Retourne la clef d'animation d'une case : l'item graphique associé (les
+        cases transmises par le métier pouvant être des copies), à défaut la
+        case elle même.
         """
-        # données :
-        case = self.animation_dict["case"]
-        x1 = self.animation_dict["x1"]
-        y1 = self.animation_dict["y1"]
-        x2 = self.animation_dict["x2"]
-        y2 = self.animation_dict["y2"]
-        duration = self.animation_dict["duration"]
-        starttime = self.animation_dict["starttime"]
-        prevtime = self.animation_dict["prevtime"]
-        currenttime = time.perf_counter()
-        ellapsedtime = currenttime - starttime
-        if currenttime - prevtime < 1 / 25:
-            # on vise un framerate d'animation théorique de 25 imgs / sec
-            return
-        if ellapsedtime < duration:
-            # animation en cours
-            prop = ellapsedtime / duration
-            x = x1 + (x2 - x1) * prop
-            y = y1 + (y2 - y1) * prop
-            self.zone_carte.move_case(case, x, y)
-        else:
-            # fin d'animation
-            self.zone_carte.move_case(case, x2, y2)
-            self.animation_running = False
-            self.animation_dict = None
-            # confirmation :
-            self.on_content_published(self.animation_origdict)
+        if self.zone_carte != None:
+            item = self.zone_carte.get_item_for_case(case)
+            if item != None:
+                return item
+        return case
 
     #-----> création de l'interface
     def create_interface(self):
@@ -694,22 +771,11 @@ class GUIBase():
         """
         # données :
         case = dictargs["case"]
-        x1, y1 = dictargs["coords1"]
-        x2, y2 = dictargs["coords2"]
+        coords1 = tuple(dictargs["coords1"])
+        coords2 = tuple(dictargs["coords2"])
         duration = dictargs["duration"]
-        starttime = time.perf_counter()
-        dictanim = {
-            "case": case,
-            "x1": x1,
-            "y1": y1,
-            "x2": x2,
-            "y2": y2,
-            "duration": duration,
-            "starttime": starttime,
-            "prevtime": starttime,
-        }
         # démarre l'animation :
-        self.start_animation_pixel(dictanim, dictargs)
+        self.start_animation_pixel(case, coords1, coords2, duration, dictargs)
 
     def show_partie(self):
         """
@@ -791,6 +857,9 @@ class GUIBaseNoThread(GUIBase, appcomp.GUICompNoThread):
         Args:
             exobj (GUIExchangeObject)
         """
+        # différé pendant les animations :
+        if self.defer_exchange_object(exobj):
+            return
         # générique
         appcomp.GUICompNoThread.handleExchangeObject(self, exobj)
         # debug :
@@ -842,6 +911,9 @@ class GUIBaseThreaded(GUIBase, appcomp.GUIComp):
         Args:
             exobj (GUIExchangeObject)
         """
+        # différé pendant les animations :
+        if self.defer_exchange_object(exobj):
+            return
         # générique
         appcomp.GUIComp.handleExchangeObject(self, exobj)
         # debug :
@@ -855,6 +927,21 @@ class GUIBaseThreaded(GUIBase, appcomp.GUIComp):
         if self.allow_task_processing():
             # générique
             appcomp.GUIComp.handleTask(self)
+        # animations et objets différés : travail périodique du thread
+        tempo = None
+        if self.is_animation_running() or self.has_deferred_exchange_objects():
+            tempo = appcomp.ThreadableComp.THREAD_TEMPO
+        if tempo != self._periodic_tempo:
+            self.set_periodic_tempo(tempo)
+
+    def has_pending_tasks(self):
+        """
+        Surcharge de ThreadableComp : les tâches en attente ne comptent pas
+        lorsque leur dépilement est bloqué (la boucle du thread attend).
+        """
+        if not self.is_task_processing_allowed():
+            return False
+        return appcomp.GUIComp.has_pending_tasks(self)
 
     def sendTask(self, obj):
         """
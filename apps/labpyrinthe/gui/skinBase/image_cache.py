@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache LRU borné en mémoire des images redimensionnées par le skin
+(voir SkinBase.get_dynamic_image).
+
+Chaque entrée est enregistrée avec son poids estimé en octets : lorsque le
+budget est dépassé, les entrées les moins récemment utilisées sont évincées.
+Le cache est protégé par un verrou (alimenté par le thread de pré-calcul du
+skin, voir SkinBase.prewarm).
+"""
+# imports
+import threading
+import collections
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["ImageCache"]
+# classe
+class ImageCache:
+    """
+    Cache LRU d'images avec budget mémoire.
+    """
+
+    # statique :
+    MAX_BYTES = 48 * 1024 * 1024  #: budget mémoire par défaut (octets)
+    # méthodes
+    def __init__(self, maxbytes=None):
+        """
+        Constructeur
+
+        Args:
+            maxbytes (int): budget mémoire en octets (ImageCache.MAX_BYTES par défaut)
+        """
+        if maxbytes == None:
+            maxbytes = ImageCache.MAX_BYTES
+        self.maxbytes = maxbytes
+        # clef -> (image, poids) par ordre d'utilisation croissant :
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        # compteurs :
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    #-----> Accès
+    def get(self, key):
+        """
+        Retourne l'image associée à key (marquée comme la plus récente) ou None.
+        """
+        with self._lock:
+            item = self._items.get(key, None)
+            if item == None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def contains(self, key):
+        """
+        Indique si key est en cache (sans incidence sur l'ordre ni les compteurs).
+        """
+        with self._lock:
+            return key in self._items
+
+    def put(self, key, img, nbytes):
+        """
+        Enregistre une image puis évince au besoin les entrées les plus anciennes.
+        Une image excédant à elle seule le budget n'est pas conservée.
+
+        Args:
+            key (hashable)
+            img (object): image exportée ou source PIL
+            nbytes (int): poids estimé en octets
+        """
+        if img == None or nbytes > self.maxbytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous != None:
+                self.bytes -= previous[1]
+            self._items[key] = (img, nbytes)
+            self.bytes += nbytes
+            self._evict()
+
+    def pop(self, key):
+        """
+        Retire et retourne l'image associée à key ou None.
+        """
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item == None:
+                return None
+            self.bytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        """
+        Vide le cache (les compteurs sont conservés).
+        """
+        with self._lock:
+            self._items = collections.OrderedDict()
+            self.bytes = 0
+
+    def set_max_bytes(self, maxbytes):
+        """
+        Modifie le budget mémoire.
+        """
+        with self._lock:
+            self.maxbytes = maxbytes
+            self._evict()
+
+    def _evict(self):
+        """
+        Evince les entrées les moins récemment utilisées (verrou acquis).
+        """
+        while self.bytes > self.maxbytes and len(self._items) > 0:
+            key, item = self._items.popitem(last=False)
+            self.bytes -= item[1]
+            self.evictions += 1
+
+    #-----> Statistiques
+    def get_stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: {"count":, "bytes":, "maxbytes":, "hits":, "misses":, "evictions":,
+            "hit_rate":}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = None
+            if total > 0:
+                hit_rate = self.hits / total
+            return {
+                "count": len(self._items),
+                "bytes": self.bytes,
+                "maxbytes": self.maxbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hit_rate,
+            }
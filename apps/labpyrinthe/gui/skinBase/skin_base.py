@@ -9,21 +9,31 @@ Superclasse des skins de LabPyrinthe :
 """
 # imports
 import os, sys
+import math
+import threading
+import queue
 import PIL.Image
 from labpyproject.core.net.custom_TCP import CustomRequestHelper
 from labpyproject.apps.labpyrinthe.gui.skinBase.colors import ColorHelper
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseDanger
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import CaseRobot
+from labpyproject.apps.labpyrinthe.gui.skinBase.image_cache import ImageCache
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
-__all__ = ["SkinBase"]
+__all__ = ["SkinBase", "ResizeBatch"]
 # classes
 class SkinBase:
     """
     Superclasse des skins de LabPyrinthe.
     """
 
+    # statique :
+    CACHE_MAX_BYTES = ImageCache.MAX_BYTES  #: budget mémoire des images redimensionnées
+    QUANTIZE_SIZES = False  #: quantification des tailles demandées (voir quantize_size)
+    QUANTIZE_STEPS = 8  #: nombre de paliers de taille par octave
+    PREWARM_WORKERS = 2  #: nombre de threads de pré-calcul (resample PIL)
+    # méthodes
     def __init__(self, optmode=False, carte_resolution="40", frozen=False):
         """
         Constructeur
@@ -60,6 +70,18 @@ class SkinBase:
             "nav": dict(),
             "net": dict(),
         }
+        # Cache des images redimensionnées :
+        self.image_cache = ImageCache(self.CACHE_MAX_BYTES)
+        self.quantize_sizes = self.QUANTIZE_SIZES
+        self.resample_count = 0
+        self.prewarm_count = 0
+        # Pré-calcul en tâche de fond :
+        self._prewarm_queue = queue.PriorityQueue()
+        self._prewarm_lock = threading.Lock()
+        self._prewarm_pending = dict()  # clef PIL -> threading.Event
+        self._prewarm_running = set()
+        self._prewarm_seq = 0
+        self._prewarm_workers = list()
         # Initialisations :
         self.listbtnstates = ["1", "2", "3", "4", "5"]
         self.init_paths()
@@ -551,25 +573,295 @@ class SkinBase:
 
     def get_dynamic_image(self, cat, name, size):
         """
-        Retourne une image à la taille demandée
+        Retourne une image à la taille demandée (via self.image_cache).
         """
         imgexp = None
         if cat in self._srcdict.keys() and name in self._srcdict[cat].keys():
-            dict_img = self._srcdict[cat][name]
             # au maximum on considère la taille de la source
             size = min(size, self.get_source_size(cat, name))
-            if size in dict_img.keys():
-                # l'image exportée a déja été calculée :
-                imgexp = dict_img[size]
-            else:
-                # on resample:
-                img = dict_img["src"]
-                newimg = img.resize(size, PIL.Image.ANTIALIAS)
-                # on ajoute au dict l'image exportée associée à la taille demandée :
-                dict_img[size] = self.export_image_from_PIL(newimg)
-                imgexp = dict_img[size]
+            key = (cat, name, size)
+            imgexp = self.image_cache.get(key)
+            if imgexp == None:
+                if self.quantize_sizes:
+                    imgexp = self._get_quantized_image(cat, name, size)
+                else:
+                    pilimg = self._get_resampled_image(cat, name, size)
+                    imgexp = self.export_image_from_PIL(pilimg)
+                nbytes = self.get_exported_image_bytes(imgexp, size)
+                self.image_cache.put(key, imgexp, nbytes)
+        return imgexp
+
+    def _get_quantized_image(self, cat, name, size):
+        """
+        Image à la taille size obtenue par mise à l'échelle (moteur graphique) de
+        l'image calculée pour le palier de taille associé.
+        """
+        bsize = self.quantize_size(size, maxsize=self.get_source_size(cat, name))
+        bkey = (cat, name, bsize)
+        bimg = self.image_cache.get(bkey)
+        if bimg == None:
+            bimg = self.export_image_from_PIL(
+                self._get_resampled_image(cat, name, bsize)
+            )
+            nbytes = self.get_exported_image_bytes(bimg, bsize)
+            self.image_cache.put(bkey, bimg, nbytes)
+        if bsize == size:
+            return bimg
+        imgexp = self.scale_exported_image(bimg, size)
+        if imgexp == None:
+            # moteur sans mise à l'échelle : image du palier
+            imgexp = bimg
         return imgexp
 
+    def _get_resampled_image(self, cat, name, size):
+        """
+        Retourne la source PIL redimensionnée (pré-calculée par prewarm ou
+        calculée). Une tâche de pré-calcul en cours est attendue, une tâche encore
+        en file est réalisée directement par l'appelant.
+        """
+        key = ("PIL", cat, name, size)
+        claimed = False
+        with self._prewarm_lock:
+            event = self._prewarm_pending.get(key, None)
+            if event != None and key not in self._prewarm_running:
+                # tâche non démarrée : on se l'approprie
+                self._prewarm_running.add(key)
+                claimed = True
+        if event != None and not claimed:
+            event.wait()
+        pilimg = self.image_cache.pop(key)
+        if pilimg == None:
+            pilimg = self._resample(cat, name, size)
+        if claimed:
+            self._release_prewarm_task(key)
+        return pilimg
+
+    def _resample(self, cat, name, size):
+        """
+        Redimensionne la source PIL (opération coûteuse).
+        """
+        with self._prewarm_lock:
+            self.resample_count += 1
+        img = self._srcdict[cat][name]["src"]
+        return img.resize(size, PIL.Image.ANTIALIAS)
+
+    def quantize_size(self, size, maxsize=None):
+        """
+        Retourne le palier de taille (supérieur ou égal) associé à size : 
+        self.QUANTIZE_STEPS paliers par octave (soit un écart max de 12.5% avec 
+        8 paliers).
+        
+        Args:
+            size (tuple): (w, h)
+            maxsize (tuple): bornes éventuelles (taille de la source)
+        
+        Returns:
+            tuple
+        """
+        qsize = list()
+        for i in range(2):
+            dim = int(size[i])
+            step = self._get_quantize_step(dim)
+            dim = int(math.ceil(dim / step) * step)
+            if maxsize != None:
+                dim = min(dim, maxsize[i])
+            qsize.append(dim)
+        return tuple(qsize)
+
+    def _get_quantize_step(self, dim):
+        """
+        Ecart entre paliers dans l'octave de dim.
+        """
+        if dim <= self.QUANTIZE_STEPS:
+            return 1
+        return 2 ** math.floor(math.log2(dim)) // self.QUANTIZE_STEPS
+
+    def get_adjacent_sizes(self, size):
+        """
+        Retourne les paliers inférieur et supérieur au palier de size.
+        """
+        bsize = self.quantize_size(size)
+        lower = list()
+        upper = list()
+        for dim in bsize:
+            lower.append(max(1, dim - self._get_quantize_step(dim - 1)))
+            upper.append(dim + self._get_quantize_step(dim))
+        return [tuple(lower), tuple(upper)]
+
+    def get_exported_image_bytes(self, imgexp, size):
+        """
+        Poids estimé (octets) d'une image exportée, à subclasser au besoin.
+        """
+        return int(size[0]) * int(size[1]) * 4
+
+    def scale_exported_image(self, imgexp, size):
+        """
+        Mise à l'échelle rapide d'une image exportée par le moteur graphique
+        (mode quantize_sizes) : à subclasser, retourne None si non supportée.
+        """
+        return None
+
+    #-----> Pré-calcul en tâche de fond
+    def prewarm(self, size, cat="carte", names=None, priority=1):
+        """
+        Pré-calcule en tâche de fond (pool de threads) les redimensionnements PIL
+        pour la taille size (et les paliers adjacents si quantize_sizes). Seul le
+        resample PIL est réalisé hors du thread principal, l'export est fait à la
+        demande. Une tâche déjà en file ou en cours n'est pas dupliquée.
+        
+        Args:
+            size (tuple): (w, h), typiquement la taille des cases de la carte
+            cat (str): catégorie d'images
+            names (list): noms d'images (toutes les images de cat par défaut)
+            priority (int): priorité des tâches (la plus faible est traitée en
+                premier), les paliers adjacents sont traités en priority + 1
+        
+        Returns:
+            ResizeBatch: suivi des tâches de la taille size (None si la taille
+            est invalide)
+        """
+        if size in [None, (None, None)] or cat not in self._srcdict.keys():
+            return None
+        size = int(size[0]), int(size[1])
+        sizes = [size]
+        adjacent_sizes = list()
+        if self.quantize_sizes:
+            sizes = [self.quantize_size(size)]
+            adjacent_sizes = self.get_adjacent_sizes(size)
+        if names == None:
+            names = list(self._srcdict[cat].keys())
+        batch = ResizeBatch()
+        for tasksizes, prio in [(sizes, priority), (adjacent_sizes, priority + 1)]:
+            for name in names:
+                if name not in self._srcdict[cat].keys():
+                    continue
+                srcsize = self.get_source_size(cat, name)
+                for s in tasksizes:
+                    event = self._queue_prewarm_task(cat, name, min(s, srcsize), prio)
+                    if event != None and prio == priority:
+                        batch.add_event(event)
+        return batch
+
+    def _queue_prewarm_task(self, cat, name, size, priority):
+        """
+        Place en file le resample de (cat, name, size).
+        
+        Returns:
+            threading.Event: levé à la fin de la tâche, None si l'image est
+            disponible
+        """
+        key = ("PIL", cat, name, size)
+        if self.image_cache.contains((cat, name, size)) or self.image_cache.contains(
+            key
+        ):
+            return None
+        with self._prewarm_lock:
+            event = self._prewarm_pending.get(key, None)
+            if event != None:
+                return event
+            event = threading.Event()
+            self._prewarm_pending[key] = event
+            self._prewarm_seq += 1
+            seq = self._prewarm_seq
+        # chargement PIL dans le thread principal :
+        self._srcdict[cat][name]["src"].load()
+        self._prewarm_queue.put((priority, seq, key))
+        self._start_prewarm_workers()
+        return event
+
+    def _start_prewarm_workers(self):
+        """
+        Démarre (ou redémarre) au besoin les threads de pré-calcul.
+        """
+        self._prewarm_workers = [t for t in self._prewarm_workers if t.is_alive()]
+        while len(self._prewarm_workers) < self.PREWARM_WORKERS:
+            thread = threading.Thread(
+                target=self._run_prewarm,
+                name="SkinPrewarm_" + str(len(self._prewarm_workers)),
+            )
+            thread.daemon = True
+            thread.start()
+            self._prewarm_workers.append(thread)
+
+    def _run_prewarm(self):
+        """
+        Méthode run des threads de pré-calcul.
+        """
+        while True:
+            priority, seq, key = self._prewarm_queue.get()
+            with self._prewarm_lock:
+                if key not in self._prewarm_pending or key in self._prewarm_running:
+                    # tâche réalisée par le thread principal
+                    continue
+                self._prewarm_running.add(key)
+            try:
+                tag, cat, name, size = key
+                if not self.image_cache.contains((cat, name, size)):
+                    pilimg = self._resample(cat, name, size)
+                    nbytes = size[0] * size[1] * len(pilimg.getbands())
+                    self.image_cache.put(key, pilimg, nbytes)
+                    with self._prewarm_lock:
+                        self.prewarm_count += 1
+            finally:
+                self._release_prewarm_task(key)
+
+    def _release_prewarm_task(self, key):
+        """
+        Marque la tâche key comme achevée.
+        """
+        with self._prewarm_lock:
+            self._prewarm_running.discard(key)
+            event = self._prewarm_pending.pop(key, None)
+        if event != None:
+            event.set()
+
+    def is_image_pending(self, cat, name, size):
+        """
+        Indique si l'image (cat, name, size) est en cours de pré-calcul : la
+        demander bloquerait l'appelant.
+        """
+        if cat not in self._srcdict.keys() or name not in self._srcdict[cat].keys():
+            return False
+        srcsize = self.get_source_size(cat, name)
+        size = min(size, srcsize)
+        if self.image_cache.contains((cat, name, size)):
+            return False
+        if self.quantize_sizes:
+            size = self.quantize_size(size, maxsize=srcsize)
+            if self.image_cache.contains((cat, name, size)):
+                return False
+        with self._prewarm_lock:
+            return ("PIL", cat, name, size) in self._prewarm_pending
+
+    def is_case_image_pending(self, case, size):
+        """
+        Indique si l'image associée à la case (hors robots) est en cours de
+        pré-calcul à la taille size.
+        """
+        if len(self._prewarm_pending) == 0:
+            # optimisation : aucun pré-calcul en cours
+            return False
+        if case == None or case.type_case == LabHelper.CASE_ROBOT:
+            return False
+        name = self.get_image_name_for_case(case)
+        if name == None:
+            return False
+        return self.is_image_pending("carte", name, size)
+
+    def get_cache_stats(self):
+        """
+        Statistiques du cache d'images redimensionnées.
+        
+        Returns:
+            dict: voir ImageCache.get_stats, complété par "resamples" (nombre de
+            resample PIL) et "prewarmed" (dont pré-calculés)
+        """
+        stats = self.image_cache.get_stats()
+        stats["resamples"] = self.resample_count
+        stats["prewarmed"] = self.prewarm_count
+        stats["quantize"] = self.quantize_sizes
+        return stats
+
     def get_button_image(self, name, statenum):
         """
         Retourne l'image (taille fixe) associée au nom name et à l'indice
@@ -614,6 +906,27 @@ class SkinBase:
         * size : dimensions (w, h)
         * applyopt : indique si l'on prend en compte self.optmode
         
+        """
+        if case.type_case == LabHelper.CASE_ROBOT:
+            # méthode dédiée :
+            return self._get_image_for_bot(case, size, applyopt=applyopt)
+        name = self.get_image_name_for_case(case)
+        # retour de l'image associée :
+        imgexp = None
+        if name != None:
+            if name in ["transp", "null"]:
+                imgexp = self.get_image("common", name, size=size)
+            else:
+                imgexp = self.get_image("carte", name, size=size)
+        return imgexp
+
+    def get_image_name_for_case(self, case):
+        """
+        Retourne le nom de l'image (catégorie "carte") associée à une case hors
+        robots, ou None.
+        
+        * case : donnée objet de type lab.Case
+        
         """
         typecase = case.type_case
         name = None
@@ -649,9 +962,6 @@ class SkinBase:
                         name = "explosion_5"
                     else:
                         name = "vide"
-        elif typecase == LabHelper.CASE_ROBOT:
-            # méthode dédiée :
-            return self._get_image_for_bot(case, size, applyopt=applyopt)
         elif typecase == LabHelper.CASE_GRENADE:
             name = "grenade"
         elif typecase == LabHelper.CASE_DANGER:
@@ -679,14 +989,7 @@ class SkinBase:
                 name = "debug2"
             elif case.face == "3":
                 name = "debug3"
-        # retour de l'image associée :
-        imgexp = None
-        if name != None:
-            if name in ["transp", "null"]:
-                imgexp = self.get_image("common", name, size=size)
-            else:
-                imgexp = self.get_image("carte", name, size=size)
-        return imgexp
+        return name
 
     def _get_image_for_bot(self, case, size, applyopt=True):
         """
@@ -828,3 +1131,49 @@ class SkinBase:
         for dictimg in self._srcdict["loading"].values():
             rlist.append(dictimg["exportimg"])
         return rlist
+
+
+class ResizeBatch:
+    """
+    Suivi d'un lot de redimensionnements pré-calculés (voir SkinBase.prewarm).
+    """
+
+    def __init__(self):
+        """
+        Constructeur
+        """
+        self._events = list()
+
+    def add_event(self, event):
+        """
+        Ajoute une tâche au lot (threading.Event levé à son achèvement).
+        """
+        self._events.append(event)
+
+    def get_tasks_count(self):
+        """
+        Nombre de tâches du lot.
+        """
+        return len(self._events)
+
+    def get_pending_count(self):
+        """
+        Nombre de tâches non achevées.
+        """
+        return len([e for e in self._events if not e.is_set()])
+
+    def is_done(self):
+        """
+        Indique si toutes les tâches du lot sont achevées.
+        """
+        for event in self._events:
+            if not event.is_set():
+                return False
+        return True
+
+    def wait(self):
+        """
+        Attend l'achèvement du lot.
+        """
+        for event in self._events:
+            event.wait()
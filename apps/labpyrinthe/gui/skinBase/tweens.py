@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Moteur d'animations interpolées** (tweens) des GUIs graphiques.
+
+* Tween : interpolation temporelle d'une valeur (nombre ou tuple de nombres)
+  entre deux bornes, avec fonction d'easing
+* TweenEngine : lecture simultanée de plusieurs tweens, cadencée par la boucle
+  graphique (voir GUIBase.allow_task_processing)
+* Easing : fonctions d'easing usuelles
+
+Les valeurs sont calculées à partir du temps écoulé (et non du nombre de
+frames) : la durée d'une animation est indépendante de la cadence d'affichage.
+"""
+# imports
+import time
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["Easing", "Tween", "TweenEngine"]
+# classes
+class Easing:
+    """
+    Fonctions d'easing : t dans [0, 1] -> progression dans [0, 1]
+    """
+
+    # statique :
+    LINEAR = "linear"  #: progression constante
+    EASE_IN_QUAD = "ease_in_quad"  #: accélération
+    EASE_OUT_QUAD = "ease_out_quad"  #: décélération
+    EASE_IN_OUT_QUAD = "ease_in_out_quad"  #: accélération puis décélération
+    EASE_IN_OUT_CUBIC = "ease_in_out_cubic"  #: idem, plus marqué
+    # méthodes
+    def linear(cls, t):
+        """
+        Progression constante.
+        """
+        return t
+
+    linear = classmethod(linear)
+
+    def ease_in_quad(cls, t):
+        """
+        Accélération.
+        """
+        return t * t
+
+    ease_in_quad = classmethod(ease_in_quad)
+
+    def ease_out_quad(cls, t):
+        """
+        Décélération.
+        """
+        return t * (2 - t)
+
+    ease_out_quad = classmethod(ease_out_quad)
+
+    def ease_in_out_quad(cls, t):
+        """
+        Accélération puis décélération.
+        """
+        if t < 0.5:
+            return 2 * t * t
+        return -1 + (4 - 2 * t) * t
+
+    ease_in_out_quad = classmethod(ease_in_out_quad)
+
+    def ease_in_out_cubic(cls, t):
+        """
+        Accélération puis décélération (cubique).
+        """
+        if t < 0.5:
+            return 4 * t * t * t
+        return (t - 1) * (2 * t - 2) * (2 * t - 2) + 1
+
+    ease_in_out_cubic = classmethod(ease_in_out_cubic)
+
+    def get_function(cls, easing):
+        """
+        Retourne la fonction d'easing associée au nom easing (ou easing s'il
+        s'agit déjà d'une fonction). Linéaire par défaut.
+        """
+        if callable(easing):
+            return easing
+        if easing in [
+            Easing.EASE_IN_QUAD,
+            Easing.EASE_OUT_QUAD,
+            Easing.EASE_IN_OUT_QUAD,
+            Easing.EASE_IN_OUT_CUBIC,
+        ]:
+            return getattr(cls, easing)
+        return cls.linear
+
+    get_function = classmethod(get_function)
+
+
+class Tween:
+    """
+    Interpolation temporelle d'une valeur.
+    """
+
+    def __init__(
+        self,
+        start,
+        end,
+        duration,
+        onupdate=None,
+        oncomplete=None,
+        easing=Easing.LINEAR,
+        key=None,
+        delay=0,
+    ):
+        """
+        Constructeur
+
+        Args:
+            start, end (number ou tuple): valeurs initiale et finale
+            duration (float): durée en secondes
+            onupdate (callable): appelée avec la valeur courante à chaque étape
+            oncomplete (callable): appelée sans argument en fin d'animation
+            easing (str ou callable): voir Easing
+            key (hashable): identifiant de la cible, un nouveau tween de même
+                clef achève le précédent (voir TweenEngine.add_tween)
+            delay (float): délai avant démarrage en secondes
+        """
+        self.start = start
+        self.end = end
+        self.duration = max(0, duration)
+        self.onupdate = onupdate
+        self.oncomplete = oncomplete
+        self.easing = Easing.get_function(easing)
+        self.key = key
+        self.delay = max(0, delay)
+        # lecture :
+        self.starttime = None
+        self.finished = False
+
+    def begin(self, now):
+        """
+        Démarre le tween à l'instant now et publie la valeur initiale.
+        """
+        self.starttime = now + self.delay
+        if self.delay == 0 and self.onupdate != None:
+            self.onupdate(self.start)
+
+    def step(self, now):
+        """
+        Publie la valeur à l'instant now.
+
+        Returns:
+            boolean: True si l'animation est achevée (valeur finale publiée)
+        """
+        if self.finished:
+            return True
+        elapsed = now - self.starttime
+        if elapsed < 0:
+            return False
+        if elapsed >= self.duration:
+            self.finish(complete=False)
+            return True
+        if self.onupdate != None:
+            progress = self.easing(elapsed / self.duration)
+            self.onupdate(self.get_value(progress))
+        return False
+
+    def finish(self, complete=True):
+        """
+        Achève l'animation : publie la valeur finale.
+
+        Args:
+            complete (bool): appelle oncomplete
+        """
+        if not self.finished:
+            self.finished = True
+            if self.onupdate != None:
+                self.onupdate(self.end)
+        if complete:
+            self.complete()
+
+    def complete(self):
+        """
+        Appelle oncomplete (une seule fois).
+        """
+        oncomplete = self.oncomplete
+        self.oncomplete = None
+        if oncomplete != None:
+            oncomplete()
+
+    def get_value(self, progress):
+        """
+        Valeur interpolée pour une progression dans [0, 1].
+        """
+        if isinstance(self.start, tuple):
+            return tuple(
+                [s + (e - s) * progress for s, e in zip(self.start, self.end)]
+            )
+        return self.start + (self.end - self.start) * progress
+
+
+class TweenEngine:
+    """
+    Lecture simultanée de tweens, cadencée par des appels à update.
+    """
+
+    def __init__(self):
+        """
+        Constructeur
+        """
+        self._tweens = list()
+        self._keys = dict()
+
+    def add_tween(self, tween, now=None):
+        """
+        Démarre un tween. Un tween en cours de même clef est achevé au préalable.
+
+        Returns:
+            Tween
+        """
+        if now == None:
+            now = time.perf_counter()
+        if tween.key != None and tween.key in self._keys:
+            self._remove(self._keys[tween.key]).finish()
+        self._tweens.append(tween)
+        if tween.key != None:
+            self._keys[tween.key] = tween
+        tween.begin(now)
+        return tween
+
+    def update(self, now=None):
+        """
+        Fait progresser l'ensemble des tweens (à appeler à chaque frame).
+
+        Returns:
+            int: nombre de tweens achevés
+        """
+        if len(self._tweens) == 0:
+            return 0
+        if now == None:
+            now = time.perf_counter()
+        finished = list()
+        for tween in list(self._tweens):
+            if tween.step(now):
+                finished.append(self._remove(tween))
+        # callbacks de fin (peuvent démarrer de nouveaux tweens) :
+        for tween in finished:
+            tween.complete()
+        return len(finished)
+
+    def finish_all(self):
+        """
+        Achève immédiatement l'ensemble des tweens.
+        """
+        while len(self._tweens) > 0:
+            self._remove(self._tweens[0]).finish()
+
+    def cancel_all(self):
+        """
+        Interrompt l'ensemble des tweens (sans valeur finale ni callback).
+        """
+        self._tweens = list()
+        self._keys = dict()
+
+    def is_running(self):
+        """
+        Indique si des tweens sont en cours.
+        """
+        return len(self._tweens) > 0
+
+    def get_tweens_count(self):
+        """
+        Nombre de tweens en cours.
+        """
+        return len(self._tweens)
+
+    def _remove(self, tween):
+        """
+        Retire un tween de la lecture.
+        """
+        if tween in self._tweens:
+            self._tweens.remove(tween)
+        if tween.key != None and self._keys.get(tween.key, None) == tween:
+            del self._keys[tween.key]
+        return tween
@@ -34,6 +34,10 @@ class ZoneCarteBase(AbstractZoneCarte):
     BASE_CASE_LAYER = "BASE_CASE_LAYER" #: couche de base des cases
     # types de cases de la couche de base
     BASE_LAYER_TYPECASES = None #: types des cases de la couche de base
+    # modes de publication complète de la carte :
+    FULL_PUBLISHMODE = "FULL_PUBLISHMODE" #: toutes les cases sont re-publiées
+    INCREMENTAL_PUBLISHMODE = "INCREMENTAL_PUBLISHMODE" #: seules les cases modifiées sont re-publiées
+    PUBLISHMODE = INCREMENTAL_PUBLISHMODE #: mode de publication par défaut
     # méthodes
     def __init__(self, Mngr, skin, ItemObjectClass, **kwargs):
         """
@@ -42,7 +46,9 @@ class ZoneCarteBase(AbstractZoneCarte):
         Args:
             ItemObjectClass : implémentation dédiée de ItemObjectBase
             kwargs : logperf (bool: indique si l'on mesure les perfs d'affichage), 
-                max_casesize (int: par défaut 40)
+                max_casesize (int: par défaut 40), publishmode (str: 
+                ZoneCarteBase.FULL_PUBLISHMODE ou ZoneCarteBase.INCREMENTAL_PUBLISHMODE,
+                par défaut ZoneCarteBase.PUBLISHMODE)
         
         """
         # ZonePartie :
@@ -59,6 +65,10 @@ class ZoneCarteBase(AbstractZoneCarte):
             self.max_casesize = kwargs["max_casesize"]
         else:
             self.max_casesize = 40
+        if "publishmode" in kwargs:
+            self.publishmode = kwargs["publishmode"]
+        else:
+            self.publishmode = ZoneCarteBase.PUBLISHMODE
         # Données de publication :
         self.carte_published = False
         self.lastcontentdict = None
@@ -66,12 +76,14 @@ class ZoneCarteBase(AbstractZoneCarte):
         self.carte_dimensions = (None, None)
         self.carte_repere = (None, None)
         self.casesize = (None, None)
+        self.resize_batch = None
         self.highlighted_bot = None
         # Structure interne :
         self.layersdict = None
         self.casetype_datas = None
         self.layers_by_dict = None
         self.layers_of_shapes = None
+        self.layers_synchronized = None
         self.zindexslist = None
         self._init_virtual_layers()
 
@@ -102,6 +114,7 @@ class ZoneCarteBase(AbstractZoneCarte):
         self.carte_dimensions = (None, None)
         self.carte_repere = (None, None)
         self.casesize = (None, None)
+        self.resize_batch = None
         self.highlighted_bot = None
 
     #-----> Initialisation des couches
@@ -154,6 +167,16 @@ class ZoneCarteBase(AbstractZoneCarte):
             LabHelper.CASE_GRENADE,
             LabHelper.CASE_ANIMATION,
             LabHelper.CASE_TARGET,
+            LabHelper.CASE_DEBUG,
+        ]
+        # couches dont les items absents d'une publication complète sont
+        # supprimés (INCREMENTAL_PUBLISHMODE) :
+        self.layers_synchronized = [
+            ZoneCarteBase.BASE_CASE_LAYER,
+            LabHelper.CASE_DANGER,
+            LabHelper.CASE_BONUS,
+            LabHelper.CASE_ROBOT,
+            LabHelper.CASE_GRENADE,
         ]
         self.layersdict = dict()
         self.init_layersdict(firstinit=True)
@@ -281,6 +304,7 @@ class ZoneCarteBase(AbstractZoneCarte):
                 self.casesize = self.compute_caze_size(w, h)
                 if self.casesize != prev_size:
                     dochange = True
+                    self.prepare_case_images([item.case for item in listitems])
                     self.on_case_size_changed(listitems)
                 # ref x,y :
                 prev_repere = None, None
@@ -301,6 +325,41 @@ class ZoneCarteBase(AbstractZoneCarte):
                 # callback
                 self.on_carte_geometry_updated()
 
+    def prepare_case_images(self, listcases):
+        """
+        Lance le pré-calcul groupé (voir SkinBase.prewarm) des images des cases à
+        la taille self.casesize : un resample par nom d'image distinct, suivi par
+        self.resize_batch. Les autres images de la carte (robots...) sont
+        pré-calculées en priorité basse.
+        
+        Args:
+            listcases (list): cases à afficher
+        """
+        names = set()
+        for case in listcases:
+            if case != None and case.type_case != LabHelper.CASE_ROBOT:
+                name = self.skin.get_image_name_for_case(case)
+                if name != None:
+                    names.add(name)
+        self.resize_batch = self.skin.prewarm(self.casesize, names=list(names))
+        self.skin.prewarm(self.casesize, priority=3)
+
+    def check_resize_batch(self):
+        """
+        Appelée périodiquement (boucle graphique) : déclenche on_resize_batch_done
+        lorsque les images du lot self.resize_batch sont prêtes.
+        """
+        if self.resize_batch != None and self.resize_batch.is_done():
+            self.resize_batch = None
+            self.on_resize_batch_done()
+
+    def on_resize_batch_done(self):
+        """
+        Appelée lorsque les images pré-calculées à la taille des cases sont
+        prêtes.
+        """
+        # à subclasser
+
     def on_carte_geometry_updated(self):
         """
         Appelée lorsque self.casesize et self.carte_repere ont
@@ -509,23 +568,92 @@ class ZoneCarteBase(AbstractZoneCarte):
         # dimensions :
         if not self.carte_dimensions_initialized:
             self.init_carte_dimensions(w, h)
+            listcases = list()
+            for mat in listmatrices:
+                listcases.extend(mat.get_list_cases())
+            self.prepare_case_images(listcases)
         # ré init couche animation :
         self.clear_layer(LabHelper.CASE_ANIMATION)
         # Formes :
         self.update_shapes()
         # publication statique:
-        nbchange = 0
-        for mat in listmatrices:
-            lc = mat.get_list_cases()
-            for c in lc:
-                self.set_case(c)
-                nbchange += 1
+        if self.publishmode == ZoneCarteBase.INCREMENTAL_PUBLISHMODE:
+            nbchange = self._publish_cases_incremental(listmatrices)
+        else:
+            nbchange = 0
+            for mat in listmatrices:
+                lc = mat.get_list_cases()
+                for c in lc:
+                    self.set_case(c)
+                    nbchange += 1
         # post traitement spécifique :
         self.on_carte_published()
         self.carte_published = True
         # Callback parent (Partie) :
         self.Mngr.on_carte_published()
 
+    def _publish_cases_incremental(self, listmatrices):
+        """
+        Publication complète par différence : seuls les items dont la signature
+        (voir get_case_signature) diffère de celle de la case publiée sont mis à
+        jour, les items des couches self.layers_synchronized absents des
+        matrices sont supprimés.
+        
+        Args:
+            listmatrices (list): matrices de la publication
+            
+        Returns:
+            int: nombre de cases mises à jour
+        """
+        nbchange = 0
+        geometry = (self.casesize, self.carte_repere)
+        published = dict()
+        for mat in listmatrices:
+            for c in mat.get_list_cases():
+                layername = self.get_layername_for_case(c)
+                itkey = self.get_item_key_for_case(c)
+                if layername not in published:
+                    published[layername] = set()
+                published[layername].add(itkey)
+                # comparaison avec l'item affiché :
+                signature = self.get_case_signature(c, geometry)
+                item = self.layersdict[layername].get(itkey, None)
+                if item != None and signature != None and item.signature == signature:
+                    continue
+                self.set_case(c)
+                nbchange += 1
+        # items obsolètes :
+        for layername in self.layers_synchronized:
+            itdict = self.layersdict[layername]
+            keys = published.get(layername, set())
+            obsoletes = [item for itkey, item in itdict.items() if itkey not in keys]
+            for item in obsoletes:
+                self.delete_case(item.case)
+        return nbchange
+
+    def get_case_signature(self, case, geometry):
+        """
+        Signature de l'affichage d'une case (INCREMENTAL_PUBLISHMODE) : un item
+        de même signature n'est pas re-publié.
+        
+        Args:
+            case (Case)
+            geometry (tuple): (self.casesize, self.carte_repere)
+            
+        Returns:
+            tuple ou None si la case doit toujours être re-publiée (robots)
+        """
+        if case.type_case == LabHelper.CASE_ROBOT:
+            return None
+        return (
+            geometry,
+            case.type_case,
+            case.x,
+            case.y,
+            case.visible,
+            self.skin.get_image_name_for_case(case),
+        )
+
     def on_carte_published(self):
         """
         Traitements spécifiques en fin de publication.
@@ -614,6 +742,8 @@ class ZoneCarteBase(AbstractZoneCarte):
         item = self.get_item_for_case(case)
         if item == None:
             item = self.set_case(case)
+        # position hors case : signature obsolète
+        item.signature = None
         xr, yr = self.convert_case_coords(x, y)
         item.set_real_coords(xr, yr)
 
@@ -697,6 +827,18 @@ class ZoneCarteBase(AbstractZoneCarte):
             item = None
         return item
 
+    def get_item_key_for_case(self, case):
+        """
+        Retourne la clef de l'item associé à la case dans sa couche (couches
+        de self.layers_by_dict).
+        """
+        if case.type_case == LabHelper.CASE_ROBOT:
+            return case.uid
+        elif case.type_case == LabHelper.CASE_GRENADE:
+            return case.cuid
+        # par défaut la clef est (x, y)
+        return (case.x, case.y)
+
     def get_layername_for_case(self, case):
         """
         Retourne le nom de la couche associée à la case
@@ -797,6 +939,9 @@ class ZoneCarteBase(AbstractZoneCarte):
         """
         # case :
         itemobj.set_case(case)
+        itemobj.signature = self.get_case_signature(
+            case, (self.casesize, self.carte_repere)
+        )
         # vue graphique :
         self.update_item_view(itemobj)
         # autres paramètres :
@@ -906,6 +1051,8 @@ class ItemObjectBase:
         self.z = None
         # ref à l'image générée par le skin:
         self.skinImg = None
+        # signature de la case publiée (ZoneCarteBase.INCREMENTAL_PUBLISHMODE) :
+        self.signature = None
 
     def create_view(self):
         """
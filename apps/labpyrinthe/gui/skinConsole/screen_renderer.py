@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sortie des écrans de l'interface console.
+
+* mode FULL_MODE : chaque écran est réimprimé en entier (comportement historique)
+* mode DIFF_MODE : l'écran précédent est conservé, seuls les segments de lignes
+  modifiés sont émis via le positionnement du curseur ANSI
+
+Le mode différentiel n'est retenu par défaut que si la sortie est un terminal
+supportant les séquences ANSI, sinon (redirection vers un fichier, log, TERM=dumb)
+l'écran est réimprimé en entier.
+"""
+# imports :
+import os
+import sys
+import shutil
+import threading
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["ScreenRenderer"]
+# classes :
+class ScreenRenderer:
+    """
+    Imprime les écrans de GUIConsole en mode complet ou différentiel.
+    """
+
+    # statique :
+    FULL_MODE = "FULL_MODE" #: réimpression complète des écrans
+    DIFF_MODE = "DIFF_MODE" #: émission des seules modifications (ANSI)
+    RESYNC_FRAMES = 200 #: réimpression complète périodique en mode DIFF_MODE
+    CSI = "\x1b[" #: préfixe des séquences de contrôle ANSI
+    # méthodes :
+    def __init__(self, stream=None, mode=None):
+        """
+        Constructeur
+
+        Args:
+            stream (file): flux de sortie (sys.stdout par défaut)
+            mode (str): ScreenRenderer.FULL_MODE ou ScreenRenderer.DIFF_MODE
+                (déterminé par supports_ansi par défaut)
+        """
+        self._stream = stream
+        if mode == None:
+            if ScreenRenderer.supports_ansi(self.get_stream()):
+                mode = ScreenRenderer.DIFF_MODE
+            else:
+                mode = ScreenRenderer.FULL_MODE
+        self.mode = mode
+        # écran précédent (liste de lignes) :
+        self._prev_lines = None
+        self._prev_screen = None
+        self._frames_count = 0
+        # impressions depuis plusieurs threads (GUI, input) :
+        self._lock = threading.Lock()
+        # stats :
+        self.chars_written = 0
+        self.full_redraws = 0
+
+    def supports_ansi(cls, stream):
+        """
+        Indique si le flux stream est un terminal supportant les séquences ANSI.
+        """
+        try:
+            if not stream.isatty():
+                return False
+        except (AttributeError, ValueError):
+            return False
+        term = os.environ.get("TERM", "")
+        if term == "dumb":
+            return False
+        if os.name == "nt":
+            # consoles Windows récentes (Windows Terminal, ConEmu, ANSICON)
+            return (
+                "WT_SESSION" in os.environ
+                or "ANSICON" in os.environ
+                or os.environ.get("ConEmuANSI", "") == "ON"
+            )
+        return term != ""
+
+    supports_ansi = classmethod(supports_ansi)
+
+    def get_stream(self):
+        """
+        Retourne le flux de sortie (sys.stdout évalué à l'usage).
+        """
+        if self._stream != None:
+            return self._stream
+        return sys.stdout
+
+    def is_diff_mode(self):
+        """
+        Indique si le rendu différentiel est actif.
+        """
+        return self.mode == ScreenRenderer.DIFF_MODE
+
+    def reset(self):
+        """
+        Oublie l'écran précédent : le prochain écran sera réimprimé en entier.
+        """
+        with self._lock:
+            self._prev_lines = None
+            self._prev_screen = None
+
+    #-----> Rendu
+    def render(self, screen):
+        """
+        Imprime l'écran screen (str multi lignes), rien s'il est identique au
+        précédent.
+        """
+        with self._lock:
+            if screen == self._prev_screen:
+                return
+            self._prev_screen = screen
+            if not self.is_diff_mode():
+                self._write(screen + "\n")
+                self.full_redraws += 1
+                return
+            lines = screen.split("\n")
+            self._frames_count += 1
+            if (
+                self._prev_lines == None
+                or self._frames_count % ScreenRenderer.RESYNC_FRAMES == 0
+                or not self._fits_terminal(lines)
+            ):
+                out = self._get_full_output(lines)
+                self.full_redraws += 1
+            else:
+                out = self._get_diff_output(self._prev_lines, lines)
+            self._prev_lines = lines
+            self._write(out)
+
+    def _fits_terminal(self, lines):
+        """
+        Indique si l'écran et la ligne d'input tiennent dans le terminal (le
+        positionnement absolu n'est plus fiable en cas de défilement).
+        """
+        rows = shutil.get_terminal_size().lines
+        return len(lines) + 1 < rows
+
+    def _get_full_output(self, lines):
+        """
+        Effacement du terminal puis impression de toutes les lignes.
+        """
+        csi = ScreenRenderer.CSI
+        return csi + "2J" + csi + "H" + "\n".join(lines) + "\n"
+
+    def _get_diff_output(self, prev_lines, lines):
+        """
+        Séquence ANSI réécrivant les seuls segments modifiés de chaque ligne.
+        """
+        csi = ScreenRenderer.CSI
+        out = list()
+        nbold = len(prev_lines)
+        nbnew = len(lines)
+        for i in range(max(nbold, nbnew)):
+            old = prev_lines[i] if i < nbold else ""
+            new = lines[i] if i < nbnew else ""
+            if old == new:
+                continue
+            # premier caractère modifié :
+            start = 0
+            maxstart = min(len(old), len(new))
+            while start < maxstart and old[start] == new[start]:
+                start += 1
+            if len(old) == len(new):
+                # dernier caractère modifié :
+                end = len(new)
+                while end > start and old[end - 1] == new[end - 1]:
+                    end -= 1
+                segment = new[start:end]
+            else:
+                segment = new[start:]
+                if len(new) < len(old):
+                    # effacement de la fin de ligne :
+                    segment += csi + "K"
+            out.append(csi + str(i + 1) + ";" + str(start + 1) + "H" + segment)
+        # curseur sous l'écran (ligne d'input) :
+        out.append(csi + str(nbnew + 1) + ";1H")
+        return "".join(out)
+
+    def _write(self, txt):
+        """
+        Ecriture sur le flux de sortie.
+        """
+        stream = self.get_stream()
+        stream.write(txt)
+        stream.flush()
+        self.chars_written += len(txt)
+
+    def get_stats(self):
+        """
+        Statistiques de sortie.
+
+        Returns:
+            dict: {"mode":, "chars_written":, "full_redraws":}
+        """
+        return {
+            "mode": self.mode,
+            "chars_written": self.chars_written,
+            "full_redraws": self.full_redraws,
+        }
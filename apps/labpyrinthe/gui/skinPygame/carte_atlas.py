@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atlas de tuiles de la carte : implémentation Pygame.
+
+Regroupe dans une surface unique les images des cases à une taille donnée
+(une tuile par nom d'image du skin, voir SkinBase.get_image_name_for_case).
+Utilisé par le mode de rendu ZoneCarte.ATLAS_RENDERMODE pour composer les
+couches statiques de la carte dans une surface de fond.
+"""
+# imports :
+import math
+import pygame
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["CaseAtlas"]
+# classe :
+class CaseAtlas:
+    """
+    Atlas des images de cases à la taille tilesize.
+    """
+
+    # statique :
+    COLUMNS = 8  #: nombre de tuiles par ligne de l'atlas
+    STATIC_NAMES = [
+        "mur_ext",
+        "mur",
+        "vide",
+        "porte",
+        "sortie",
+        "bonus",
+        "mine_1",
+        "mine_5",
+        "mine_9",
+        "mine_13",
+        "mine_17",
+        "mine_25",
+    ]  #: images pré-calculées à la création de l'atlas (couches statiques)
+    # méthodes :
+    def __init__(self, skin, tilesize, names=None):
+        """
+        Constructeur
+
+        Args:
+            skin (SkinPygame)
+            tilesize (tuple): dimensions (w, h) des tuiles
+            names (list): noms d'images à pré-calculer (CaseAtlas.STATIC_NAMES
+                par défaut)
+        """
+        self.skin = skin
+        self.tilesize = int(tilesize[0]), int(tilesize[1])
+        # surface de l'atlas et rects des tuiles :
+        self.surface = None
+        self._tiles = dict()
+        self._capacity = 0
+        # pré calcul :
+        if names == None:
+            names = CaseAtlas.STATIC_NAMES
+        self._grow(len(names))
+        for name in names:
+            self.get_tile(name)
+
+    def get_tile(self, name):
+        """
+        Retourne le rect de la tuile name dans self.surface (ajoutée au besoin),
+        ou None si le skin ne fournit pas d'image.
+
+        Args:
+            name (str): nom d'image de la catégorie "carte"
+
+        Returns:
+            pygame.Rect
+        """
+        rect = self._tiles.get(name, None)
+        if rect == None and name != None:
+            rect = self._add_tile(name)
+        return rect
+
+    def blit_tile(self, dest, name, pos):
+        """
+        Copie la tuile name sur la surface dest aux coordonnées pos.
+
+        Returns:
+            boolean: False si la tuile n'existe pas
+        """
+        rect = self.get_tile(name)
+        if rect == None:
+            return False
+        dest.blit(self.surface, pos, area=rect)
+        return True
+
+    def get_tiles_count(self):
+        """
+        Nombre de tuiles de l'atlas.
+        """
+        return len(self._tiles)
+
+    def _add_tile(self, name):
+        """
+        Ajoute une tuile à l'atlas.
+        """
+        img = self.skin.get_image("carte", name, size=self.tilesize)
+        if img == None:
+            return None
+        if len(self._tiles) >= self._capacity:
+            self._grow(max(CaseAtlas.COLUMNS, self._capacity))
+        rect = self._get_rect_for_index(len(self._tiles))
+        # Rq : blit sur une zone transparente = copie exacte (alpha compris)
+        self.surface.fill((0, 0, 0, 0), rect)
+        self.surface.blit(img, rect.topleft)
+        self._tiles[name] = rect
+        return rect
+
+    def _get_rect_for_index(self, index):
+        """
+        Rect de la tuile d'indice index.
+        """
+        wt, ht = self.tilesize
+        col = index % CaseAtlas.COLUMNS
+        row = index // CaseAtlas.COLUMNS
+        return pygame.Rect(col * wt, row * ht, wt, ht)
+
+    def _grow(self, count):
+        """
+        Agrandit l'atlas de count tuiles (par lignes entières).
+        """
+        wt, ht = self.tilesize
+        capacity = self._capacity + count
+        rows = math.ceil(capacity / CaseAtlas.COLUMNS)
+        self._capacity = rows * CaseAtlas.COLUMNS
+        newsurf = pygame.Surface(
+            (CaseAtlas.COLUMNS * wt, rows * ht), flags=pygame.SRCALPHA
+        )
+        newsurf.fill((0, 0, 0, 0))
+        if self.surface != None:
+            newsurf.blit(self.surface, (0, 0))
+        self.surface = newsurf
@@ -25,6 +25,8 @@ class SkinPygame(SkinBase):
     SCALE_RESIZEMODE = "SCALE_RESIZEMODE"  #: scaling surface
     SKIN_RESIZEMODE = "SKIN_RESIZEMODE"  #: recalcul PIL + cache skin
     DEFAULT_RESIZEMODE = SCALE_RESIZEMODE  #: mode resize par défaut
+    # cache : resample PIL par paliers de taille, ajustement par pygame.transform
+    QUANTIZE_SIZES = True  #: quantification des tailles demandées (voir SkinBase)
     # types et couleurs zones dangers
     DGR_FACTOR_COLOR = {
         0: "#99CC00",
@@ -58,6 +60,23 @@ class SkinPygame(SkinBase):
         surf = pygame.image.frombuffer(data, size, mode)
         return surf
 
+    def get_exported_image_bytes(self, imgexp, size):
+        """
+        Poids (octets) d'une surface exportée.
+        """
+        w, h = imgexp.get_size()
+        return w * h * imgexp.get_bytesize()
+
+    def scale_exported_image(self, imgexp, size):
+        """
+        Mise à l'échelle d'une surface exportée (mode quantize_sizes).
+        """
+        try:
+            return pygame.transform.smoothscale(imgexp, size)
+        except ValueError:
+            # surfaces 8 bits non supportées par smoothscale
+            return pygame.transform.scale(imgexp, size)
+
     def convert_surface_for_PIL(self, surf):
         """
         Réciproque, convertit une surface Pygame en image PIL
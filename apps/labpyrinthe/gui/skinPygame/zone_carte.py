@@ -11,13 +11,22 @@ import labpyproject.core.pygame.widgets as wgt
 import labpyproject.apps.labpyrinthe.gui.skinPygame.uitools as uit
 from labpyproject.apps.labpyrinthe.bus.model.core_matrix import LabHelper, Case
 from labpyproject.apps.labpyrinthe.gui.skinPygame.skinPygame import SkinPygame
+from labpyproject.apps.labpyrinthe.gui.skinPygame.carte_atlas import CaseAtlas
 from labpyproject.apps.labpyrinthe.gui.skinBase.zone_carte_base import ZoneCarteBase
 from labpyproject.apps.labpyrinthe.gui.skinBase.zone_carte_base import ItemObjectBase
 from labpyproject.apps.labpyrinthe.gui.skinPygame.botview import BotView
 from labpyproject.apps.labpyrinthe.gui.skinBase.interfaces import AbstractSwitch
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
-__all__ = ["ZoneCarte", "ItemObject", "CaseView", "BotViewCarte", "ZoneDangerRobot"]
+__all__ = [
+    "ZoneCarte",
+    "ItemObject",
+    "CaseView",
+    "CarteBackground",
+    "BakedCaseView",
+    "BotViewCarte",
+    "ZoneDangerRobot",
+]
 # classes
 class ZoneCarte(wgt.Stack, ZoneCarteBase):
     """
@@ -27,13 +36,28 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
     # statique :
     MAX_CASE_SIZE = 80 #: taille max d'une case (cf sources png en 80*80)
     SHOW_TARGETS = False #: affichage de la cible du robot
+    # modes de rendu des cases :
+    SPRITE_RENDERMODE = "SPRITE_RENDERMODE" #: un sprite par case
+    ATLAS_RENDERMODE = "ATLAS_RENDERMODE" #: couches statiques pré-composées (atlas)
+    RENDERMODE = ATLAS_RENDERMODE #: mode de rendu par défaut
     # méthodes
-    def __init__(self, Mngr, skin, **kwargs):
+    def __init__(self, Mngr, skin, rendermode=None, **kwargs):
         """
         Constructeur
+        
+        Args:
+            rendermode (str): ZoneCarte.SPRITE_RENDERMODE ou ZoneCarte.ATLAS_RENDERMODE
+                (ZoneCarte.RENDERMODE par défaut)
         """
         # liste de recyclage dédiée aux items de cases robot :
         self._bots_recyclelist = None
+        # mode de rendu :
+        if rendermode == None:
+            rendermode = ZoneCarte.RENDERMODE
+        self.rendermode = rendermode
+        # fond des couches statiques (mode ATLAS_RENDERMODE) :
+        self.carte_background = None
+        self._baked_typecases = None
         # fond quadrillage :
         self.bg_quad = None
         # générique :
@@ -111,10 +135,43 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         Post initialisation d'une couche :
         pour activer la couche de façon permanente (pygame)
         """
+        if (
+            layername == ZoneCarteBase.BASE_CASE_LAYER
+            and self.rendermode == ZoneCarte.ATLAS_RENDERMODE
+        ):
+            # le fond des couches statiques active la couche :
+            self._create_carte_background(z)
+            return
         # Création d'un Customprite transparent :
         actspr = co.CustomSprite(width=1, height=1, local_layer=z)
         self.add_item(actspr)
 
+    #-----> Rendu par atlas (ATLAS_RENDERMODE)
+    def _create_carte_background(self, z):
+        """
+        Crée le sprite unique affichant les couches statiques (cases de base,
+        dangers, bonus).
+        """
+        self._baked_typecases = list(ZoneCarteBase.BASE_LAYER_TYPECASES)
+        self._baked_typecases.extend([LabHelper.CASE_DANGER, LabHelper.CASE_BONUS])
+        self.carte_background = CarteBackground(self, local_layer=z)
+        self.add_item(self.carte_background)
+
+    def is_baked_case(self, case):
+        """
+        Indique si la case est affichée dans le fond pré-composé.
+        """
+        if self.carte_background == None or case == None:
+            return False
+        return case.type_case in self._baked_typecases
+
+    def _update_carte_background(self):
+        """
+        Adapte le fond pré-composé à la géométrie de la carte.
+        """
+        if self.carte_background != None:
+            self.carte_background.update_geometry()
+
     #-----> Dimensions
     def get_canvas_dimensions(self):
         """
@@ -179,6 +236,9 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         # graphiques mettront eux mêmes leur contenu à jour
         wc, hc = self.casesize
         for itemobj in listitems:
+            if itemobj.baked:
+                # fond pré-composé : voir on_carte_geometry_updated
+                continue
             spriteobj = itemobj.graphobjref
             spriteobj.width = wc
             spriteobj.height = hc
@@ -192,6 +252,8 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         # du resize) induit par itemobj.set_real_coords dans la méthode initiale
         # de ZoneCarteBase.
         for itemobj in listitems:
+            if itemobj.baked:
+                continue
             case = itemobj.case
             xg, yg = self.get_real_coords_for_case(case)
             itemobj.graphobjref.x = xg
@@ -203,6 +265,8 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         """
         contentRect = self.get_content_rect()
         for itemobj in listitems:
+            if itemobj.baked:
+                continue
             spriteobj = itemobj.graphobjref
             # maj rect de publication parent (/ positionnement)
             spriteobj.publicationRefRect = contentRect
@@ -215,6 +279,20 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         été recalculés
         """
         self._discard_zone_robot_mask()
+        self._update_carte_background()
+
+    def on_resize_batch_done(self):
+        """
+        Les images pré-calculées sont prêtes : remplace en une fois les images
+        provisoires des cases.
+        """
+        for itemobj in self.get_all_items():
+            view = itemobj.graphobjref
+            if isinstance(view, CaseView) and view.placeholder:
+                view.refresh_surface()
+        # fond pré-composé (ATLAS_RENDERMODE) :
+        if self.carte_background != None and self.carte_background.placeholder:
+            self.carte_background.discard_display()
 
     def _discard_zone_robot_mask(self):
         """
@@ -418,6 +496,10 @@ class ZoneCarte(wgt.Stack, ZoneCarteBase):
         """
         Mise à jour du contenu graphique associé à l'item
         """
+        if itemobj.baked:
+            # tuile de l'atlas :
+            itemobj.graphobjref.change_case(itemobj.case)
+            return
         case = itemobj.case
         typecase = case.type_case
         # BotView : modification des images lors de la définition de la case
@@ -458,6 +540,8 @@ class ItemObject(ItemObjectBase):
             x=x,
             y=y,
         )
+        # case affichée dans le fond pré-composé (ATLAS_RENDERMODE) :
+        self.baked = False
 
     def create_view(self):
         """
@@ -466,6 +550,13 @@ class ItemObject(ItemObjectBase):
         """
         if self.case != None:
             typecase = self.case.type_case
+            if self.zonecarte.is_baked_case(self.case):
+                # tuile du fond pré-composé, pas de sprite :
+                self.baked = True
+                self.graphobjref = BakedCaseView(
+                    self.zonecarte.carte_background, self.case, self.z
+                )
+                return
             if typecase == LabHelper.CASE_ROBOT:
                 # BotViewCarte :
                 self.graphobjref = BotViewCarte(
@@ -487,6 +578,8 @@ class ItemObject(ItemObjectBase):
         Supprime la vue graphique de self.case
         """
         self.set_case(None)
+        if self.baked:
+            return
         if isinstance(self.graphobjref, BotViewCarte):
             zoneitem = self.graphobjref.zone_danger
             zoneitem.delete_view()
@@ -506,6 +599,8 @@ class ItemObject(ItemObjectBase):
         """
         # enregistrement de la ref :
         ItemObjectBase.set_current_image(self, imgskin)
+        if self.baked:
+            return
         # dimensions :
         wc, hc = self.zonecarte.casesize
         self.graphobjref.width = wc
@@ -525,6 +620,9 @@ class ItemObject(ItemObjectBase):
         """
         self.graphobjref.x = realx
         self.graphobjref.y = realy
+        if self.baked:
+            # position dans le fond : coordonnées de la case
+            return
         # update
         self.graphobjref.update_publicationRect()
 
@@ -533,7 +631,10 @@ class ItemObject(ItemObjectBase):
         Affiche ou masque la vue graphique.
         * show : bool
         """
-        self.graphobjref.visible = show
+        if self.baked:
+            self.graphobjref.set_visible(show)
+        else:
+            self.graphobjref.visible = show
 
 
 class CaseView(wgt.Image):
@@ -560,6 +661,8 @@ class CaseView(wgt.Image):
         self.case = None
         # mode de resize :
         self.resizemode = resizemode
+        # image provisoire affichée durant le pré-calcul du skin :
+        self.placeholder = False
         # générique :
         wgt.Image.__init__(self, surface=None, fixed=False, **kwargs)
         # initialisation de la source :
@@ -585,13 +688,38 @@ class CaseView(wgt.Image):
         newsurf = None
         if newsize != (0, 0):
             if self.resizemode == SkinPygame.SKIN_RESIZEMODE:
-                # spécifique : génération de l'image resizée via PIL
-                newsurf = self.skin.get_image_for_case(self.case, size=newsize)
+                self.placeholder = self.skin.is_case_image_pending(self.case, newsize)
+                if self.placeholder:
+                    # resample en cours (voir ZoneCarte.on_resize_batch_done)
+                    newsurf = self.get_placeholder_surface(newsize)
+                else:
+                    # spécifique : génération de l'image resizée via PIL
+                    newsurf = self.skin.get_image_for_case(self.case, size=newsize)
             elif self.resizemode == SkinPygame.SCALE_RESIZEMODE:
                 # générique : via rescale de la surface source
                 newsurf = wgt.Image.get_surface_for_size(self, newsize)
         return newsurf
 
+    def get_placeholder_surface(self, newsize):
+        """
+        Image provisoire : mise à l'échelle rapide (sans lissage) de l'image
+        courante.
+        """
+        surf = self.current_surface
+        if surf == None:
+            surf = self.source_surface
+        if surf == None:
+            return None
+        return pygame.transform.scale(surf, newsize)
+
+    def refresh_surface(self):
+        """
+        Recrée l'image courante (remplacement de l'image provisoire).
+        """
+        self.current_surface = None
+        self.create_current_surface()
+        self.discard_display()
+
     def get_source_size(self):
         """
         Retourne les dimensions de la source
@@ -599,6 +727,262 @@ class CaseView(wgt.Image):
         return ZoneCarte.MAX_CASE_SIZE, ZoneCarte.MAX_CASE_SIZE
 
 
+class CarteBackground(wgt.Image):
+    """
+    Sprite unique affichant les couches statiques de la carte (cases de base,
+    dangers, bonus) en mode ZoneCarte.ATLAS_RENDERMODE. 
+    
+    Les tuiles (CaseAtlas) sont composées dans une surface de la taille de la
+    carte : seules les cellules modifiées sont recomposées, la surface n'est
+    entièrement recalculée que lorsque la taille des cases change.
+
+    Après un changement de taille des cases, la recomposition est différée
+    jusqu'à la fin du lot de resample (ZoneCarte.resize_batch) : le fond
+    précédent mis à l'échelle sert d'image provisoire, le thread graphique
+    n'attend pas les images du skin.
+    """
+
+    def __init__(self, zonecarte, **kwargs):
+        """
+        Constructeur
+        
+        Args:
+            zonecarte (ZoneCarte)
+            kwargs : voir wgt.Image
+        """
+        self.zonecarte = zonecarte
+        # atlas à la taille courante des cases :
+        self.atlas = None
+        # vues par cellule : {(x, y): {z: BakedCaseView}}
+        self._cells = dict()
+        self._dirty_cells = set()
+        self._rebake = True
+        # géométrie : (casesize, dimensions de la carte)
+        self._geometry = None
+        self._baked_geometry = None
+        # fond provisoire en attendant le lot de resample :
+        self.placeholder = False
+        # générique :
+        wgt.Image.__init__(
+            self, surface=None, fixed=True, position="absolute", **kwargs
+        )
+        self.visible = False
+
+    #-----> Cellules
+    def add_view(self, view):
+        """
+        Enregistre une vue dans sa cellule.
+        """
+        self._cells.setdefault(view.cell, dict())[view.z] = view
+        self.discard_cell(view.cell)
+
+    def remove_view(self, view):
+        """
+        Supprime une vue de sa cellule.
+        """
+        views = self._cells.get(view.cell, None)
+        if views != None and views.get(view.z, None) == view:
+            del views[view.z]
+            if len(views) == 0:
+                del self._cells[view.cell]
+            self.discard_cell(view.cell)
+
+    def discard_cell(self, cell):
+        """
+        Marque une cellule à recomposer au prochain affichage.
+        """
+        self._dirty_cells.add(cell)
+        self.discard_display()
+
+    def get_cells_count(self):
+        """
+        Nombre de cellules occupées.
+        """
+        return len(self._cells)
+
+    #-----> Géométrie
+    def update_geometry(self):
+        """
+        Adapte position et dimensions à la géométrie de la carte (ZoneCarte).
+        """
+        zc = self.zonecarte
+        if zc.casesize == (None, None) or zc.carte_dimensions == (None, None):
+            return
+        wc, hc = int(zc.casesize[0]), int(zc.casesize[1])
+        nbw, nbh = zc.carte_dimensions
+        geometry = ((wc, hc), (nbw, nbh))
+        if geometry != self._geometry:
+            self._geometry = geometry
+            self._rebake = True
+        self.x, self.y = zc.carte_repere
+        self.width = nbw * wc
+        self.height = nbh * hc
+        self.publicationRefRect = zc.get_content_rect()
+        self.visible = True
+        self.resize()
+        self.discard_display()
+
+    #-----> Composition
+    def bake(self):
+        """
+        Recompose la surface de fond (cellules modifiées ou totalité).
+        """
+        if self._geometry == None:
+            return
+        (wc, hc), (nbw, nbh) = self._geometry
+        if self._rebake or self.source_surface == None:
+            if self._can_use_placeholder():
+                # resample des tuiles en cours (voir ZoneCarte.on_resize_batch_done) :
+                self._scale_placeholder((nbw * wc, nbh * hc))
+                return
+            if self.atlas == None or self.atlas.tilesize != (wc, hc):
+                self.atlas = CaseAtlas(
+                    self.zonecarte.skin, (wc, hc), names=self._get_tiles_names()
+                )
+            surf = pygame.Surface((nbw * wc, nbh * hc), flags=pygame.SRCALPHA)
+            surf.fill((0, 0, 0, 0))
+            for cell in self._cells.keys():
+                self._draw_cell(surf, cell)
+            self.source_surface = surf
+            self.current_surface = None
+            self._rebake = False
+            self._baked_geometry = self._geometry
+            self.placeholder = False
+        else:
+            for cell in self._dirty_cells:
+                self._draw_cell(self.source_surface, cell)
+        self._dirty_cells = set()
+
+    def _can_use_placeholder(self):
+        """
+        Indique si la recomposition complète peut être différée : lot de
+        resample en cours et fond précédent de la même carte (seule la taille
+        des cases a changé).
+        """
+        if self.zonecarte.resize_batch == None or self.source_surface == None:
+            return False
+        if self._baked_geometry == None:
+            return False
+        return self._baked_geometry[1] == self._geometry[1]
+
+    def _scale_placeholder(self, size):
+        """
+        Fond provisoire : mise à l'échelle rapide (sans lissage) du fond
+        précédent. Les cellules modifiées entre temps seront composées lors de
+        la recomposition complète.
+        """
+        if self.source_surface.get_size() != size:
+            self.source_surface = pygame.transform.scale(self.source_surface, size)
+            self.current_surface = None
+        self.placeholder = True
+
+    def _get_tiles_names(self):
+        """
+        Noms des tuiles utilisées par les cellules (pré-calcul de l'atlas).
+        """
+        names = set()
+        for views in self._cells.values():
+            for view in views.values():
+                if view.name != None:
+                    names.add(view.name)
+        return list(names)
+
+    def _draw_cell(self, surf, cell):
+        """
+        Compose une cellule : tuiles des vues visibles par zindex croissant.
+        """
+        wc, hc = self._geometry[0]
+        rect = pygame.Rect(cell[0] * wc, cell[1] * hc, wc, hc)
+        surf.fill((0, 0, 0, 0), rect)
+        views = self._cells.get(cell, None)
+        if views != None:
+            for z in sorted(views.keys()):
+                view = views[z]
+                if view.visible:
+                    self.atlas.blit_tile(surf, view.name, rect.topleft)
+
+    #-----> Surcharge de WImage :
+    def draw_display(self):
+        """
+        Dessine ou redessine l'objet.
+        """
+        if not self.visible:
+            return
+        self.bake()
+        wgt.Image.draw_display(self)
+
+    def get_surface_for_size(self, newsize):
+        """
+        La surface composée est déjà à la taille d'affichage.
+        """
+        return self.source_surface
+
+    def compute_image_size(self):
+        """
+        Taille de la surface composée.
+        """
+        return self.get_source_size()
+
+
+class BakedCaseView:
+    """
+    Vue d'une case statique sans sprite (ATLAS_RENDERMODE) : tuile de l'atlas
+    composée par CarteBackground dans la cellule de la case.
+    """
+
+    def __init__(self, background, case, z):
+        """
+        Constructeur
+        
+        Args:
+            background (CarteBackground)
+            case (Case)
+            z (int): zindex de la couche (ordre de composition dans la cellule)
+        """
+        self.background = background
+        self.z = z
+        self.case = None
+        self.name = None
+        self.cell = None
+        self.visible = True
+        # coordonnées réelles (interface commune aux vues, voir ItemObject) :
+        self.x = None
+        self.y = None
+        self.change_case(case)
+
+    def change_case(self, case):
+        """
+        Met à jour la tuile et la cellule associées à la case.
+        """
+        if case == None:
+            if self.cell != None:
+                self.background.remove_view(self)
+                self.cell = None
+            self.case = None
+            return
+        self.case = case
+        name = self.background.zonecarte.skin.get_image_name_for_case(case)
+        cell = (case.x, case.y)
+        if cell != self.cell:
+            if self.cell != None:
+                self.background.remove_view(self)
+            self.cell = cell
+            self.name = name
+            self.background.add_view(self)
+        elif name != self.name:
+            self.name = name
+            self.background.discard_cell(self.cell)
+
+    def set_visible(self, show):
+        """
+        Affiche ou masque la tuile.
+        """
+        if show != self.visible:
+            self.visible = show
+            if self.cell != None:
+                self.background.discard_cell(self.cell)
+
+
 class BotViewCarte(BotView):
     """
     Subclasse apportant la gestion de la zone de danger du robot.
@@ -16,14 +16,36 @@ class ZoneCarte(tk.Canvas, ZoneCarteBase):
     Equivalent graphique du LabLevel
     """
 
-    def __init__(self, parent, Mngr, skin, **kwargs):
+    # statique :
+    # modes de rendu des cases :
+    ITEM_RENDERMODE = "ITEM_RENDERMODE" #: items créés / supprimés et modifiés unitairement
+    POOLED_RENDERMODE = "POOLED_RENDERMODE" #: items recyclés, modifications groupées par frame
+    RENDERMODE = POOLED_RENDERMODE #: mode de rendu par défaut
+    POOL_MAX_SIZE = 512 #: nombre max d'items recyclables par type de case
+    # méthodes
+    def __init__(self, parent, Mngr, skin, rendermode=None, **kwargs):
         """
         Constructeur
+        
+        Args:
+            rendermode (str): ZoneCarte.ITEM_RENDERMODE ou ZoneCarte.POOLED_RENDERMODE
+                (ZoneCarte.RENDERMODE par défaut)
         """
         # Initialisation générique :
         tk.Canvas.__init__(
             self, parent, {"bg": "#FFFFFF", "borderwidth": 0, "highlightthickness": 0}
         )
+        # mode de rendu :
+        if rendermode == None:
+            rendermode = ZoneCarte.RENDERMODE
+        self.rendermode = rendermode
+        self.pooled = self.rendermode == ZoneCarte.POOLED_RENDERMODE
+        # items recyclables par type de case (POOLED_RENDERMODE) :
+        self._items_pool = dict()
+        # modifications en attente par id d'item (POOLED_RENDERMODE) :
+        self._pending_options = dict()
+        self._pending_coords = dict()
+        self._flush_scheduled = False
         ZoneCarteBase.__init__(self, Mngr, skin, ItemObject, logperf=True)
         # Gestion du resize :
         self._init_resize()
@@ -83,6 +105,68 @@ class ZoneCarte(tk.Canvas, ZoneCarteBase):
         # Masquage de l'écran d'attente :
         self.hide_resize_screen()
 
+    #-----> Recyclage des items et modifications groupées (POOLED_RENDERMODE)
+    def acquire_canvas_item(self, typecase):
+        """
+        Retourne l'id d'un item image masqué de type typecase, recyclé ou créé.
+        """
+        pool = self._items_pool.get(typecase, None)
+        if pool != None and len(pool) > 0:
+            return pool.pop()
+        return self.create_image(0, 0, anchor="nw", state="hidden", tags=typecase)
+
+    def release_canvas_item(self, typecase, itemid):
+        """
+        Masque l'item itemid et le rend disponible pour une nouvelle case de
+        même type (supprimé au delà de ZoneCarte.POOL_MAX_SIZE).
+        """
+        pool = self._items_pool.setdefault(typecase, list())
+        self._pending_coords.pop(itemid, None)
+        if len(pool) < ZoneCarte.POOL_MAX_SIZE:
+            self._pending_options[itemid] = {"state": "hidden"}
+            pool.append(itemid)
+            self._schedule_flush()
+        else:
+            self._pending_options.pop(itemid, None)
+            self.delete(itemid)
+
+    def set_canvas_options(self, itemid, **options):
+        """
+        Enregistre des options (itemconfig) appliquées à la prochaine frame.
+        """
+        self._pending_options.setdefault(itemid, dict()).update(options)
+        self._schedule_flush()
+
+    def set_canvas_coords(self, itemid, x, y):
+        """
+        Enregistre la position (coords) appliquée à la prochaine frame.
+        """
+        self._pending_coords[itemid] = (x, y)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """
+        Programme l'application des modifications en attente (after_idle).
+        """
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after_idle(self.flush_canvas_updates)
+
+    def flush_canvas_updates(self):
+        """
+        Applique les modifications en attente : un itemconfig et un coords au
+        plus par item.
+        """
+        self._flush_scheduled = False
+        pending_options = self._pending_options
+        pending_coords = self._pending_coords
+        self._pending_options = dict()
+        self._pending_coords = dict()
+        for itemid, options in pending_options.items():
+            self.itemconfig(itemid, **options)
+        for itemid, (x, y) in pending_coords.items():
+            self.coords(itemid, x, y)
+
     #-----> Gestion des formes vecto
     def draw_mask(self):
         """
@@ -232,6 +316,9 @@ class ZoneCarte(tk.Canvas, ZoneCarteBase):
         """
         Traitements spécifiques en fin de publication.
         """
+        # Modifications en attente :
+        if self.pooled:
+            self.flush_canvas_updates()
         # Gestion des zindexs :
         self._manage_zindexs()
         # Update affichage :
@@ -298,6 +385,11 @@ class ItemObject(ItemObjectBase):
             x=x,
             y=y,
         )
+        # vue recyclée (ZoneCarte.POOLED_RENDERMODE) :
+        self._pooled = False
+        self._typecase = None
+        self._state = None
+        self._realcoords = None
 
     def create_view(self):
         """
@@ -306,6 +398,14 @@ class ItemObject(ItemObjectBase):
         """
         if self.case != None:
             typecase = self.case.type_case
+            if self.zonecarte.pooled:
+                # item recyclé, masqué jusqu'au premier set_visible :
+                self.graphobjref = self.zonecarte.acquire_canvas_item(typecase)
+                self._pooled = True
+                self._typecase = typecase
+                self._state = "hidden"
+                self._realcoords = None
+                return
             newid = self.zonecarte.create_image(
                 0, 0, anchor="nw", state="disabled", tags=typecase
             )
@@ -315,6 +415,9 @@ class ItemObject(ItemObjectBase):
         """
         Supprime la vue graphique de self.case
         """
+        if self._pooled:
+            self.zonecarte.release_canvas_item(self._typecase, self.graphobjref)
+            return
         self.zonecarte.delete(self.graphobjref)
 
     def set_current_image(self, imgskin):
@@ -324,18 +427,28 @@ class ItemObject(ItemObjectBase):
         # enregistrement de la ref :
         ItemObjectBase.set_current_image(self, imgskin)
         # Affichage :
+        if self._pooled:
+            self.zonecarte.set_canvas_options(self.graphobjref, image=imgskin)
+            return
         self.zonecarte.itemconfig(self.graphobjref, image=imgskin)
 
     def get_real_coords(self):
         """
         Retourne les coordonnées réelles (converties / la case) de la vue graphique
         """
+        if self._pooled and self._realcoords != None:
+            return self._realcoords
         return self.zonecarte.coords(self.graphobjref)
 
     def set_real_coords(self, realx, realy):
         """
         Déplace la vue graphique aux coordonnées réelles (converties) realx, realy
         """
+        if self._pooled:
+            if self._realcoords != (realx, realy):
+                self._realcoords = (realx, realy)
+                self.zonecarte.set_canvas_coords(self.graphobjref, realx, realy)
+            return
         xi, yi = self.get_real_coords()
         self.zonecarte.move(self.graphobjref, realx - xi, realy - yi)
 
@@ -343,6 +456,12 @@ class ItemObject(ItemObjectBase):
         """
         Affiche ou masque lma vue graphique.
         """
+        if self._pooled:
+            state = "disabled" if show else "hidden"
+            if state != self._state:
+                self._state = state
+                self.zonecarte.set_canvas_options(self.graphobjref, state=state)
+            return
         sti = self.zonecarte.itemcget(self.graphobjref, "state")
         if show:
             if sti == "hidden":
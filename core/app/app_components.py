@@ -34,8 +34,16 @@ thread secondaire. En pratique le script main d'une telle application sera du ty
     my_app = subclasse_AppComp() # génère et lance des threads secondaires
     my_gui.method_start_thread() # lance la boucle d'exécution du thread principal (nom de méthode imaginaire)
 
-Todo: 
-    A décliner pour des applications multi process (en dérivant :doc:`labpyproject.core.queue.queue_tools` pour supporter **ProcessQueue**)
+**Multi process** : APPComp peut exécuter un composant satellite dans un process 
+dédié (voir `APPComp.register_process_component`), ses Queues étant reliées à celles
+de l'application via le backend multi process de 
+:doc:`labpyproject.core.queue.queue_tools`. Les objets d'échange traversent alors la
+frontière sous leur forme sérialisable (`SatelliteExchangeObject.to_transport`), 
+les fonctions (lambdas) ne pouvant être transmises.
+
+**Profiling** : les threads des composants (ThreadableComp) sont enregistrés auprès
+du profiler par échantillonnage de :doc:`labpyproject.core.app.sampling_profiler`,
+sans coût tant que celui-ci n'est pas démarré.
 
 .. admonition:: Application concrète
 
@@ -54,8 +62,12 @@ Todo:
 # imports :
 import time
 import threading
+import multiprocessing
+import heapq
+import itertools
 import abc
 import labpyproject.core.queue.queue_tools as qt
+from labpyproject.core.app.sampling_profiler import SamplingProfiler
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = [
@@ -64,6 +76,7 @@ __all__ = [
     "SatelliteExchangeObject",
     "AbstractSatelliteComp",
     "DelayedAction",
+    "TimerService",
     "SatelliteComp",
     "SatelliteCompNoThread",
     "GUIExchangeObject",
@@ -79,6 +92,15 @@ __all__ = [
 class ThreadableComp:
     """
     Superclasse des composants dédiés à un usage en thread.
+    
+    Deux modes d'ordonnancement de la boucle du thread :
+    
+    * `SCHEDULER_EVENT` (par défaut) : le thread est bloqué jusqu'à l'arrivée d'une
+      tâche (signalée via `wake_component_thread`, automatiquement lors d'un ajout 
+      dans une Queue entrante) ou jusqu'à l'échéance du travail périodique 
+      (voir `set_periodic_tempo`). Pas de consommation CPU au repos.
+    * `SCHEDULER_POLLING` : appel de la méthode run toutes les THREAD_TEMPO 
+      secondes (scrutation active, historique).
     """
 
     # statique :
@@ -86,13 +108,20 @@ class ThreadableComp:
         60  
     ) #: "framerate" du thread (60 appels max / seconde à la méthode run)
     THREAD_TEMPO = 1 / THREAD_FRAMERATE  #: temporisation associée au framerate
+    SCHEDULER_POLLING = "SCHEDULER_POLLING"  #: boucle de scrutation active
+    SCHEDULER_EVENT = "SCHEDULER_EVENT"  #: boucle bloquante sur événement
+    SCHEDULER_MODE = SCHEDULER_EVENT  #: mode d'ordonnancement par défaut
+    IDLE_TIMEOUT = (
+        0.5  
+    ) #: attente max sans événement ni travail périodique (mode SCHEDULER_EVENT)
     # méthodes
     def __init__(self, postfixname=None):
         """
         Constructeur
         
         Args:
-            postfixname (str): permet de particulariser le nom du thread (pour debug).
+            postfixname (str): permet de particulariser le nom du thread (pour debug,
+                racine des piles du SamplingProfiler).
         """
         # thread principal du composant :
         self.own_thread = None
@@ -101,12 +130,21 @@ class ThreadableComp:
         self._run_call_tempo = ThreadableComp.THREAD_TEMPO
         # temps du dernier appel à la méthode run
         self._last_run_call_time = None
+        # ordonnancement :
+        self.scheduler_mode = ThreadableComp.SCHEDULER_MODE
+        # événement de réveil du thread (mode SCHEDULER_EVENT) :
+        self._wakeup_event = threading.Event()
+        # période du travail périodique éventuel (mode SCHEDULER_EVENT) :
+        self._periodic_tempo = None
+        # actions différées, exécutées par la boucle du thread :
+        self.timer_service = TimerService(wakeup_handler=self.wake_component_thread)
         # nombre de threads enfants (en dehors de self.own_thread) permanents attendus :
         self.childthreadscount = 0
         # nom par défaut :
-        self.thread_name = "ThreadComp_" + str(id(self))
+        self.component_name = "ThreadComp"
         if postfixname != None:
-            self.thread_name = postfixname + "_" + str(id(self))
+            self.component_name = postfixname
+        self.thread_name = self.component_name + "_" + str(id(self))
         # liste des threads internes :
         self.inner_threads = list()
         # liste des threads à démarrer avant d'effectuer un join
@@ -153,6 +191,7 @@ class ThreadableComp:
             new_child_thread.run = runhandler
             new_child_thread.setDaemon(True)
             self.inner_threads.append(new_child_thread)
+            SamplingProfiler().register_thread(new_child_thread, self.component_name)
             if autostart:
                 new_child_thread.start()
             else:
@@ -180,6 +219,10 @@ class ThreadableComp:
         if not self.thread_started:
             self.thread_started = True
             self._last_run_call_time = time.perf_counter()
+            # threads suivis par le profiler (racine des piles : nom du composant) :
+            profiler = SamplingProfiler()
+            for th in self.inner_threads:
+                profiler.register_thread(th, self.component_name)
             # démarrage des threads internes :
             for th in self.threads_to_start:
                 th.start()
@@ -208,7 +251,16 @@ class ThreadableComp:
 
     def _run_component_thread_internal(self):
         """
-        Boucle d'exécution interne : appelle run_component_thread toutes les 
+        Boucle d'exécution interne, fonction de self.scheduler_mode.
+        """
+        if self.scheduler_mode == ThreadableComp.SCHEDULER_EVENT:
+            self._run_event_loop()
+        else:
+            self._run_polling_loop()
+
+    def _run_polling_loop(self):
+        """
+        Mode SCHEDULER_POLLING : appelle run_component_thread toutes les 
         ThreadableComp.THREAD_TEMPO secondes. 
         """
         while self.thread_started:
@@ -218,9 +270,85 @@ class ThreadableComp:
             if delta >= self._run_call_tempo:
                 # ré init tempo :
                 self._last_run_call_time = now
+                # actions différées échues :
+                self.run_delayed_actions()
                 # appel à la méthode run publique
                 self.run_component_thread()
 
+    def _run_event_loop(self):
+        """
+        Mode SCHEDULER_EVENT : appelle run_component_thread tant que des tâches 
+        sont en attente, puis se bloque jusqu'au prochain réveil ou à l'échéance 
+        du travail périodique.
+        """
+        while self.thread_started:
+            # Rq : effacement avant traitement, un réveil pendant l'appel n'est pas perdu
+            self._wakeup_event.clear()
+            self._last_run_call_time = time.perf_counter()
+            self.run_delayed_actions()
+            self.run_component_thread()
+            if self.thread_started and not self.has_pending_tasks():
+                self._wakeup_event.wait(self._get_wait_timeout())
+
+    def _get_wait_timeout(self):
+        """
+        Durée d'attente max avant le prochain appel à run_component_thread
+        (travail périodique ou prochaine action différée).
+        """
+        timeout = ThreadableComp.IDLE_TIMEOUT
+        if self._periodic_tempo != None:
+            ellapsed = time.perf_counter() - self._last_run_call_time
+            timeout = max(0, self._periodic_tempo - ellapsed)
+        next_timer = self.timer_service.get_next_timeout()
+        if next_timer != None:
+            timeout = min(timeout, next_timer)
+        return timeout
+
+    def set_periodic_tempo(self, tempo):
+        """
+        Mode SCHEDULER_EVENT : garantit un appel à run_component_thread au moins
+        toutes les tempo secondes (travail périodique), même sans tâche.
+        
+        Args:
+            tempo (float): période en secondes ou None (attente de tâches seule)
+        """
+        self._periodic_tempo = tempo
+        self.wake_component_thread()
+
+    def wake_component_thread(self):
+        """
+        Réveille le thread associé (mode SCHEDULER_EVENT).
+        """
+        self._wakeup_event.set()
+
+    def run_delayed_actions(self):
+        """
+        Exécute les actions différées échues (appelée par la boucle du thread).
+        
+        Returns:
+            int: nombre d'actions exécutées
+        """
+        return self.timer_service.run_due_actions()
+
+    def get_pending_timers_count(self):
+        """
+        Retourne le nombre d'actions différées en attente (voir self.timer_service).
+        
+        Returns:
+            int
+        """
+        return self.timer_service.get_pending_count()
+
+    def has_pending_tasks(self):
+        """
+        Indique si des tâches restent à traiter (mode SCHEDULER_EVENT).
+        
+        Returns:
+            boolean
+        """
+        # à particulariser dans les subclasses
+        return False
+
     def run_component_thread(self):
         """
         Méthode run publique du thread associé.
@@ -233,6 +361,31 @@ class ThreadableComp:
         Stop la boucle while de la méthode run (à appeler via une tâche).
         """
         self.thread_started = False
+        self.wake_component_thread()
+
+
+#-----> Exécution d'un composant dans un process dédié
+def _run_process_component(
+    compclass, args, kwargs, keycode_in, keycode_out, queue_in, queue_out
+):
+    """
+    Cible des process créés par APPComp.register_process_component : relie les
+    Queues locales aux Queues inter process, instancie le composant puis exécute 
+    ses threads jusqu'à sa clôture.
+    
+    Args:
+        compclass (class), args (tuple), kwargs (dict): composant à instancier
+        keycode_in (str), keycode_out (str): codes dans le sens APP -> composant
+        queue_in (multiprocessing.Queue), queue_out (multiprocessing.Queue)
+    """
+    qmngr = qt.QueueManager()
+    qmngr.import_queue(keycode_in, queue_in)
+    qmngr.export_queue(keycode_out, queue_out)
+    comp = compclass(*args, **kwargs)
+    comp.start_component_thread()
+    for th in comp.get_threads_list():
+        th.join()
+    qmngr.release_queue(keycode_out)
 
 
 #-----> Composant d'application principale
@@ -263,6 +416,17 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
     APPTOBUSINESS_KEYCODE = (
         "APPTOBUSINESS_KEYCODE"  
     ) #: marque un queue_code de app vers métier
+    # routage :
+    ROUTED_CHANNELS = [
+        NET_CHANNEL,
+        GUI_CHANNEL,
+        BUSINESS_CHANNEL,
+    ]  #: canaux dépilés par handleAPPQueues (dans cet ordre)
+    ROUTING_BUDGET = 256  #: nombre max de tâches routées par canal et par appel
+    TASK_CHANNEL = "TASK_CHANNEL"  #: marque une route vers le canal porté par la tâche
+    PROCESS_START_METHOD = "spawn"  #: création des process (sûre en présence de threads)
+    _ROUTING_TABLE = None
+    _ROUTE_CLASSES = dict()
 
     # méthodes :
     def __init__(self, channellist=None):
@@ -276,8 +440,12 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
         """
         # init superclasse ThreadableComp :
         ThreadableComp.__init__(self, postfixname="APPComp")
+        # nombre max de tâches routées par canal et par appel à handleAPPQueues :
+        self.routing_budget = APPComp.ROUTING_BUDGET
         # composants enfants :
         self.childs_ThreadableComp = list()
+        # composants exécutés dans des process dédiés :
+        self.childs_process = list()
         # canaux et codes par défaut :
         qsl = [
             (APPComp.NET_CHANNEL, APPComp.NETTOAPP_KEYCODE, APPComp.APPTONET_KEYCODE),
@@ -293,6 +461,8 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
             qsl = channellist
         # init switch Queues :
         qt.QueueSwitcher.__init__(self, qsl)
+        # réveil du thread à chaque tâche entrante :
+        self.add_queue_listener(self._wakeup_event)
 
     #-----> Initialisation des threads internes :
     def register_child_component(self, child):
@@ -305,6 +475,48 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
         if isinstance(child, ThreadableComp):
             self.childs_ThreadableComp.append(child)
 
+    def register_process_component(
+        self, compclass, args=None, kwargs=None, channelname=None
+    ):
+        """
+        Enregistre un composant satellite à exécuter dans un process dédié (hors GIL
+        du process principal). Le composant est instancié dans ce process par
+        compclass(\*args, \*\*kwargs), ses Queues étant reliées au canal 
+        channelname de l'application.
+        
+        Args:
+            compclass (class): subclasse de SatelliteComp (importable, les 
+                paramètres devant être sérialisables)
+            args (tuple), kwargs (dict): paramètres du constructeur
+            channelname (str): canal associé (APPComp.BUSINESS_CHANNEL par défaut)
+        
+        Returns:
+            multiprocessing.Process: le process (démarré par start_and_join_threads)
+        """
+        if channelname == None:
+            channelname = APPComp.BUSINESS_CHANNEL
+        if args == None:
+            args = tuple()
+        if kwargs == None:
+            kwargs = dict()
+        # codes dans le sens COMP -> APP :
+        kc_in = self._channeldict[channelname]["in"]
+        kc_out = self._channeldict[channelname]["out"]
+        ctx = multiprocessing.get_context(APPComp.PROCESS_START_METHOD)
+        queue_tosat = ctx.Queue()
+        queue_toapp = ctx.Queue()
+        qmngr = qt.QueueManager()
+        qmngr.export_queue(kc_out, queue_tosat)
+        qmngr.import_queue(kc_in, queue_toapp)
+        process = ctx.Process(
+            name="ProcessComp_" + channelname,
+            target=_run_process_component,
+            args=(compclass, args, kwargs, kc_out, kc_in, queue_tosat, queue_toapp),
+        )
+        process.daemon = True
+        self.childs_process.append(process)
+        return process
+
     def start_and_join_threads(self, join=True, count=0):
         """
         Démarre et joint au besoin tous les threads de la hiérarchie de composants.
@@ -326,6 +538,9 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
         self.start_component_thread()
         for child in self.childs_ThreadableComp:
             child.start_component_thread()
+        for process in self.childs_process:
+            if process.pid == None:
+                process.start()
         # process de join :
         joinlist = list()
         for child in self.childs_ThreadableComp:
@@ -341,6 +556,8 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
         if join:
             for th in joinlist:
                 th.join()
+            for process in self.childs_process:
+                process.join()
 
     def on_threads_started(self):
         """
@@ -357,89 +574,160 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
         # dépilement des tâches
         self.handleAPPQueues()
 
+    def has_pending_tasks(self):
+        """
+        Indique si des tâches sont en attente dans les canaux d'échange.
+        """
+        return self.has_pending_queuecmd()
+
     #-----> Routage des tâches
     def handleAPPQueues(self):
         """
         Route les piles de cmd en attente provenant des canaux d'échanges.
         
-        A appeler dans la méthode run du thread associé à l'application.
+        A appeler dans la méthode run du thread associé à l'application. Dépile 
+        jusqu'à self.routing_budget tâches par canal et par appel (1 : une tâche par
+        canal et par appel, comportement historique).
+        """
+        for ch in APPComp.ROUTED_CHANNELS:
+            count = 0
+            while count < self.routing_budget:
+                task = self.get_queuecmd_from_channel(ch)
+                if task == None:
+                    break
+                self.route_task(task)
+                count += 1
+
+    def route_task(self, task):
+        """
+        Route (ou exécute) une tâche dépilée d'un canal d'échange.
+        
+        Args:
+            task (SatelliteExchangeObject ou function)
+        """
+        if isinstance(task, SatelliteExchangeObject):
+            typeexchange = task.typeexchange
+            routeclass = APPComp._get_route_class(type(task))
+            # Filtrage des tâches GUI / NET :
+            if routeclass == GUIExchangeObject:
+                if not self.handleGUIExchange(task):
+                    return
+            elif routeclass == NETExchangeObject:
+                if not self.handleNETExchange(task):
+                    return
+            channelname = APPComp._get_routing_table().get(
+                (routeclass, typeexchange), None
+            )
+            if channelname == APPComp.TASK_CHANNEL:
+                # APP -> SAT : canal porté par la tâche
+                channelname = task.channelname
+            elif channelname == None and routeclass == SatelliteExchangeObject:
+                # Gestion des tâches génériques SAT -> APP : inutile de router
+                if typeexchange == SatelliteExchangeObject.CLOSE_APP:
+                    self.shutdown()
+                elif typeexchange == SatelliteExchangeObject.SET_SAT_INFO:
+                    self.handle_SAT_info(task)
+                elif typeexchange == SatelliteExchangeObject.GET_APP_INFO:
+                    self.ask_APP_info(task)
+            if channelname != None:
+                self.put_queuecmd_in_channel(task, channelname)
+        elif callable(task):
+            # Fonction à appeler
+            task()
+
+    def _get_routing_table(cls):
+        """
+        Retourne la table de routage {(classe d'objet d'échange, typeexchange): canal}
+        (créée au premier appel, les classes d'échange étant définies après APPComp).
+        """
+        if cls._ROUTING_TABLE == None:
+            table = dict()
+            routes = [
+                # GUI_CHANNEL : Business -> GUI
+                (
+                    GUIExchangeObject,
+                    [
+                        GUIExchangeObject.ASK_USER_CHOICE,
+                        GUIExchangeObject.SHOW_CONTENT,
+                        GUIExchangeObject.SET_BUS_INFO,
+                        GUIExchangeObject.GET_GUI_INFO,
+                    ],
+                    APPComp.GUI_CHANNEL,
+                ),
+                # GUI -> Business
+                (
+                    GUIExchangeObject,
+                    [
+                        GUIExchangeObject.GUI_READY,
+                        GUIExchangeObject.RETURN_USER_CHOICE,
+                        GUIExchangeObject.SEND_USER_COMMAND,
+                        GUIExchangeObject.GET_BUS_INFO,
+                        GUIExchangeObject.SET_GUI_INFO,
+                    ],
+                    APPComp.BUSINESS_CHANNEL,
+                ),
+                # NET_CHANNEL : BUSINESS -> NET
+                (
+                    NETExchangeObject,
+                    [
+                        NETExchangeObject.SEND,
+                        NETExchangeObject.SET_BUS_INFO,
+                        NETExchangeObject.GET_NET_INFO,
+                        NETExchangeObject.SET_ADDRESS,
+                        NETExchangeObject.CONNECT,
+                        NETExchangeObject.DISCONNECT,
+                        NETExchangeObject.NET_SHUTDOWN,
+                        NETExchangeObject.CHECK_CONN,
+                    ],
+                    APPComp.NET_CHANNEL,
+                ),
+                # NET -> BUSINESS
+                (
+                    NETExchangeObject,
+                    [
+                        NETExchangeObject.RECEIVE,
+                        NETExchangeObject.GET_BUS_INFO,
+                        NETExchangeObject.SET_NET_INFO,
+                        NETExchangeObject.NET_ERROR,
+                        NETExchangeObject.NET_STATUS,
+                        NETExchangeObject.SEND_ERROR,
+                    ],
+                    APPComp.BUSINESS_CHANNEL,
+                ),
+                # APP -> SAT : canal porté par la tâche
+                (
+                    SatelliteExchangeObject,
+                    [
+                        SatelliteExchangeObject.GET_SAT_INFO,
+                        SatelliteExchangeObject.SET_APP_INFO,
+                    ],
+                    APPComp.TASK_CHANNEL,
+                ),
+            ]
+            for routeclass, typelist, channelname in routes:
+                for typeexchange in typelist:
+                    table[(routeclass, typeexchange)] = channelname
+            cls._ROUTING_TABLE = table
+        return cls._ROUTING_TABLE
+
+    _get_routing_table = classmethod(_get_routing_table)
+
+    def _get_route_class(cls, exchangeclass):
         """
-        channels = [APPComp.NET_CHANNEL, APPComp.GUI_CHANNEL, APPComp.BUSINESS_CHANNEL]
-        for ch in channels:
-            task = self.get_queuecmd_from_channel(ch)
-            if task != None:
-                if isinstance(task, SatelliteExchangeObject):
-                    typeexchange = task.typeexchange
-                    channelname = None
-                    exobj = task
-                    # Routage des tâches GUI / NET / BUS:
-                    if isinstance(task, GUIExchangeObject):
-                        if self.handleGUIExchange(task):
-                            # On reroute la tâche :
-                            # GUI_CHANNEL :
-                            if typeexchange in [
-                                GUIExchangeObject.ASK_USER_CHOICE,
-                                GUIExchangeObject.SHOW_CONTENT,
-                                GUIExchangeObject.SET_BUS_INFO,
-                                GUIExchangeObject.GET_GUI_INFO,
-                            ]:
-                                # Business -> GUI
-                                channelname = APPComp.GUI_CHANNEL
-                            elif typeexchange in [
-                                GUIExchangeObject.GUI_READY,
-                                GUIExchangeObject.RETURN_USER_CHOICE,
-                                GUIExchangeObject.SEND_USER_COMMAND,
-                                GUIExchangeObject.GET_BUS_INFO,
-                                GUIExchangeObject.SET_GUI_INFO,
-                            ]:
-                                # GUI -> Business
-                                channelname = APPComp.BUSINESS_CHANNEL
-                    elif isinstance(task, NETExchangeObject):
-                        if self.handleNETExchange(task):
-                            # On reroute la tâche :
-                            # NET_CHANNEL :
-                            if typeexchange in [
-                                NETExchangeObject.SEND,
-                                NETExchangeObject.SET_BUS_INFO,
-                                NETExchangeObject.GET_NET_INFO,
-                                NETExchangeObject.SET_ADDRESS,
-                                NETExchangeObject.CONNECT,
-                                NETExchangeObject.DISCONNECT,
-                                NETExchangeObject.NET_SHUTDOWN,
-                                NETExchangeObject.CHECK_CONN,
-                            ]:
-                                # BUSINESS -> NET
-                                channelname = APPComp.NET_CHANNEL
-                            elif typeexchange in [
-                                NETExchangeObject.RECEIVE,
-                                NETExchangeObject.GET_BUS_INFO,
-                                NETExchangeObject.SET_NET_INFO,
-                                NETExchangeObject.NET_ERROR,
-                                NETExchangeObject.NET_STATUS,
-                                NETExchangeObject.SEND_ERROR,
-                            ]:
-                                # NET -> BUSINESS
-                                channelname = APPComp.BUSINESS_CHANNEL
-                    else:
-                        # Gestion des tâches génériques SAT <=> APP
-                        # APP -> SAT : on route
-                        if typeexchange in [
-                            SatelliteExchangeObject.GET_SAT_INFO,
-                            SatelliteExchangeObject.SET_APP_INFO,
-                        ]:
-                            channelname = task.channelname
-                        # SAT -> APP : inutile de router
-                        elif typeexchange == SatelliteExchangeObject.CLOSE_APP:
-                            self.shutdown()
-                        elif typeexchange == SatelliteExchangeObject.SET_SAT_INFO:
-                            self.handle_SAT_info(exobj)
-                        elif typeexchange == SatelliteExchangeObject.GET_APP_INFO:
-                            self.ask_APP_info(exobj)
-                    if channelname != None:
-                        self.put_queuecmd_in_channel(exobj, channelname)
-                elif callable(task):
-                    # Fonction à appeler
-                    task()
+        Retourne la classe de routage (GUIExchangeObject, NETExchangeObject ou
+        SatelliteExchangeObject) d'une classe d'objet d'échange, sous classes comprises.
+        """
+        routeclass = cls._ROUTE_CLASSES.get(exchangeclass, None)
+        if routeclass == None:
+            routeclass = SatelliteExchangeObject
+            if issubclass(exchangeclass, GUIExchangeObject):
+                routeclass = GUIExchangeObject
+            elif issubclass(exchangeclass, NETExchangeObject):
+                routeclass = NETExchangeObject
+            cls._ROUTE_CLASSES[exchangeclass] = routeclass
+        return routeclass
+
+    _get_route_class = classmethod(_get_route_class)
 
     #-----> Prise en charge des tâches génériques SAT <=> APP
     def handle_SAT_info(self, exobj):
@@ -579,6 +867,10 @@ class APPComp(ThreadableComp, qt.QueueSwitcher):
                 SatelliteExchangeObject.SHUTDOWN, channelname=ch, dictargs=None
             )
             self.put_queuecmd_in_channel(exobj, ch)
+        # fin des transferts vers les process dédiés (après l'ordre de clôture) :
+        qmngr = qt.QueueManager()
+        for chdict in self._channeldict.values():
+            qmngr.release_queue(chdict["out"])
         # arrêt de la boucle run :
         self.stop_component_thread()
 
@@ -601,6 +893,11 @@ class SatelliteExchangeObject:
     GET_SAT_INFO = "GET_SAT_INFO"  #: l'application demande une info au satellite
     SET_APP_INFO = "SET_APP_INFO"  #: l'application transmet une info au satellite
     SHUTDOWN = "SHUTDOWN"  #: ordre de clôture du satellite par l'application
+    # priorités (voies de qt.LaneQueue) par type d'échange (défaut PRIORITY_NORMAL) :
+    PRIORITIES = {
+        SHUTDOWN: qt.LaneQueue.PRIORITY_LOW
+    }  #: SHUTDOWN traité après les mises à jour en attente
+    COALESCED_TYPES = list()  #: types d'échanges dont seul le dernier en attente compte
     # méthodes
     def __init__(self, typeexchange, channelname=None, dictargs=None):
         """
@@ -616,6 +913,13 @@ class SatelliteExchangeObject:
         self.dictargs = dict()
         if dictargs != None:
             self.dictargs = dictargs
+        # qualification pour qt.LaneQueue :
+        self.priority = type(self).PRIORITIES.get(
+            typeexchange, qt.LaneQueue.PRIORITY_NORMAL
+        )
+        self.coalesce_key = None
+        if typeexchange in type(self).COALESCED_TYPES:
+            self.coalesce_key = (type(self).__name__, typeexchange)
         # debug
         self.creation_time = time.perf_counter()
 
@@ -626,6 +930,36 @@ class SatelliteExchangeObject:
         now = time.perf_counter()
         return now - self.creation_time
 
+    def to_transport(self):
+        """
+        Forme sérialisable (pickle) de l'objet, pour transmission inter process.
+        
+        Returns:
+            tuple: (classe, dict d'état) à passer à la méthode de classe from_transport
+        """
+        state = dict(self.__dict__)
+        # horloge propre à chaque process :
+        state.pop("creation_time", None)
+        state.pop("enqueue_time", None)
+        return (type(self), state)
+
+    def from_transport(cls, state):
+        """
+        Reconstruit un objet d'échange à partir de sa forme sérialisable.
+        
+        Args:
+            state (dict): dict d'état retourné par to_transport
+        
+        Returns:
+            SatelliteExchangeObject
+        """
+        exobj = cls.__new__(cls)
+        exobj.__dict__.update(state)
+        exobj.creation_time = time.perf_counter()
+        return exobj
+
+    from_transport = classmethod(from_transport)
+
     def __repr__(self):
         chaine = (
             "SatelliteExchangeObject channelname="
@@ -729,7 +1063,8 @@ class AbstractSatelliteComp(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def delay_action(self, interval, function, args=None, kwargs=None):
         """
-        Diffère l'exécution d'une action sans bloquer (via threading.Timer).
+        Diffère l'exécution d'une action sans bloquer (via le TimerService du 
+        composant).
         """
         raise NotImplementedError(
             "AbstractSatelliteComp need implementation for delay_action"
@@ -751,7 +1086,8 @@ class AbstractSatelliteComp(metaclass=abc.ABCMeta):
 #-----> Action différée
 class DelayedAction:
     """
-    Objet de gestion d'une action différée utilisant threading.Timer par composition.
+    Objet de gestion d'une action différée, planifiée dans un TimerService ou à 
+    défaut via threading.Timer par composition.
     """
 
     def __init__(
@@ -762,6 +1098,7 @@ class DelayedAction:
         kwargs=None,
         autostart=True,
         external_callback=None,
+        timerservice=None,
     ):
         """
         Constructeur.
@@ -773,6 +1110,7 @@ class DelayedAction:
             kwargs (dict): identique à threading.Timer
             autostart (boolean)
             external_callback (function): appelée lorsque l'action est effectuée ou annulée
+            timerservice (TimerService): planificateur partagé (sinon threading.Timer)
          """
         # paramètres du Timer :
         self.interval = interval
@@ -781,26 +1119,41 @@ class DelayedAction:
         self.kwargs = kwargs if kwargs is not None else {}
         # callback externe (pour nettoyage) :
         self.external_callback = external_callback
-        # Timer :
-        self._timer = threading.Timer(interval, function, args=args, kwargs=kwargs)
+        # planificateur partagé ou Timer dédié :
+        self.timerservice = timerservice
+        self._timer = None
+        if timerservice == None:
+            self._timer = threading.Timer(interval, self.timer_callback)
+        # échéance et présence dans le tas (TimerService) :
+        self.deadline = None
+        self.scheduled = False
         # Etat de l'objet :
         self.action_done = False
         self.action_cancelled = False
         # autostart
         if autostart:
-            self._timer.start()
+            self.start()
 
     def start(self):
         """
         Identique à Timer.start
         """
-        self._timer.start()
+        if self.timerservice != None:
+            self.deadline = time.perf_counter() + self.interval
+            self.timerservice.schedule(self)
+        else:
+            self._timer.start()
 
     def cancel(self):
         """
         Identique à Timer.cancel
         """
-        self._timer.cancel()
+        if self.is_removable():
+            return
+        if self.timerservice != None:
+            self.timerservice.cancel(self)
+        else:
+            self._timer.cancel()
         self.action_cancelled = True
         # callback externe
         if self.external_callback != None:
@@ -827,6 +1180,138 @@ class DelayedAction:
         return False
 
 
+#-----> Planificateur d'actions différées
+class TimerService:
+    """
+    Planificateur d'actions différées (DelayedAction) partagé par un composant :
+    tas binaire d'échéances dépilé par la boucle du composant (pas de thread par
+    action). Planification en O(log n), annulation en O(1) (suppression 
+    paresseuse, le tas étant compacté lorsque les entrées annulées y dominent).
+    """
+
+    def __init__(self, wakeup_handler=None):
+        """
+        Constructeur
+        
+        Args:
+            wakeup_handler (function): appelée lorsqu'une nouvelle action devient la
+                plus proche échéance (réveil de la boucle du composant)
+        """
+        self.wakeup_handler = wakeup_handler
+        # tas de tuples (échéance, n° d'ordre, DelayedAction) :
+        self._heap = list()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        # nombre d'actions planifiées non annulées ni effectuées :
+        self._pending_count = 0
+        # nombre d'entrées annulées restant dans le tas :
+        self._cancelled_count = 0
+
+    def schedule(self, daobj):
+        """
+        Planifie l'action daobj à l'échéance daobj.deadline.
+        
+        Args:
+            daobj (DelayedAction)
+        """
+        with self._lock:
+            entry = (daobj.deadline, next(self._counter), daobj)
+            heapq.heappush(self._heap, entry)
+            daobj.scheduled = True
+            self._pending_count += 1
+            is_first = self._heap[0] is entry
+        if is_first and self.wakeup_handler != None:
+            self.wakeup_handler()
+
+    def cancel(self, daobj):
+        """
+        Annule l'action daobj (l'entrée est ignorée lors de son dépilement).
+        
+        Args:
+            daobj (DelayedAction)
+        """
+        with self._lock:
+            if not daobj.scheduled:
+                # déjà dépilée (en cours d'exécution ou effectuée)
+                return
+            daobj.scheduled = False
+            daobj.action_cancelled = True
+            self._pending_count -= 1
+            self._cancelled_count += 1
+            if self._cancelled_count > len(self._heap) // 2:
+                # compactage :
+                self._heap = [e for e in self._heap if e[2].scheduled]
+                heapq.heapify(self._heap)
+                self._cancelled_count = 0
+
+    def clear(self):
+        """
+        Annule l'ensemble des actions planifiées.
+        """
+        with self._lock:
+            entries = self._heap
+            self._heap = list()
+            self._pending_count = 0
+            self._cancelled_count = 0
+        for entry in entries:
+            entry[2].scheduled = False
+            entry[2].action_cancelled = True
+
+    def run_due_actions(self, now=None):
+        """
+        Exécute les actions échues (à appeler dans la boucle du composant).
+        
+        Args:
+            now (float): instant de référence (time.perf_counter() par défaut)
+        
+        Returns:
+            int: nombre d'actions exécutées
+        """
+        if now == None:
+            now = time.perf_counter()
+        count = 0
+        while True:
+            with self._lock:
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                daobj = heapq.heappop(self._heap)[2]
+                if not daobj.scheduled:
+                    self._cancelled_count -= 1
+                    continue
+                daobj.scheduled = False
+                self._pending_count -= 1
+            # exécution hors verrou (l'action peut planifier d'autres actions) :
+            daobj.timer_callback()
+            count += 1
+        return count
+
+    def get_next_timeout(self):
+        """
+        Retourne le délai avant la prochaine échéance ou None si aucune action n'est
+        planifiée.
+        
+        Returns:
+            float or None
+        """
+        with self._lock:
+            while self._heap and not self._heap[0][2].scheduled:
+                heapq.heappop(self._heap)
+                self._cancelled_count -= 1
+            if not self._heap:
+                return None
+            deadline = self._heap[0][0]
+        return max(0, deadline - time.perf_counter())
+
+    def get_pending_count(self):
+        """
+        Retourne le nombre d'actions planifiées en attente.
+        
+        Returns:
+            int
+        """
+        return self._pending_count
+
+
 #-----> Composant générique
 class SatelliteComp(ThreadableComp, AbstractSatelliteComp, qt.QueueSimpleClient):
     """
@@ -851,12 +1336,12 @@ class SatelliteComp(ThreadableComp, AbstractSatelliteComp, qt.QueueSimpleClient)
             exchangeobjecttypes (list): liste de classes d'objets d'échange 
                 associés au canal        
         """
-        # liste des actions différées :
-        self._delayed_actions = list()
         # init superclasse ThreadableComp :
         ThreadableComp.__init__(self, postfixname=channelname)
         # init superclasse QueueSimpleClient :
         qt.QueueSimpleClient.__init__(self, queue_code_in, queue_code_out)
+        # réveil du thread à chaque tâche entrante :
+        self.add_queue_listener(self._wakeup_event)
         self.channelname = channelname
         self.exchangeobjecttypes = exchangeobjecttypes
 
@@ -878,6 +1363,12 @@ class SatelliteComp(ThreadableComp, AbstractSatelliteComp, qt.QueueSimpleClient)
         # dépilement des tâches
         self.handleTask()
 
+    def has_pending_tasks(self):
+        """
+        Indique si des tâches sont en attente dans la queue entrante.
+        """
+        return self.has_pending_cmd()
+
     def handleTask(self):
         """
         Méthode générique de dépilement de tâche (à appeler dans la méthode run 
@@ -969,19 +1460,19 @@ class SatelliteComp(ThreadableComp, AbstractSatelliteComp, qt.QueueSimpleClient)
 
     def delay_action(self, interval, function, args=None, kwargs=None):
         """
-        Diffère l'exécution d'une action sans bloquer.
-        Crée et enregistre un objet DelayedAction.
+        Diffère l'exécution d'une action sans bloquer : l'action est planifiée
+        dans self.timer_service et exécutée par le thread du composant.
+        
+        Returns:
+            DelayedAction: permet l'annulation (méthode cancel)
         """
-        # création de l'objet :
-        daObj = DelayedAction(
+        return DelayedAction(
             interval,
             function,
             args=args,
             kwargs=kwargs,
-            external_callback=self.clean_delayed_actions,
+            timerservice=self.timer_service,
         )
-        # enregistrement :
-        self._delayed_actions.append(daObj)
 
     def clean_delayed_actions(self, clean_all=False):
         """
@@ -989,18 +1480,11 @@ class SatelliteComp(ThreadableComp, AbstractSatelliteComp, qt.QueueSimpleClient)
         
         Args:
             clean_all (boolean): si True annule et supprime toutes les actions.
+        
+        Rq : le TimerService supprime de lui même les actions effectuées ou annulées.
         """
         if clean_all:
-            # annulation de toutes les actions
-            for daobj in self._delayed_actions:
-                daobj.cancel()
-            self._delayed_actions = []
-        else:
-            # actions à conserver :
-            keeplist = [
-                daobj for daobj in self._delayed_actions if not daobj.is_removable()
-            ]
-            self._delayed_actions = keeplist
+            self.timer_service.clear()
 
 
 #-----> Version sans thread (usage : Tk, Pygame)
@@ -1030,8 +1514,8 @@ class SatelliteCompNoThread(AbstractSatelliteComp, qt.QueueSimpleClient):
             exchangeobjecttypes (list): liste de classes d'objets d'échange 
                 associés au canal 
         """
-        # liste des actions différées :
-        self._delayed_actions = list()
+        # actions différées (voir run_delayed_actions) :
+        self.timer_service = TimerService()
         # init superclasse QueueSimpleClient :
         qt.QueueSimpleClient.__init__(self, queue_code_in, queue_code_out)
         self.channelname = channelname
@@ -1136,19 +1620,38 @@ class SatelliteCompNoThread(AbstractSatelliteComp, qt.QueueSimpleClient):
 
     def delay_action(self, interval, function, args=None, kwargs=None):
         """
-        Diffère l'exécution d'une action sans bloquer.
-        Crée et enregistre un objet DelayedAction.
+        Diffère l'exécution d'une action sans bloquer : l'action est planifiée
+        dans self.timer_service et exécutée lors d'un appel à run_delayed_actions.
+        
+        Returns:
+            DelayedAction: permet l'annulation (méthode cancel)
         """
-        # création de l'objet :
-        daObj = DelayedAction(
+        return DelayedAction(
             interval,
             function,
             args=args,
             kwargs=kwargs,
-            external_callback=self.clean_delayed_actions,
+            timerservice=self.timer_service,
         )
-        # enregistrement :
-        self._delayed_actions.append(daObj)
+
+    def run_delayed_actions(self):
+        """
+        Exécute les actions différées échues (à appeler dans la boucle principale,
+        indépendamment de handleTask).
+        
+        Returns:
+            int: nombre d'actions exécutées
+        """
+        return self.timer_service.run_due_actions()
+
+    def get_pending_timers_count(self):
+        """
+        Retourne le nombre d'actions différées en attente.
+        
+        Returns:
+            int
+        """
+        return self.timer_service.get_pending_count()
 
     def clean_delayed_actions(self, clean_all=False):
         """
@@ -1156,18 +1659,11 @@ class SatelliteCompNoThread(AbstractSatelliteComp, qt.QueueSimpleClient):
         
         Args:
             clean_all (boolean): si True annule et supprime toutes les actions.
+        
+        Rq : le TimerService supprime de lui même les actions effectuées ou annulées.
         """
         if clean_all:
-            # annulation de toutes les actions
-            for daobj in self._delayed_actions:
-                daobj.cancel()
-            self._delayed_actions = []
-        else:
-            # actions à conserver :
-            keeplist = [
-                daobj for daobj in self._delayed_actions if not daobj.is_removable()
-            ]
-            self._delayed_actions = keeplist
+            self.timer_service.clear()
 
 
 #-----> Interface
@@ -1190,6 +1686,20 @@ class GUIExchangeObject(SatelliteExchangeObject):
     SEND_USER_COMMAND = "SEND_USER_COMMAND"  #: la gui retourne une commande utilisateur
     GET_BUS_INFO = "GET_BUS_INFO"  #: l'interface fait une demande d'info au business
     SET_GUI_INFO = "SET_GUI_INFO"  #: l'interface transmet une info au business
+    # priorités : une seule voie par flux afin de conserver l'ordre relatif des
+    # échanges d'un même émetteur (voir qt.LaneQueue). Le flux GUI -> Business
+    # double dans la Queue du business les échanges réseau et applicatifs : la
+    # GUI ne réagissant qu'à des états déjà publiés par le business, aucun de
+    # ses échanges ne dépend d'une tâche encore en attente dans cette Queue. Le
+    # flux Business -> GUI conserve la voie par défaut, partagée avec
+    # SET_APP_INFO et GET_SAT_INFO.
+    PRIORITIES = {
+        GUI_READY: qt.LaneQueue.PRIORITY_HIGH,
+        RETURN_USER_CHOICE: qt.LaneQueue.PRIORITY_HIGH,
+        SEND_USER_COMMAND: qt.LaneQueue.PRIORITY_HIGH,
+        GET_BUS_INFO: qt.LaneQueue.PRIORITY_HIGH,
+        SET_GUI_INFO: qt.LaneQueue.PRIORITY_HIGH,
+    }  #: priorités par type d'échange
     # méthodes statiques
     def _index_guiObject(cls, guiExObj):
         """
@@ -1533,6 +2043,8 @@ class NETExchangeObject(SatelliteExchangeObject):
     SEND_ERROR = (
         "SEND_ERROR"  
     ) #: le composant réseau n'a pas pu effectuer l'envoi correctement
+    # SET_NET_INFO transmet un état complet des connections : seul le dernier compte
+    COALESCED_TYPES = [SET_NET_INFO]  #: types d'échanges fusionnés en Queue
     # méthodes
     def __init__(self, typeexchange, dictargs=None):
         """
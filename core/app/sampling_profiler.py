@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Profiler par échantillonnage** des threads des composants applicatifs.
+
+Le traitement d'une action passe d'un thread à l'autre (APP, BUSINESS, NET, GUI)
+via les Queues, ce qui rend peu lisibles les profils d'un profiler déterministe
+(cProfile ne suit que le thread courant). **SamplingProfiler** capture
+périodiquement, depuis un thread dédié, les piles d'appels de l'ensemble des
+threads (`sys._current_frames`) et les agrège par composant.
+
+Chaque thread d'un **ThreadableComp** (thread principal et threads enfants) est
+enregistré à sa création (`register_thread`) avec le nom du composant
+(`postfixname`) : la racine de chaque pile échantillonnée porte ce nom.
+
+**Export** au format "collapsed stacks" (une ligne par pile : frames séparées
+par des ";" puis le nombre d'échantillons), lisible par les outils de flame graph
+(flamegraph.pl, speedscope, inferno...).
+
+Désactivé (cas par défaut), le profiler n'a aucun coût : pas de thread
+d'échantillonnage, pas de hook de trace.
+
+.. admonition:: Exemple
+
+   ::
+
+      profiler = SamplingProfiler()
+      profiler.start(interval=0.005)
+      ...
+      profiler.stop()
+      profiler.save("labpyrinthe.collapsed")
+"""
+# imports
+import os
+import sys
+import time
+import threading
+import weakref
+import collections
+import labpyproject.core.patterns.design_patterns as dp
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["SamplingProfiler"]
+# classe
+class SamplingProfiler(metaclass=dp.Singleton):
+    """
+    Profiler par échantillonnage des piles d'appels des threads (singleton).
+    """
+
+    # statique :
+    DEFAULT_INTERVAL = 0.005  #: période d'échantillonnage par défaut (s)
+    MAX_DEPTH = 128  #: profondeur max des piles capturées
+    OTHER_THREADS_TAG = "other"  #: préfixe des threads non enregistrés
+    # méthodes
+    def __init__(self):
+        """
+        Constructeur
+        """
+        # threads enregistrés : thread -> nom de composant
+        self._threads_tags = weakref.WeakKeyDictionary()
+        self._registry_lock = threading.Lock()
+        # échantillonnage :
+        self._sampler_thread = None
+        self._stop_event = None
+        self.interval = SamplingProfiler.DEFAULT_INTERVAL
+        self.include_others = False
+        # résultats : pile collapsed -> nombre d'échantillons
+        self._stacks = collections.Counter()
+        self._stacks_lock = threading.Lock()
+        self.samples_count = 0
+        self.sampling_time = 0
+        self._start_time = None
+        self.duration = 0
+
+    #-----> Enregistrement des threads
+    def register_thread(self, thread, tag):
+        """
+        Associe un thread au nom de son composant.
+
+        Args:
+            thread (threading.Thread)
+            tag (str): nom du composant (racine des piles)
+        """
+        with self._registry_lock:
+            self._threads_tags[thread] = tag
+
+    def get_thread_tag(self, thread):
+        """
+        Retourne le nom de composant associé au thread ou None.
+        """
+        with self._registry_lock:
+            return self._threads_tags.get(thread, None)
+
+    #-----> Activation
+    def is_running(self):
+        """
+        Indique si l'échantillonnage est actif.
+        """
+        return self._sampler_thread != None
+
+    def start(self, interval=None, include_others=False):
+        """
+        Démarre l'échantillonnage (les mesures précédentes sont conservées, voir
+        reset).
+
+        Args:
+            interval (float): période d'échantillonnage en secondes
+            include_others (bool): échantillonne aussi les threads non enregistrés
+                (dont le thread principal d'une GUI NoThread)
+        """
+        if self.is_running():
+            return
+        if interval != None:
+            self.interval = max(0.0005, float(interval))
+        self.include_others = include_others
+        self._stop_event = threading.Event()
+        self._start_time = time.perf_counter()
+        self._sampler_thread = threading.Thread(
+            target=self._sampling_loop,
+            args=(self._stop_event,),
+            name="SamplingProfiler_" + str(id(self)),
+        )
+        self._sampler_thread.daemon = True
+        self._sampler_thread.start()
+
+    def stop(self):
+        """
+        Arrête l'échantillonnage.
+        """
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        if self._sampler_thread != threading.current_thread():
+            self._sampler_thread.join(1)
+        self._sampler_thread = None
+        self._stop_event = None
+        self.duration += time.perf_counter() - self._start_time
+        self._start_time = None
+
+    def reset(self):
+        """
+        Efface les mesures.
+        """
+        with self._stacks_lock:
+            self._stacks = collections.Counter()
+            self.samples_count = 0
+            self.sampling_time = 0
+            self.duration = 0
+            if self._start_time != None:
+                self._start_time = time.perf_counter()
+
+    #-----> Echantillonnage
+    def _sampling_loop(self, stopevent):
+        """
+        Boucle du thread d'échantillonnage.
+        """
+        own_ident = threading.get_ident()
+        while not stopevent.wait(self.interval):
+            t0 = time.perf_counter()
+            self._take_sample(own_ident)
+            self.sampling_time += time.perf_counter() - t0
+
+    def _take_sample(self, own_ident):
+        """
+        Capture et agrège les piles de l'ensemble des threads suivis.
+        """
+        frames = sys._current_frames()
+        threads = dict()
+        for th in threading.enumerate():
+            threads[th.ident] = th
+        collected = list()
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            thread = threads.get(ident, None)
+            tag = None
+            if thread != None:
+                tag = self.get_thread_tag(thread)
+            if tag == None:
+                if not self.include_others:
+                    continue
+                tag = SamplingProfiler.OTHER_THREADS_TAG
+                if thread != None:
+                    tag += "." + thread.name
+            collected.append(self._collapse_stack(tag, frame))
+        del frames
+        with self._stacks_lock:
+            for stack in collected:
+                self._stacks[stack] += 1
+            self.samples_count += 1
+
+    def _collapse_stack(self, tag, frame):
+        """
+        Retourne la pile au format collapsed : tag;frame racine;...;frame courante
+        """
+        names = list()
+        depth = 0
+        while frame != None and depth < SamplingProfiler.MAX_DEPTH:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(filename + ":" + code.co_name)
+            frame = frame.f_back
+            depth += 1
+        names.append(tag)
+        names.reverse()
+        return ";".join(names).replace(" ", "_")
+
+    #-----> Exports
+    def get_stacks(self, tag=None):
+        """
+        Retourne une copie des piles agrégées.
+
+        Args:
+            tag (str): limite aux piles du composant tag (None : toutes)
+
+        Returns:
+            dict: {pile collapsed: nombre d'échantillons}
+        """
+        with self._stacks_lock:
+            stacks = dict(self._stacks)
+        if tag != None:
+            prefix = tag + ";"
+            stacks = {k: v for k, v in stacks.items() if k.startswith(prefix)}
+        return stacks
+
+    def get_tags_summary(self):
+        """
+        Nombre d'échantillons par composant.
+
+        Returns:
+            dict
+        """
+        summary = dict()
+        for stack, count in self.get_stacks().items():
+            tag = stack.split(";", 1)[0]
+            summary[tag] = summary.get(tag, 0) + count
+        return summary
+
+    def to_collapsed(self, tag=None):
+        """
+        Export au format collapsed stacks (trié par nombre d'échantillons).
+
+        Args:
+            tag (str): limite aux piles du composant tag (None : toutes)
+
+        Returns:
+            str
+        """
+        stacks = self.get_stacks(tag)
+        lines = list()
+        for stack, count in sorted(stacks.items(), key=lambda x: -x[1]):
+            lines.append(stack + " " + str(count))
+        return "\n".join(lines) + "\n"
+
+    def save(self, path, tag=None):
+        """
+        Ecrit le fichier collapsed stacks.
+
+        Args:
+            path (str): chemin du fichier
+            tag (str): limite aux piles du composant tag (None : toutes)
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_collapsed(tag))
+
+    def get_status(self):
+        """
+        Statut textuel (affichage console).
+        """
+        duration = self.duration
+        if self._start_time != None:
+            duration += time.perf_counter() - self._start_time
+        msg = "Profiler " + ("actif" if self.is_running() else "inactif")
+        msg += " : " + str(self.samples_count) + " échantillons"
+        msg += " en " + str(round(duration, 1)) + "s"
+        if self.samples_count > 0:
+            cost = self.sampling_time / self.samples_count * 1000
+            msg += " (" + str(round(cost, 3)) + " ms/échantillon)"
+        return msg
@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Package générique pour la télémétrie des composants (réseau, Queues).
+"""
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Outils communs aux registres de métriques** (voir 
+:doc:`labpyproject.core.net.net_metrics` et 
+:doc:`labpyproject.core.queue.queue_metrics`) :
+
+* **Histogram** : histogramme cumulable de durées, bornes des intervalles 
+  fournies par le registre
+* **write_atomic** : écriture d'un fichier via un fichier temporaire
+* **PeriodicExporter** : snapshot périodique (fichier et/ou handler) dans un 
+  thread dédié
+"""
+# imports
+import os
+import logging
+import threading
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["Histogram", "PeriodicExporter", "write_atomic"]
+#: logger du module (erreurs des snapshots et handlers d'export)
+logger = logging.getLogger(__name__)
+# fonctions
+def write_atomic(path, content):
+    """
+    Ecrit content dans le fichier path via un fichier temporaire : le fichier 
+    n'est jamais lu partiellement écrit.
+
+    Args:
+        path (str): chemin du fichier
+        content (str): contenu texte
+    """
+    tmppath = path + ".tmp"
+    with open(tmppath, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmppath, path)
+
+
+# classes
+class Histogram:
+    """
+    Histogramme cumulable de durées (en secondes).
+    """
+
+    def __init__(self, buckets):
+        """
+        Constructeur
+
+        Args:
+            buckets (list): bornes supérieures croissantes des intervalles (s), 
+                intervalle +Inf implicite
+        """
+        self.buckets = list(buckets)
+        # un compteur par borne + intervalle +Inf :
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+        self.max = 0
+
+    def observe(self, value):
+        """
+        Ajoute une mesure.
+
+        Args:
+            value (float): durée en secondes
+        """
+        i = 0
+        nb = len(self.buckets)
+        while i < nb and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def get_cumulative_counts(self):
+        """
+        Retourne la liste de tuples (borne, nombre cumulé), borne "+Inf" comprise.
+        """
+        result = list()
+        total = 0
+        bounds = self.buckets + ["+Inf"]
+        for i in range(0, len(bounds)):
+            total += self.counts[i]
+            result.append((bounds[i], total))
+        return result
+
+    def get_percentile(self, percent):
+        """
+        Estimation (borne supérieure de l'intervalle) du percentile demandé.
+
+        Args:
+            percent (float): entre 0 et 100
+
+        Returns:
+            float or None
+        """
+        if self.count == 0:
+            return None
+        rank = percent / 100 * self.count
+        for bound, total in self.get_cumulative_counts():
+            if total >= rank:
+                if bound == "+Inf":
+                    return self.max
+                return bound
+        return self.max
+
+    def to_dict(self):
+        """
+        Représentation sérialisable.
+        """
+        mean = None
+        if self.count > 0:
+            mean = self.sum / self.count
+        return {
+            "buckets": [[str(b), n] for b, n in self.get_cumulative_counts()],
+            "count": self.count,
+            "sum": self.sum,
+            "mean": mean,
+            "max": self.max,
+            "p50": self.get_percentile(50),
+            "p99": self.get_percentile(99),
+        }
+
+
+class PeriodicExporter:
+    """
+    Snapshot périodique d'un registre de métriques dans un thread dédié.
+    """
+
+    def __init__(self, name):
+        """
+        Constructeur
+
+        Args:
+            name (str): nom du thread d'export
+        """
+        self.name = name
+        self._thread = None
+        self._stopevent = None
+
+    def start(self, interval, snapshothandler, path=None, formatter=None, handler=None):
+        """
+        Lance l'export périodique (un export en cours est arrêté au préalable).
+
+        Args:
+            interval (float): période en secondes
+            snapshothandler (function): retourne le snapshot courant
+            path (str): fichier réécrit à chaque snapshot (write_atomic) ou None
+            formatter (function): convertit le snapshot en texte pour path
+            handler (function): appelée avec chaque snapshot ou None
+        
+        Rq : une erreur d'écriture (fichier indisponible) est ignorée jusqu'à 
+        la période suivante, une erreur du snapshot ou du handler est loggée : 
+        l'export se poursuit dans tous les cas.
+        """
+        self.stop()
+        stopevent = threading.Event()
+
+        def export_loop():
+            while not stopevent.wait(interval):
+                try:
+                    snapshot = snapshothandler()
+                except Exception:
+                    logger.exception("Erreur de snapshot " + str(self.name))
+                    continue
+                if path != None:
+                    try:
+                        write_atomic(path, formatter(snapshot))
+                    except OSError:
+                        pass
+                if handler != None:
+                    try:
+                        handler(snapshot)
+                    except Exception:
+                        logger.exception(
+                            "Erreur du handler d'export " + str(self.name)
+                        )
+
+        self._stopevent = stopevent
+        self._thread = threading.Thread(target=export_loop, name=self.name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Arrête l'export périodique éventuel.
+        """
+        if self._stopevent != None:
+            self._stopevent.set()
+            self._stopevent = None
+            self._thread = None
+
+    def is_running(self):
+        """
+        Indique si l'export périodique est actif.
+        """
+        return self._stopevent != None
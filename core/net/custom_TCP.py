@@ -15,7 +15,10 @@ Protocole(s) supporté(s) : TCP
   - un entête : `|n° bloc/nombre de blocs|uid|nombre de caractères du message|`
   - la portion de message du bloc
   - un suffixe de bloc : `CustomRequestHelper.BLOC_SUFFIX` (''<#bs#>'')
-  
+
+* les messages volumineux peuvent être compressés (zlib + base64) si le pair l'a
+  annoncé lors de l'affectation d'uid, la longueur de l'entête est alors suffixée par
+  `CustomRequestHelper.COMPRESSED_FLAG` (ex : ``|1/1|TCPSvr|17468z|``)
 * des codes (et arguments) de commande permettent de gérer : les accusés de réception
   (permettant de "garantir" la réception d'un message), l'identification unique d'un
   client (uid), la communication de son adresse de réception (pour garantir le canal
@@ -48,6 +51,8 @@ Protocole(s) supporté(s) : TCP
   reconnection et renvois. 
 * informe l'application associée (`BUSINESSComp`) de l'état des différentes
   connections et des erreurs d'envoi.
+* métriques par pair (RTT, renvois, octets, reconnections, profondeur des Queues)
+  exportables en JSON ou au format Prometheus (voir `net_metrics.NetMetrics`).
 
 Todo:
     Evolutions souhaitables:
@@ -75,7 +80,11 @@ import re
 import random
 import math
 import time
+import threading
+import zlib
+import base64
 from labpyproject.core.app import app_components as appcomp
+from labpyproject.core.net.net_metrics import NetMetrics
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = [
@@ -220,6 +229,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
             "connect_errors": list(),
         }
         self.netdict["clients"] = dict()
+        # métriques par client :
+        self.metrics = NetMetrics(NetMetrics.ROLE_SERVER, self.get_queues_size)
         # liste d'ids uniques de messages reçus :
         self._received_msguids = list()
         # adresse :
@@ -238,6 +249,9 @@ class CustomTCPServerContainer(appcomp.NETComp):
         # Création du thread associé :
         self._need_server_start = False
         self._need_server_shutdown = False
+        # événements de réveil des threads de démarrage / arrêt :
+        self._server_start_event = threading.Event()
+        self._server_stop_event = threading.Event()
         # thread de démarrage du serveur interne :
         self.server_thread_start = self.create_child_thread(
             self.server_start_loop, suffixname="Svr_start"
@@ -292,6 +306,9 @@ class CustomTCPServerContainer(appcomp.NETComp):
         Méthode run du thread de démarrage du serveur interne.
         """
         while True:
+            # attente bloquante d'une demande de démarrage :
+            self._server_start_event.wait()
+            self._server_start_event.clear()
             if self._need_server_start:
                 # Démarrage du serveur :
                 self._start_server_from_thread()
@@ -301,6 +318,9 @@ class CustomTCPServerContainer(appcomp.NETComp):
         Méthode run du thread d'arrêt du serveur interne.
         """
         while True:
+            # attente bloquante d'une demande d'arrêt :
+            self._server_stop_event.wait()
+            self._server_stop_event.clear()
             if self._need_server_shutdown:
                 # Fin du processus de fermeture :
                 self._shutdown_server_from_thread()
@@ -464,6 +484,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
         """
         # arrêt / ré initialisation du serveur :
         self._net_shutdown_internal()
+        # arrêt de l'export éventuel des métriques :
+        self.metrics.stop_periodic_export()
         # générique : arrêt du process d'écoute des tâches
         appcomp.NETComp.shutdown(self)
 
@@ -515,6 +537,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
         """
         # Démarrage  de la loop, depuis le thread de démarrage :
         self._need_server_start = True
+        self._server_start_event.set()
 
     def _close_internal(self):
         """
@@ -530,6 +553,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
                 self._log_connect_errors(e)
             # Arrêt de la loop, depuis le thread d'arrêt :
             self._need_server_shutdown = True
+            self._server_stop_event.set()
 
     #-----> Nouvelles connections
     def allow_new_connections(self, allow):
@@ -623,8 +647,16 @@ class CustomTCPServerContainer(appcomp.NETComp):
                 # on génère un uid de client :
                 uid = self._create_client_uid(sock)
                 dictreceive["uid"] = uid
+                # négociation de la compression :
+                codec = dict_args.get("compress", None)
+                if codec == CustomRequestHelper.COMPRESSION_CODEC:
+                    self.netdict["clients"][uid]["compression"] = True
                 do_reply = True
-                reponse = uid
+                reponse = CustomRequestHelper.prefix_msg_with_code(
+                    uid,
+                    CustomRequestHelper.UID_SET_BY_SERVER,
+                    {"compress": CustomRequestHelper.COMPRESSION_CODEC},
+                )
             else:
                 # on indique au client que la connection est refusée :
                 do_reply = True
@@ -651,6 +683,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
         # - réception
         hasAR = code_cmd == CustomRequestHelper.NEED_CONFIRMATION
         self._log_received_request_count(uid, msguid, hasAR)
+        if uid != None:
+            self.metrics.log_bytes_received(uid, dictreceive["received_bytes"])
         # - envoi
         if do_reply:
             self._log_sended_request_count(uid, True, False)
@@ -715,6 +749,11 @@ class CustomTCPServerContainer(appcomp.NETComp):
             "unit_received_request_count": 0,
             "AR_received_request_count": 0,
             "total_received_request_count": 0,
+            "compression": False,
+            "compressed_sended_count": 0,
+            "raw_sended_bytes": 0,
+            "compressed_sended_bytes": 0,
+            "last_compression_ratio": None,
         }
         self.netdict["clients"][uid]["conlistin"].append(
             self._get_address_from_socket(sock)
@@ -765,6 +804,14 @@ class CustomTCPServerContainer(appcomp.NETComp):
         ] = CustomRequestHelper.STATUS_SHUTDOWN
         self.netdict["clients"][uid]["sockout"] = None
 
+    def _client_accepts_compression(self, uid):
+        """
+        Indique si la compression a été négociée avec le client d'uid
+        """
+        if uid in self.netdict["clients"].keys():
+            return self.netdict["clients"][uid]["compression"]
+        return False
+
     def _dispatch_to_clients(self, msg, confirmrecept=False):
         """
         Envoie msg à tous les clients
@@ -793,10 +840,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
                 msg2send = CustomRequestHelper.prefix_msg_with_code(
                     msg2send, CustomRequestHelper.NEED_CONFIRMATION
                 )
-            # liste de blocs binaires :
-            msglen, list2send = CustomRequestHelper.create_indexed_request(
-                msg2send, self._uid
-            )
+            # listes de blocs binaires (brute et compressée), créées à la demande :
+            blocsdict = dict()
             # AR 2 : marqueur interne (cf code de cmd unique en V1)
             code_cmd = CustomRequestHelper.split_cmd_and_msg(msg2send)[0]
             if code_cmd in [
@@ -809,6 +854,20 @@ class CustomTCPServerContainer(appcomp.NETComp):
             # 2- envois unitaires :
             faillist = list()
             for uid in clients:
+                compress = self._client_accepts_compression(uid)
+                if compress not in blocsdict.keys():
+                    if compress:
+                        blocs = CustomRequestHelper.create_compressed_request(
+                            msg2send, self._uid
+                        )
+                    else:
+                        blocs = CustomRequestHelper.create_indexed_request(
+                            msg2send, self._uid
+                        )
+                    blocsdict[compress] = blocs
+                msglen, list2send = blocsdict[compress][0:2]
+                if compress:
+                    self._log_compression(uid, blocsdict[compress][2])
                 done = self._send_to_client(uid, list2send, msglen, confirmrecept)
                 if not done:
                     # on ne considère que les erreurs anormales qui ne sont
@@ -908,15 +967,18 @@ class CustomTCPServerContainer(appcomp.NETComp):
                         break
         # 2- envoi :
         if not has_error:
+            sendtime = time.perf_counter()
             error = CustomRequestHelper.send_indexed_request(sockout, bytesblocs)
             if error != None:
                 self._log_send(uid, error)
                 has_error = True
             else:
                 self._log_send(uid, None)
+                self.metrics.log_bytes_sent(uid, bytesblocs)
             # 3- test réception :
             if confirmrecept:  # and not has_error:
                 dictreceive = CustomRequestHelper.receive_indexed_request(sockout)
+                self.metrics.log_bytes_received(uid, dictreceive["received_bytes"])
                 errors = dictreceive["errors"]
                 complete = dictreceive["complete"]
                 sock = dictreceive["sock"]
@@ -943,6 +1005,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
                         # log quantitatif réception :
                         msguid = dictreceive["msguid"]
                         self._log_received_request_count(uid, msguid, False)
+                        self.metrics.log_rtt(uid, time.perf_counter() - sendtime)
         # 3- Gestion d'erreur
         if has_error:
             # Est ce raisonnable de ré essayer ?
@@ -1008,6 +1071,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
             connect_error : None (connexion réussie) ou OSError (dernière erreur de 
                 connection en date)            
         """
+        self.metrics.log_connect(uid, connect_error)
         if uid in self.netdict["clients"].keys():
             cltdict = self.netdict["clients"][uid]
             cltdict["sockout"] = sockout
@@ -1033,6 +1097,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
             uid: identifiant du client
             send_error : None (envoi réussi) ou OSError (dernière erreur d'envoi en date)        
         """
+        self.metrics.log_send_error(uid, send_error)
         if uid in self.netdict["clients"].keys():
             cltdict = self.netdict["clients"][uid]
             cltdict["last_send_error"] = send_error
@@ -1050,6 +1115,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
             unit: est-ce un envoi unitaire ou bien un renvoi
             hasAR: si unit=True, indique si la requête nécessite un accusé de récpetion        
         """
+        if uid != None:
+            self.metrics.log_request_sent(uid, unit)
         if uid in self.netdict["clients"].keys():
             cltdict = self.netdict["clients"][uid]
             cltdict["total_sended_request_count"] += 1
@@ -1058,6 +1125,21 @@ class CustomTCPServerContainer(appcomp.NETComp):
                 if hasAR:
                     cltdict["AR_sended_request_count"] += 1
 
+    def _log_compression(self, uid, zipinfos):
+        """
+        Log des infos de compression d'un message envoyé au client
+        
+        Args:
+            uid: identifiant du client
+            zipinfos (dict): infos retournées par CustomRequestHelper.create_compressed_request
+        """
+        if uid in self.netdict["clients"].keys() and zipinfos["compressed"]:
+            cltdict = self.netdict["clients"][uid]
+            cltdict["compressed_sended_count"] += 1
+            cltdict["raw_sended_bytes"] += zipinfos["raw_bytes"]
+            cltdict["compressed_sended_bytes"] += zipinfos["sended_bytes"]
+            cltdict["last_compression_ratio"] = zipinfos["ratio"]
+
     def _log_receive(self, uid, clt_address, receive_error, complete):
         """
         Log du dernier process de réception de requête en provenance du client
@@ -1071,6 +1153,7 @@ class CustomTCPServerContainer(appcomp.NETComp):
             complete (Boolean): indique si la requête reçue est complète
         
         """
+        self.metrics.log_receive_error(uid, receive_error)
         if uid in self.netdict["clients"].keys():
             cltdict = self.netdict["clients"][uid]
             cltdict["conlistin"].append(clt_address)
@@ -1089,6 +1172,8 @@ class CustomTCPServerContainer(appcomp.NETComp):
             msguid : identifiant unique de message
             hasAR : un accusé de réception est-il demandé.        
         """
+        if uid != None:
+            self.metrics.log_request_received(uid)
         if uid in self.netdict["clients"].keys():
             cltdict = self.netdict["clients"][uid]
             cltdict["total_received_request_count"] += 1
@@ -1151,6 +1236,15 @@ class CustomTCPServerContainer(appcomp.NETComp):
         self.netdict["server"]["binded"] = self.binded_to_read
         return self.netdict
 
+    def get_network_metrics(self):
+        """
+        Retourne le snapshot des métriques réseau par client (voir NetMetrics.get_snapshot).
+        
+        Returns:
+            dict
+        """
+        return self.metrics.get_snapshot()
+
 
 #-----> Server "réel" construit à partir du package socketserver, utilisé par composition
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
@@ -1213,6 +1307,10 @@ class CustomTCPRequestHandler(socketserver.BaseRequestHandler):
                 )
                 if error == None:
                     dictreceive["AR_sended"] = True
+                    if dictreceive["uid"] != None:
+                        self.server.get_container().metrics.log_bytes_sent(
+                            dictreceive["uid"], list2send
+                        )
             # 4- Appel au handler externe après l'envoi de la réponse :
             front_server = self.server.get_container()
             if dicthandle["return_code"] == CustomRequestHelper.CONNECTION_REFUSED:
@@ -1290,6 +1388,11 @@ class CustomRequestHelper:
     RESEND_DELAY = 0.05  #: délai avant nouvelle tentative d'envoi
     # Timeout select
     SELECT_TIMEOUT = 0.05  #: Timeout select
+    # Compression des messages volumineux (négociée avec le pair)
+    COMPRESSION_CODEC = "zlib"  #: codec de compression supporté (annoncé au pair)
+    COMPRESSION_THRESHOLD = 1024 * 4  #: taille (bytes utf-8) à partir de laquelle un message est compressé
+    COMPRESSION_LEVEL = 6  #: niveau de compression zlib
+    COMPRESSED_FLAG = "z"  #: marqueur de compression suffixé à la longueur du message dans l'entête de bloc
     # Codes de commandes client/serveur hors problématiques de connection pures
     CONFIRM_RECEPTION = (
         "CONFIRM_RECEPTION"  
@@ -2054,12 +2157,51 @@ class CustomRequestHelper:
             list: une liste de blocs convertis en bytes.
         
         """
-        msglen, list2send = CustomRequestHelper._split_and_index_msg(msg, uid)
+        msglen, list2send = CustomRequestHelper._split_and_index_msg(msg, uid)[0:2]
         return msglen, list2send
 
     create_indexed_request = classmethod(create_indexed_request)
 
-    def _split_and_index_msg(cls, msg, uniqueid, buffsize=None):
+    def create_compressed_request(cls, msg, uid):
+        """
+        Equivalent de create_indexed_request pour un pair supportant la compression : 
+        si sa taille dépasse CustomRequestHelper.COMPRESSION_THRESHOLD, le message est 
+        compressé (zlib puis base64) avant découpage, et ses blocs sont marqués par 
+        CustomRequestHelper.COMPRESSED_FLAG.
+        
+        Return:
+            msglen: clef de comparaison pour AR (longueur du message non compressé), 
+            list: une liste de blocs convertis en bytes,
+            dict: {"compressed":bool, "raw_bytes":int, "sended_bytes":int, "ratio":float}
+        """
+        return CustomRequestHelper._split_and_index_msg(msg, uid, compress=True)
+
+    create_compressed_request = classmethod(create_compressed_request)
+
+    def compress_bytes(cls, b_msg):
+        """
+        Compresse un message binaire en un message binaire ascii (base64)
+        """
+        b_zip = zlib.compress(b_msg, CustomRequestHelper.COMPRESSION_LEVEL)
+        return base64.b64encode(b_zip)
+
+    compress_bytes = classmethod(compress_bytes)
+
+    def decompress_msg(cls, msg):
+        """
+        Réciproque de compress_bytes, retourne le message initial (str) ou None en
+        cas d'erreur.
+        """
+        try:
+            b_msg = zlib.decompress(base64.b64decode(msg, validate=True))
+            return str(b_msg, "utf8")
+        except (ValueError, zlib.error):
+            # rq : UnicodeDecodeError et binascii.Error héritent de ValueError
+            return None
+
+    decompress_msg = classmethod(decompress_msg)
+
+    def _split_and_index_msg(cls, msg, uniqueid, buffsize=None, compress=False):
         """
         Découpe et indexe le message afin d'envoyer n requètes (ou blocs) de taille 
         buffsize max, avec
@@ -2074,10 +2216,14 @@ class CustomRequestHelper:
             uniqueid (str) : chaine (utf-8)
             buffsize (int) : taille de buffer personnalisée, par défaut 
                 CustomRequestHelper.BUFFERSIZE
+            compress (bool) : compression du message s'il dépasse 
+                CustomRequestHelper.COMPRESSION_THRESHOLD (la longueur de l'entête est
+                alors suffixée par CustomRequestHelper.COMPRESSED_FLAG)
             
         Returns:
             msglen: longueur du message (nb chars)
             list: Retourne la liste des blocs binaires indéxés à envoyer
+            dict: infos de compression (voir create_compressed_request)
         
         Raise:
             TypeError: si msg n'est pas une str
@@ -2103,14 +2249,28 @@ class CustomRequestHelper:
         mybuffsize = buffsize
         # vue binaire du message :
         b_msg = bytes(msg, "utf-8")
+        raw_bytes = len(b_msg)
+        # compression éventuelle :
+        lenflag = ""
+        if compress and raw_bytes >= CustomRequestHelper.COMPRESSION_THRESHOLD:
+            b_zip = CustomRequestHelper.compress_bytes(b_msg)
+            if len(b_zip) < raw_bytes:
+                b_msg = b_zip
+                lenflag = CustomRequestHelper.COMPRESSED_FLAG
         mv_msg = memoryview(b_msg)
         # nombre de bytes du message binaire
         msg_bytes = mv_msg.nbytes
+        zipinfos = {
+            "compressed": lenflag != "",
+            "raw_bytes": raw_bytes,
+            "sended_bytes": msg_bytes,
+            "ratio": msg_bytes / max(raw_bytes, 1),
+        }
         # 1- Evaluation du nombre de blocs à envoyer :
         nb_blocs = math.ceil(msg_bytes / mybuffsize)
         # header générique :
         headerprefix = CustomRequestHelper.BLOC_PREFIX
-        headergen = "|" + str(uniqueid) + "|" + str(msglen) + "|"
+        headergen = "|" + str(uniqueid) + "|" + str(msglen) + lenflag + "|"
         # footer / suffixe de fin de bloc :
         footer = CustomRequestHelper.BLOC_SUFFIX
         b_footer = bytes(footer, "utf-8")
@@ -2146,7 +2306,7 @@ class CustomRequestHelper:
             start = stop
             b_sub_block = b"".join([b_header, b_sub_msg, b_footer])
             returnlist.append(b_sub_block)
-        return msglen, returnlist
+        return msglen, returnlist, zipinfos
 
     _split_and_index_msg = classmethod(_split_and_index_msg)
 
@@ -2189,13 +2349,15 @@ class CustomRequestHelper:
         requestdone = False
         requestvalide = True
         dictdatas = None
+        received_bytes = 0
         while not requestdone:
             if len(listetoparse) > 0:
                 # on prend le premier bloc reconstitué
                 data = listetoparse.pop(0)
             else:
                 # on récupère au max CustomRequestHelper.BUFFERSIZE bytes de données
-                data, error = CustomRequestHelper._receive_buffer_block(sock)
+                data, error, nbbytes = CustomRequestHelper._receive_buffer_block(sock)
+                received_bytes += nbbytes
                 if error != None:
                     errors.append(error)
             # on tente de parser :
@@ -2222,6 +2384,13 @@ class CustomRequestHelper:
                         requestdone,
                         dictdatas,
                     ) = CustomRequestHelper._analyse_list_parsedict(listeparsedict)
+                    if requestdone and dictdatas["msg"] == None:
+                        # échec de décompression
+                        error = ParseDataError(
+                            "CustomTCP._analyse_list_parsedict : can't decompress msg"
+                        )
+                        errors.append(error)
+                        requestvalide = False
             elif mixedblocs != None:
                 # des données de bloc mélangées ont été reçues
                 (
@@ -2247,6 +2416,7 @@ class CustomRequestHelper:
             dictdatas = CustomRequestHelper._analyse_list_parsedict(listeparsedict)[1]
             requestvalide = False
         dictdatas["requestvalide"] = requestvalide
+        dictdatas["received_bytes"] = received_bytes
         dictdatas["sock"] = sock
         dictdatas["errors"] = errors
         # Retour
@@ -2274,6 +2444,8 @@ class CustomRequestHelper:
                     "msguid": None,           # uid de message
                     "errors": None,           # liste d'erreurs
                     "complete": False,        # indicateur de complétion
+                    "compressed": False,      # message reçu compressé
+                    "received_bytes": 0,      # nombre d'octets reçus
                     }
         """
         dictreceive = {
@@ -2289,6 +2461,8 @@ class CustomRequestHelper:
             "msguid": None,
             "errors": None,
             "complete": False,
+            "compressed": False,
+            "received_bytes": 0,
         }
         return dictreceive
 
@@ -2385,6 +2559,15 @@ class CustomRequestHelper:
                 msg = ""
                 for bloc in listeparsedict:
                     msg += bloc["msgpart"]
+                # Message compressé :
+                msglen = str(parsedict["msglen"])
+                if msglen.endswith(CustomRequestHelper.COMPRESSED_FLAG):
+                    dictdatas["compressed"] = True
+                    msg = CustomRequestHelper.decompress_msg(msg)
+                    if msg == None:
+                        # données corrompues : requête complète mais invalide
+                        dictdatas["complete"] = True
+                        return True, dictdatas
                 # Traitement des commandes spéciales de la forme "[cmd:CODE_CMD|var=val&...]"
                 code_cmd, dict_args, fin_msg = CustomRequestHelper.split_cmd_and_msg(
                     msg
@@ -2407,12 +2590,14 @@ class CustomRequestHelper:
         """
         Traite la récepion d'un bloc de données de taille CustomRequestHelper.BUFFERSIZE.
         
-        Retourne le tupple : data, error avec
+        Retourne le tupple : data, error, nbbytes avec
 
         * data (str) : données converties en str
         * error (OSError, UnicodeDecodeError) : erreur éventuelle survenue   
+        * nbbytes (int) : nombre d'octets reçus
         """
         bytesdata = data = error = None
+        nbbytes = 0
         # réception :
         try:
             bytesdata = sock.recv(CustomRequestHelper.BUFFERSIZE)
@@ -2421,11 +2606,12 @@ class CustomRequestHelper:
             error = e
         # conversion :
         if error == None:
+            nbbytes = len(bytesdata)
             try:
                 data = str(bytesdata, "utf8")
             except UnicodeDecodeError as e:
                 error = e
-        return data, error
+        return data, error, nbbytes
 
     _receive_buffer_block = classmethod(_receive_buffer_block)
 
@@ -2682,6 +2868,8 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         # dict d'infos réseau :
         self.netdict = None
         self._init_net_dict()
+        # métriques (conservées en cas de ré initialisation de netdict) :
+        self.metrics = NetMetrics(NetMetrics.ROLE_CLIENT, self.get_queues_size)
         # liste d'ids uniques de messages reçus :
         self._received_msguids = list()
         # indicateur d'activité du thread principal du composant
@@ -2705,8 +2893,15 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             "refused": False,
             "connection_status": self.connection_status,
             "server_status": self.server_status,
+            "compression": False,
         }
         self.netdict["client"] = {"read_address": None, "binded": False}
+        self.netdict["compression"] = {
+            "compressed_sended_count": 0,
+            "raw_sended_bytes": 0,
+            "compressed_sended_bytes": 0,
+            "last_compression_ratio": None,
+        }
         self.netdict["errors"] = {
             "last_connect_send_error": None,
             "connect_send_error_count": 0,
@@ -2833,6 +3028,8 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         """
         # arrêt / ré initialisation du client :
         self._net_shutdown_internal()
+        # arrêt de l'export éventuel des métriques :
+        self.metrics.stop_periodic_export()
         # générique : arrêt du process d'écoute des tâches
         appcomp.NETComp.shutdown(self)
 
@@ -2989,7 +3186,10 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         # marqueur d'erreur :
         has_error = False
         # 1- envoi d'une requète d'identification unique
-        msg = CustomRequestHelper.create_cmd_msg(CustomRequestHelper.ASK_FOR_UID)
+        msg = CustomRequestHelper.create_cmd_msg(
+            CustomRequestHelper.ASK_FOR_UID,
+            {"compress": CustomRequestHelper.COMPRESSION_CODEC},
+        )
         list2send = CustomRequestHelper.create_indexed_request(msg, self.uid)[1]
         error = CustomRequestHelper.send_indexed_request(self.socket_write, list2send)
         self._log_sended_request_count(count == 0, True)
@@ -3000,9 +3200,13 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         else:
             # envoi réussi
             self._log_send(None)
+            self.metrics.log_bytes_sent(NetMetrics.PEER_SERVER, list2send)
         # 2- Réception de la réponse du serveur
         if not has_error:
             dictreceive = CustomRequestHelper.receive_indexed_request(self.socket_write)
+            self.metrics.log_bytes_received(
+                NetMetrics.PEER_SERVER, dictreceive["received_bytes"]
+            )
             errors = dictreceive["errors"]
             complete = dictreceive["complete"]
             if len(errors) > 0:
@@ -3030,6 +3234,13 @@ class CustomTCPThreadedClient(appcomp.NETComp):
                     self.dispatch_network_infos()
                 else:
                     self.refused_by_server = False
+                    # compression supportée par le serveur ?
+                    dict_args = dictreceive["dict_args"]
+                    self.netdict["server"]["compression"] = (
+                        dict_args != None
+                        and dict_args.get("compress", None)
+                        == CustomRequestHelper.COMPRESSION_CODEC
+                    )
                     if reponse != None:
                         self.uid = reponse
                         # appel du handler externe :
@@ -3086,9 +3297,19 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             # marqueur d'erreur :
             has_error = False
             # 1- Envoi de la requête :
-            msglen, list2send = CustomRequestHelper.create_indexed_request(
-                msg, self.uid
-            )
+            if self.netdict["server"]["compression"]:
+                (
+                    msglen,
+                    list2send,
+                    zipinfos,
+                ) = CustomRequestHelper.create_compressed_request(msg, self.uid)
+                if unit:
+                    self._log_compression(zipinfos)
+            else:
+                msglen, list2send = CustomRequestHelper.create_indexed_request(
+                    msg, self.uid
+                )
+            sendtime = time.perf_counter()
             error = CustomRequestHelper.send_indexed_request(
                 self.socket_write, list2send
             )
@@ -3099,11 +3320,15 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             else:
                 # envoi réussi
                 self._log_send(None)
+                self.metrics.log_bytes_sent(NetMetrics.PEER_SERVER, list2send)
             # 2- test de réception :
             if confirmrecept and not has_error:
                 dictreceive = CustomRequestHelper.receive_indexed_request(
                     self.socket_write
                 )
+                self.metrics.log_bytes_received(
+                    NetMetrics.PEER_SERVER, dictreceive["received_bytes"]
+                )
                 errors = dictreceive["errors"]
                 complete = dictreceive["complete"]
                 if len(errors) > 0:
@@ -3132,6 +3357,9 @@ class CustomTCPThreadedClient(appcomp.NETComp):
                         # log quantitatif réception :
                         msguid = dictreceive["msguid"]
                         self._log_received_request_count(msguid, False)
+                        self.metrics.log_rtt(
+                            NetMetrics.PEER_SERVER, time.perf_counter() - sendtime
+                        )
             # 3- Gestion d'erreur
             if has_error:
                 # Est ce raisonnable de ré essayer ?
@@ -3251,6 +3479,9 @@ class CustomTCPThreadedClient(appcomp.NETComp):
                 for sock in sock_to_read:
                     # 1- Réception des données :
                     dictreceive = CustomRequestHelper.receive_indexed_request(sock)
+                    self.metrics.log_bytes_received(
+                        NetMetrics.PEER_SERVER, dictreceive["received_bytes"]
+                    )
                     # 2- Traitement du message (dont logs):
                     dicthandle = self._handle_server_msg(dictreceive)
                     # 3- On retourne la réponse (le nombre de caractères du message reçu par défaut)
@@ -3262,6 +3493,10 @@ class CustomTCPThreadedClient(appcomp.NETComp):
                             sock, list2send
                         )
                         self._log_send(error)
+                        if error == None:
+                            self.metrics.log_bytes_sent(
+                                NetMetrics.PEER_SERVER, list2send
+                            )
 
     def _handle_server_msg(self, dictreceive):
         """
@@ -3386,6 +3621,7 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         Args
             connect_error : OSError ou None
         """
+        self.metrics.log_connect(NetMetrics.PEER_SERVER, connect_error)
         self.netdict["errors"]["last_connect_send_error"] = connect_error
         if connect_error != None:
             self.netdict["errors"]["connect_send_error_count"] += 1
@@ -3398,6 +3634,7 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         Args:
             send_error : OSError ou None
         """
+        self.metrics.log_send_error(NetMetrics.PEER_SERVER, send_error)
         self.netdict["errors"]["last_send_error"] = send_error
         if send_error != None:
             self.netdict["errors"]["send_error_count"] += 1
@@ -3411,12 +3648,27 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             unit : est-ce un envoi unitaire ou bien un renvoi
             hasAR : si unit=True, indique si la requête nécessite un accusé de récpetion          
         """
+        self.metrics.log_request_sent(NetMetrics.PEER_SERVER, unit)
         self.netdict["errors"]["total_sended_request_count"] += 1
         if unit:
             self.netdict["errors"]["unit_sended_request_count"] += 1
             if hasAR:
                 self.netdict["errors"]["AR_sended_request_count"] += 1
 
+    def _log_compression(self, zipinfos):
+        """
+        Log des infos de compression d'un message envoyé au serveur
+        
+        Args:
+            zipinfos (dict): infos retournées par CustomRequestHelper.create_compressed_request
+        """
+        if zipinfos["compressed"]:
+            zipdict = self.netdict["compression"]
+            zipdict["compressed_sended_count"] += 1
+            zipdict["raw_sended_bytes"] += zipinfos["raw_bytes"]
+            zipdict["compressed_sended_bytes"] += zipinfos["sended_bytes"]
+            zipdict["last_compression_ratio"] = zipinfos["ratio"]
+
     def _log_connect_receive(self, connect_error):
         """
         Log de la dernière tentative de connection de réception
@@ -3435,6 +3687,7 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             receive_error : OSError ou None
             complete (boolean)
         """
+        self.metrics.log_receive_error(NetMetrics.PEER_SERVER, receive_error)
         self.netdict["errors"]["last_receive_error"] = receive_error
         if receive_error != None:
             self.netdict["errors"]["receive_error_count"] += 1
@@ -3449,6 +3702,7 @@ class CustomTCPThreadedClient(appcomp.NETComp):
             msguid : identifiant unique de message
             hasAR : un accusé de réception est-il demandé.        
         """
+        self.metrics.log_request_received(NetMetrics.PEER_SERVER)
         self.netdict["errors"]["total_received_request_count"] += 1
         if msguid == None or not msguid in self._received_msguids:
             self.netdict["errors"]["unit_received_request_count"] += 1
@@ -3542,6 +3796,15 @@ class CustomTCPThreadedClient(appcomp.NETComp):
         # Erreurs : mises à jour via les logs
         return self.netdict
 
+    def get_network_metrics(self):
+        """
+        Retourne le snapshot des métriques réseau (voir NetMetrics.get_snapshot).
+        
+        Returns:
+            dict
+        """
+        return self.metrics.get_snapshot()
+
     def _detect_server_state(self):
         """
         Identifie la possible déconnection "sauvage" du serveur.
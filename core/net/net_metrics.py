@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Métriques réseau** des composants `custom_TCP`.
+
+Chaque composant réseau (**CustomTCPServerContainer**, **CustomTCPThreadedClient**)
+possède un objet **NetMetrics** alimenté par ses méthodes de log. Les métriques
+sont tenues par pair (uid de client côté serveur, "server" côté client) :
+
+* histogramme des RTT (envoi d'une requête -> réception de son accusé de réception)
+* requêtes envoyées / reçues, renvois (retries)
+* octets émis / reçus
+* erreurs de connection, d'envoi et reconnections (connection réussie après
+  une erreur)
+
+auxquelles s'ajoute la profondeur des Queues du composant.
+
+**Exports :**
+
+* `get_snapshot` : dict sérialisable en JSON
+* `to_prometheus` : texte au format d'exposition Prometheus (cf node_exporter
+  textfile collector pour un serveur headless)
+* `write_snapshot` : écriture atomique dans un fichier
+* `start_periodic_export` : écriture périodique dans un thread dédié
+"""
+# imports
+import time
+import json
+import threading
+from labpyproject.core.metrics.metrics_tools import (
+    Histogram,
+    PeriodicExporter,
+    write_atomic,
+)
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["NetMetrics"]
+# classes
+class NetMetrics:
+    """
+    Registre de métriques d'un composant réseau (thread safe).
+    """
+
+    # statique :
+    ROLE_SERVER = "server"  #: rôle serveur
+    ROLE_CLIENT = "client"  #: rôle client
+    PEER_SERVER = "server"  #: nom du pair d'un client
+    FORMAT_JSON = "json"  #: format d'export JSON
+    FORMAT_PROMETHEUS = "prometheus"  #: format d'export Prometheus
+    PROMETHEUS_PREFIX = "labpyproject_net_"  #: préfixe des métriques Prometheus
+    RTT_BUCKETS = [
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+    ]  #: bornes de l'histogramme des RTT (s), +Inf implicite
+    COUNTERS = [
+        ("sent_requests", "Requêtes envoyées (renvois compris)"),
+        ("retries", "Renvois de requêtes"),
+        ("received_requests", "Requêtes reçues"),
+        ("sent_bytes", "Octets émis"),
+        ("received_bytes", "Octets reçus"),
+        ("connects", "Connections réussies"),
+        ("connect_errors", "Erreurs de connection"),
+        ("send_errors", "Erreurs d'envoi"),
+        ("receive_errors", "Erreurs de réception"),
+        ("reconnects", "Connections réussies après une erreur"),
+    ]  #: compteurs par pair (nom, description)
+    # méthodes
+    def __init__(self, role, queuesizehandler=None):
+        """
+        Constructeur
+
+        Args:
+            role (str): NetMetrics.ROLE_SERVER ou NetMetrics.ROLE_CLIENT
+            queuesizehandler (function): fonction retournant un dict
+                {nom de queue: profondeur}, appelée à chaque snapshot
+        """
+        self.role = role
+        self.queuesizehandler = queuesizehandler
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+        self._peers = dict()
+        # export périodique :
+        self._exporter = PeriodicExporter("NetMetrics_export_" + str(id(self)))
+
+    #-----> Enregistrement
+    def _get_peer(self, peer):
+        """
+        Retourne (en le créant au besoin) le dict de métriques du pair.
+        Rq : à appeler sous verrou.
+        """
+        peer = str(peer)
+        if peer not in self._peers.keys():
+            peerdict = dict()
+            for name, desc in NetMetrics.COUNTERS:
+                peerdict[name] = 0
+            peerdict["rtt"] = Histogram(NetMetrics.RTT_BUCKETS)
+            peerdict["in_error"] = False
+            self._peers[peer] = peerdict
+        return self._peers[peer]
+
+    def log_request_sent(self, peer, unit):
+        """
+        Envoi (unit=True) ou renvoi (unit=False) d'une requête au pair.
+        """
+        with self._lock:
+            peerdict = self._get_peer(peer)
+            peerdict["sent_requests"] += 1
+            if not unit:
+                peerdict["retries"] += 1
+
+    def log_request_received(self, peer):
+        """
+        Réception d'une requête du pair.
+        """
+        with self._lock:
+            self._get_peer(peer)["received_requests"] += 1
+
+    def log_bytes_sent(self, peer, bytesblocs):
+        """
+        Octets émis vers le pair.
+
+        Args:
+            peer (str): identifiant du pair
+            bytesblocs (list): blocs binaires envoyés
+        """
+        nb = 0
+        for bloc in bytesblocs:
+            nb += len(bloc)
+        with self._lock:
+            self._get_peer(peer)["sent_bytes"] += nb
+
+    def log_bytes_received(self, peer, nbbytes):
+        """
+        Octets reçus du pair.
+        """
+        with self._lock:
+            self._get_peer(peer)["received_bytes"] += nbbytes
+
+    def log_connect(self, peer, error):
+        """
+        Tentative de connection au pair, une connection réussie après une erreur
+        (de connection ou d'envoi) est comptée comme reconnection.
+
+        Args:
+            peer (str): identifiant du pair
+            error (OSError): erreur ou None
+        """
+        with self._lock:
+            peerdict = self._get_peer(peer)
+            if error != None:
+                peerdict["connect_errors"] += 1
+                peerdict["in_error"] = True
+            else:
+                peerdict["connects"] += 1
+                if peerdict["in_error"]:
+                    peerdict["reconnects"] += 1
+                    peerdict["in_error"] = False
+
+    def log_send_error(self, peer, error):
+        """
+        Erreur d'envoi au pair.
+        """
+        if error != None:
+            with self._lock:
+                peerdict = self._get_peer(peer)
+                peerdict["send_errors"] += 1
+                peerdict["in_error"] = True
+
+    def log_receive_error(self, peer, error):
+        """
+        Erreur de réception d'une requête du pair.
+        """
+        if error != None:
+            with self._lock:
+                self._get_peer(peer)["receive_errors"] += 1
+
+    def log_rtt(self, peer, duration):
+        """
+        RTT d'une requête : de son envoi à la réception de son accusé de réception.
+
+        Args:
+            peer (str): identifiant du pair
+            duration (float): durée en secondes
+        """
+        with self._lock:
+            self._get_peer(peer)["rtt"].observe(duration)
+
+    #-----> Exports
+    def get_snapshot(self):
+        """
+        Retourne l'état courant des métriques sous forme de dict sérialisable.
+
+        Returns:
+            dict: {"role", "time", "uptime", "peers", "totals", "queues"}
+        """
+        now = time.time()
+        peers = dict()
+        totals = dict()
+        for name, desc in NetMetrics.COUNTERS:
+            totals[name] = 0
+        with self._lock:
+            for peer, peerdict in self._peers.items():
+                peerout = dict()
+                for name, desc in NetMetrics.COUNTERS:
+                    peerout[name] = peerdict[name]
+                    totals[name] += peerdict[name]
+                peerout["rtt"] = peerdict["rtt"].to_dict()
+                peers[peer] = peerout
+        return {
+            "role": self.role,
+            "time": now,
+            "uptime": now - self.start_time,
+            "peers": peers,
+            "totals": totals,
+            "queues": self._get_queues_size(),
+        }
+
+    def _get_queues_size(self):
+        """
+        Profondeur des Queues du composant.
+        """
+        if self.queuesizehandler != None and callable(self.queuesizehandler):
+            return self.queuesizehandler()
+        return dict()
+
+    def to_json(self):
+        """
+        Snapshot au format JSON.
+
+        Returns:
+            str
+        """
+        return json.dumps(self.get_snapshot(), indent=2)
+
+    def to_prometheus(self, snapshot=None):
+        """
+        Snapshot au format texte d'exposition Prometheus.
+
+        Args:
+            snapshot (dict): snapshot à formater (None : snapshot courant)
+
+        Returns:
+            str
+        """
+        if snapshot == None:
+            snapshot = self.get_snapshot()
+        prefix = NetMetrics.PROMETHEUS_PREFIX
+        role = snapshot["role"]
+        peers = snapshot["peers"]
+        lines = list()
+        # compteurs :
+        for name, desc in NetMetrics.COUNTERS:
+            metric = prefix + name + "_total"
+            lines.append("# HELP " + metric + " " + desc)
+            lines.append("# TYPE " + metric + " counter")
+            for peer, peerout in peers.items():
+                labels = self._format_labels(role=role, peer=peer)
+                lines.append(metric + labels + " " + str(peerout[name]))
+        # histogramme des RTT :
+        metric = prefix + "rtt_seconds"
+        lines.append("# HELP " + metric + " RTT requête / accusé de réception")
+        lines.append("# TYPE " + metric + " histogram")
+        for peer, peerout in peers.items():
+            rtt = peerout["rtt"]
+            for bound, total in rtt["buckets"]:
+                labels = self._format_labels(role=role, peer=peer, le=bound)
+                lines.append(metric + "_bucket" + labels + " " + str(total))
+            labels = self._format_labels(role=role, peer=peer)
+            lines.append(metric + "_sum" + labels + " " + repr(rtt["sum"]))
+            lines.append(metric + "_count" + labels + " " + str(rtt["count"]))
+        # profondeur des queues :
+        metric = prefix + "queue_depth"
+        lines.append("# HELP " + metric + " Nombre de tâches en attente par Queue")
+        lines.append("# TYPE " + metric + " gauge")
+        for queuename, depth in snapshot["queues"].items():
+            labels = self._format_labels(role=role, queue=queuename)
+            lines.append(metric + labels + " " + str(depth))
+        # uptime :
+        metric = prefix + "uptime_seconds"
+        lines.append("# TYPE " + metric + " gauge")
+        labels = self._format_labels(role=role)
+        lines.append(metric + labels + " " + repr(snapshot["uptime"]))
+        return "\n".join(lines) + "\n"
+
+    def _format_labels(cls, **labels):
+        """
+        Formate un ensemble de labels Prometheus.
+        """
+        items = list()
+        for key, val in labels.items():
+            val = str(val).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(key + '="' + val + '"')
+        return "{" + ",".join(items) + "}"
+
+    _format_labels = classmethod(_format_labels)
+
+    def format_snapshot(self, snapshot, fmt=None):
+        """
+        Formate un snapshot.
+
+        Args:
+            snapshot (dict): voir get_snapshot
+            fmt (str): NetMetrics.FORMAT_JSON (par défaut) ou NetMetrics.FORMAT_PROMETHEUS
+
+        Returns:
+            str
+        """
+        if fmt == NetMetrics.FORMAT_PROMETHEUS:
+            return self.to_prometheus(snapshot)
+        return json.dumps(snapshot, indent=2)
+
+    def write_snapshot(self, path, fmt=None):
+        """
+        Ecrit le snapshot dans le fichier path (écriture atomique via un fichier
+        temporaire, le fichier n'est jamais lu partiellement écrit).
+
+        Args:
+            path (str): chemin du fichier
+            fmt (str): NetMetrics.FORMAT_JSON (par défaut) ou NetMetrics.FORMAT_PROMETHEUS
+        """
+        write_atomic(path, self.format_snapshot(self.get_snapshot(), fmt))
+
+    #-----> Export périodique
+    def start_periodic_export(self, path, interval=10, fmt=None):
+        """
+        Lance l'écriture périodique du snapshot dans un thread dédié.
+
+        Args:
+            path (str): chemin du fichier
+            interval (float): période en secondes
+            fmt (str): NetMetrics.FORMAT_JSON (par défaut) ou NetMetrics.FORMAT_PROMETHEUS
+        """
+        self._exporter.start(
+            interval,
+            self.get_snapshot,
+            path=path,
+            formatter=lambda snapshot: self.format_snapshot(snapshot, fmt),
+        )
+
+    def stop_periodic_export(self):
+        """
+        Arrête l'export périodique éventuel.
+        """
+        self._exporter.stop()
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Banc de mesure** des performances du framework `custom_TCP` en local.
+
+Lance un **CustomTCPServerContainer** et N **CustomTCPThreadedClient** sur
+localhost, puis joue une série de scénarios :
+
+* ``clt_to_svr`` : chaque client envoie ses messages au serveur (clients en parallèle)
+* ``svr_to_clt`` : le serveur envoie ses messages à chaque client, un par un
+* ``broadcast`` : le serveur diffuse chaque message à l'ensemble des clients
+
+pour chaque taille de message et avec / sans accusé de réception (`confirmrecept`).
+
+**Mesures par scénario :**
+
+* débit (messages reçus par seconde)
+* latence d'acheminement (p50, p99, moyenne, max en ms) : du début de l'envoi
+  jusqu'à la remise du message au handler externe du destinataire
+* octets émis sur le réseau (blocs de données, accusés de réception compris)
+* temps CPU serveur par message (écarts de `time.thread_time` des threads
+  serveur concernés)
+
+Les réceptions multiples d'un même message (renvois faute d'accusé de réception)
+ne sont comptées qu'une fois (identifiant émetteur / séquence), les valeurs par
+message sont rapportées au nombre de messages envoyés (remises attendues).
+
+Les résultats sont sauvegardés au format JSON afin de comparer les évolutions
+du découpage / transport entre deux versions.
+
+.. admonition:: Exemple
+
+   ::
+
+      python -m labpyproject.core.net.tcp_benchmark -c 4 -n 50 -s 256 4096 65536 -o bench.json
+
+.. note::
+   Les composants réseau sont utilisés sans Queues (`are_queues_active` renvoie
+   False), les réceptions étant interceptées via leur handler externe.
+"""
+# imports
+import sys
+import time
+import json
+import random
+import threading
+import platform
+import argparse
+from labpyproject.core.net.custom_TCP import CustomTCPServerContainer
+from labpyproject.core.net.custom_TCP import CustomTCPThreadedClient
+from labpyproject.core.net.custom_TCP import CustomRequestHelper
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["BenchTCPServer", "BenchTCPClient", "TCPBenchmark"]
+# classes
+#-----> Composants réseau instrumentés
+class BenchTCPServer(CustomTCPServerContainer):
+    """
+    Serveur frontal sans Queues dont les réceptions sont horodatées.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructeur
+        """
+        # dernier temps CPU relevé par thread de traitement :
+        self._cpu_local = threading.local()
+        CustomTCPServerContainer.__init__(self, *args, **kwargs)
+
+    def are_queues_active(self):
+        """
+        Force l'usage du handler externe.
+        """
+        return False
+
+    def dispatch_to_external_handler(self, dictreceive):
+        """
+        Ajoute au dict transmis le temps de réception et le temps CPU consommé
+        par le thread de traitement depuis sa réception précédente (le temps
+        d'un thread est cumulatif, un même thread pouvant traiter plusieurs
+        requêtes).
+        """
+        if self.externalhandler != None:
+            cpu = time.thread_time()
+            cpu_delta = cpu - getattr(self._cpu_local, "last", 0)
+            self._cpu_local.last = cpu
+            self.externalhandler(
+                {
+                    "uid": dictreceive["uid"],
+                    "msg": dictreceive["msg_except_cmd"],
+                    "netcode": dictreceive["code_cmd"],
+                    "time": time.perf_counter(),
+                    "cpu": cpu_delta,
+                }
+            )
+
+
+class BenchTCPClient(CustomTCPThreadedClient):
+    """
+    Client sans Queues dont les réceptions sont horodatées.
+    """
+
+    def are_queues_active(self):
+        """
+        Force l'usage du handler externe.
+        """
+        return False
+
+    def dispatch_to_external_handler(self, dicthandler):
+        """
+        Ajoute au dict transmis l'uid du client et le temps de réception.
+        """
+        if self.externalhandler != None:
+            dictargs = dict(dicthandler)
+            dictargs["client"] = self.uid
+            dictargs["time"] = time.perf_counter()
+            self.externalhandler(dictargs)
+
+
+#-----> Banc de mesure
+class TCPBenchmark:
+    """
+    Orchestration des scénarios de mesure et export JSON des résultats.
+    """
+
+    # statique :
+    SCENARIO_CLT_TO_SVR = "clt_to_svr"  #: envois clients -> serveur
+    SCENARIO_SVR_TO_CLT = "svr_to_clt"  #: envois unitaires serveur -> clients
+    SCENARIO_BROADCAST = "broadcast"  #: diffusion serveur -> tous les clients
+    SCENARIOS = [
+        SCENARIO_CLT_TO_SVR,
+        SCENARIO_SVR_TO_CLT,
+        SCENARIO_BROADCAST,
+    ]  #: scénarios joués par défaut
+    DEFAULT_SIZES = [256, 1024 * 4, 1024 * 64]  #: tailles de messages par défaut
+    BENCH_MARK = "<#bench#>"  #: marqueur d'entête des messages de mesure
+    READY_TIMEOUT = 10  #: délai max d'attente des connexions (s)
+    RECEIVE_TIMEOUT = 30  #: délai max d'attente des réceptions d'un scénario (s)
+    IDLE_TIMEOUT = 2  #: délai sans nouvelle réception au delà duquel on conclut (s)
+    # méthodes
+    def __init__(
+        self,
+        nbclients=4,
+        count=50,
+        sizes=None,
+        scenarios=None,
+        port=16500,
+        seed=0,
+    ):
+        """
+        Constructeur
+
+        Args:
+            nbclients (int): nombre de clients
+            count (int): nombre de messages envoyés par émetteur / destinataire
+            sizes (list): tailles de messages (en caractères)
+            scenarios (list): sous ensemble de TCPBenchmark.SCENARIOS
+            port (int): port d'écoute du serveur (les clients locaux écoutent sur
+                port + 200 * n)
+            seed (int): graine des contenus de messages
+        """
+        self.nbclients = max(1, int(nbclients))
+        self.count = max(1, int(count))
+        self.sizes = sizes
+        if self.sizes == None:
+            self.sizes = list(TCPBenchmark.DEFAULT_SIZES)
+        self.scenarios = scenarios
+        if self.scenarios == None:
+            self.scenarios = list(TCPBenchmark.SCENARIOS)
+        self.port = port
+        self.seed = seed
+        self._random = random.Random(seed)
+        # composants :
+        self.server = None
+        self.clients = list()
+        # réceptions du scénario en cours :
+        self._lock = threading.Lock()
+        self._runid = 0
+        self._receptions = list()
+        self._received_ids = set()
+        self._duplicates = 0
+        self._handler_cpu = 0
+        # séquences d'envoi par émetteur :
+        self._sequences = dict()
+        # octets émis :
+        self._wire_bytes = 0
+        self._native_send = None
+        # résultats :
+        self.results = list()
+
+    #-----> Séquence globale
+    def run(self):
+        """
+        Démarre les composants, joue l'ensemble des scénarios et retourne le
+        dict de résultats.
+
+        Returns:
+            dict: {"meta":dict, "results":list}
+        """
+        self._install_wire_counter()
+        try:
+            self._start_components()
+            for scenario in self.scenarios:
+                for size in self.sizes:
+                    for confirmrecept in [True, False]:
+                        self.results.append(
+                            self._run_scenario(scenario, size, confirmrecept)
+                        )
+        finally:
+            self._stop_components()
+            self._uninstall_wire_counter()
+        return self.get_report()
+
+    def get_report(self):
+        """
+        Retourne le dict exporté en JSON.
+
+        Returns:
+            dict: {"meta":dict, "results":list}
+        """
+        meta = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "nbclients": self.nbclients,
+            "count": self.count,
+            "sizes": self.sizes,
+            "seed": self.seed,
+            "buffersize": CustomRequestHelper.BUFFERSIZE,
+            "compression_codec": CustomRequestHelper.COMPRESSION_CODEC,
+            "compression_threshold": CustomRequestHelper.COMPRESSION_THRESHOLD,
+        }
+        return {"meta": meta, "results": self.results}
+
+    def save(self, path):
+        """
+        Sauvegarde le rapport au format JSON.
+
+        Args:
+            path (str): chemin du fichier
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_report(), f, indent=2)
+
+    #-----> Composants
+    def _start_components(self):
+        """
+        Crée le serveur puis les clients, et attend que toutes les connexions
+        bilatérales soient établies.
+        """
+        self.server = BenchTCPServer(
+            ("localhost", self.port), externalhandler=self._on_receive
+        )
+        for i in range(0, self.nbclients):
+            clt = BenchTCPClient(
+                ("localhost", self.port), externalhandler=self._on_receive
+            )
+            self.clients.append(clt)
+        limit = time.perf_counter() + TCPBenchmark.READY_TIMEOUT
+        while not self._are_components_ready():
+            if time.perf_counter() > limit:
+                raise TimeoutError("Connexions clients / serveur incomplètes.")
+            time.sleep(0.05)
+
+    def _are_components_ready(self):
+        """
+        Indique si chaque client a un uid et une adresse d'écoute connue du serveur.
+        """
+        cltsdict = self.server.netdict["clients"]
+        for clt in self.clients:
+            if clt.uid == None or not clt.binded_to_read:
+                return False
+            if clt.uid not in cltsdict.keys() or cltsdict[clt.uid]["portout"] == None:
+                return False
+        return True
+
+    def _stop_components(self):
+        """
+        Arrêt des clients puis du serveur.
+        """
+        for clt in self.clients:
+            clt.shutdown()
+        self.clients = list()
+        if self.server != None:
+            self.server.shutdown()
+            self.server = None
+
+    #-----> Comptage des octets émis
+    def _install_wire_counter(self):
+        """
+        Substitue à CustomRequestHelper.send_indexed_request une version comptant
+        les octets des blocs envoyés.
+        """
+        self._native_send = CustomRequestHelper.__dict__["send_indexed_request"]
+        native_func = self._native_send.__func__
+        bench = self
+
+        def counting_send(cls, sock, bytesblocs):
+            nb = 0
+            for bloc in bytesblocs:
+                nb += len(bloc)
+            with bench._lock:
+                bench._wire_bytes += nb
+            return native_func(cls, sock, bytesblocs)
+
+        CustomRequestHelper.send_indexed_request = classmethod(counting_send)
+
+    def _uninstall_wire_counter(self):
+        """
+        Restaure CustomRequestHelper.send_indexed_request.
+        """
+        if self._native_send != None:
+            CustomRequestHelper.send_indexed_request = self._native_send
+            self._native_send = None
+
+    #-----> Réceptions
+    def _on_receive(self, dictargs):
+        """
+        Handler externe commun au serveur et aux clients : ne retient que les
+        messages de mesure du scénario en cours.
+        """
+        msg = dictargs.get("msg", None)
+        if not isinstance(msg, str) or "time" not in dictargs.keys():
+            return
+        index = msg.find(TCPBenchmark.BENCH_MARK)
+        if index == -1:
+            return
+        start = index + len(TCPBenchmark.BENCH_MARK)
+        runid, msgid, t0 = msg[start:].split("|", 3)[0:3]
+        with self._lock:
+            if int(runid) != self._runid:
+                # réception tardive d'un scénario précédent
+                return
+            # renvois (accusé de réception non parvenu) : une remise par destinataire
+            receptionid = (dictargs.get("client", None), msgid)
+            if receptionid in self._received_ids:
+                self._duplicates += 1
+                return
+            self._received_ids.add(receptionid)
+            t0 = float(t0)
+            self._receptions.append((dictargs["time"] - t0, dictargs["time"]))
+            if "cpu" in dictargs.keys():
+                self._handler_cpu += dictargs["cpu"]
+
+    def _wait_receptions(self, expected):
+        """
+        Attend la réception de expected messages, dans la limite de
+        TCPBenchmark.RECEIVE_TIMEOUT, ou jusqu'à ce qu'aucun message ne soit
+        reçu pendant TCPBenchmark.IDLE_TIMEOUT (messages perdus).
+        """
+        now = time.perf_counter()
+        limit = now + TCPBenchmark.RECEIVE_TIMEOUT
+        received = len(self._receptions)
+        last_change = now
+        while received < expected and now < limit:
+            time.sleep(0.005)
+            now = time.perf_counter()
+            if len(self._receptions) != received:
+                received = len(self._receptions)
+                last_change = now
+            elif now - last_change > TCPBenchmark.IDLE_TIMEOUT:
+                break
+
+    #-----> Scénarios
+    def _create_payload(self, size):
+        """
+        Contenu latin-1 de size caractères (cf CustomRequestHelper.create_test_msg).
+        """
+        return "".join([chr(n) for n in self._random.choices(range(48, 122), k=size)])
+
+    def _create_bench_msg(self, payload, sender):
+        """
+        Préfixe payload avec le marqueur de mesure, l'id de scénario,
+        l'identifiant du message (émetteur:séquence) et le temps d'envoi.
+        """
+        with self._lock:
+            seq = self._sequences.get(sender, 0)
+            self._sequences[sender] = seq + 1
+        return "".join(
+            [
+                TCPBenchmark.BENCH_MARK,
+                str(self._runid),
+                "|",
+                sender,
+                ":",
+                str(seq),
+                "|",
+                repr(time.perf_counter()),
+                "|",
+                payload,
+            ]
+        )
+
+    def _run_scenario(self, scenario, size, confirmrecept):
+        """
+        Joue un scénario et retourne le dict de résultats associé.
+        """
+        payload = self._create_payload(size)
+        with self._lock:
+            self._runid += 1
+            self._receptions = list()
+            self._received_ids = set()
+            self._duplicates = 0
+            self._handler_cpu = 0
+            self._sequences = dict()
+            self._wire_bytes = 0
+        uids = [clt.uid for clt in self.clients]
+        t_start = time.perf_counter()
+        if scenario == TCPBenchmark.SCENARIO_CLT_TO_SVR:
+            expected = self.count * self.nbclients
+            threads = list()
+            for clt in self.clients:
+                th = threading.Thread(
+                    target=self._client_send_loop,
+                    args=(clt, "c" + str(len(threads)), payload, confirmrecept),
+                )
+                th.daemon = True
+                threads.append(th)
+                th.start()
+            for th in threads:
+                th.join()
+            sender_cpu = 0
+        else:
+            if scenario == TCPBenchmark.SCENARIO_BROADCAST:
+                groups = [uids]
+            else:
+                groups = [[uid] for uid in uids]
+            expected = self.count * self.nbclients
+            cpu_start = time.thread_time()
+            for i in range(0, self.count):
+                for group in groups:
+                    msg = self._create_bench_msg(payload, "s")
+                    self.server.send(group, msg, confirmrecept)
+            sender_cpu = time.thread_time() - cpu_start
+        t_send_end = time.perf_counter()
+        self._wait_receptions(expected)
+        with self._lock:
+            latencies = sorted([r[0] for r in self._receptions])
+            # fin de scénario : dernière réception (hors attente des messages perdus)
+            t_end = max([t_send_end] + [r[1] for r in self._receptions])
+            handler_cpu = self._handler_cpu
+            wire_bytes = self._wire_bytes
+            duplicates = self._duplicates
+        received = len(latencies)
+        duration = t_end - t_start
+        server_cpu = sender_cpu
+        if scenario == TCPBenchmark.SCENARIO_CLT_TO_SVR:
+            server_cpu = handler_cpu
+        return {
+            "scenario": scenario,
+            "size": size,
+            "confirmrecept": confirmrecept,
+            "nbclients": self.nbclients,
+            "expected": expected,
+            "received": received,
+            "lost": expected - received,
+            "duplicates": duplicates,
+            "send_duration_s": round(t_send_end - t_start, 6),
+            "duration_s": round(duration, 6),
+            "msgs_per_s": round(received / duration, 2) if duration > 0 else None,
+            "latency_ms": self._get_latency_stats(latencies),
+            "wire_bytes": wire_bytes,
+            "wire_bytes_per_msg": round(wire_bytes / expected, 1),
+            "server_cpu_ms_per_msg": round(server_cpu * 1000 / expected, 4),
+        }
+
+    def _client_send_loop(self, clt, sender, payload, confirmrecept):
+        """
+        Boucle d'envoi d'un client (exécutée dans un thread dédié).
+        """
+        for i in range(0, self.count):
+            clt.send(self._create_bench_msg(payload, sender), confirmrecept)
+
+    #-----> Statistiques
+    def _get_latency_stats(cls, latencies):
+        """
+        Statistiques de latence en ms à partir d'une liste triée de durées en s.
+        """
+        if len(latencies) == 0:
+            return {"p50": None, "p99": None, "mean": None, "max": None}
+        return {
+            "p50": round(cls.get_percentile(latencies, 50) * 1000, 3),
+            "p99": round(cls.get_percentile(latencies, 99) * 1000, 3),
+            "mean": round(sum(latencies) * 1000 / len(latencies), 3),
+            "max": round(latencies[-1] * 1000, 3),
+        }
+
+    _get_latency_stats = classmethod(_get_latency_stats)
+
+    def get_percentile(cls, sortedvalues, percent):
+        """
+        Percentile (rang le plus proche) d'une liste triée non vide.
+
+        Args:
+            sortedvalues (list): valeurs triées
+            percent (float): entre 0 et 100
+        """
+        rank = int(round(percent / 100 * (len(sortedvalues) - 1)))
+        return sortedvalues[max(0, min(rank, len(sortedvalues) - 1))]
+
+    get_percentile = classmethod(get_percentile)
+
+
+# script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark réseau custom_TCP")
+    parser.add_argument("-c", "--clients", type=int, default=4)
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=None)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=TCPBenchmark.SCENARIOS, default=None
+    )
+    parser.add_argument("-p", "--port", type=int, default=16500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="tcp_benchmark.json")
+    args = parser.parse_args()
+    bench = TCPBenchmark(
+        nbclients=args.clients,
+        count=args.count,
+        sizes=args.sizes,
+        scenarios=args.scenarios,
+        port=args.port,
+        seed=args.seed,
+    )
+    report = bench.run()
+    bench.save(args.output)
+    for res in report["results"]:
+        print(
+            res["scenario"],
+            res["size"],
+            "AR" if res["confirmrecept"] else "noAR",
+            res["msgs_per_s"],
+            "msg/s",
+            res["latency_ms"],
+            res["wire_bytes_per_msg"],
+            "B/msg",
+            res["server_cpu_ms_per_msg"],
+            "ms CPU/msg",
+        )
+    # les threads internes des composants réseau sont des daemons :
+    sys.exit(0)
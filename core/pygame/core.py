@@ -91,6 +91,8 @@ d'objets.
 import os
 import re
 import math
+import time
+import collections
 from fractions import Fraction
 import pygame.locals
 from operator import itemgetter, attrgetter
@@ -264,6 +266,8 @@ class BoxModelObject:
         # Rect global (par rapport au root), nécessaire pour les tests de collision (cf events)
         self._globalRect = pygame.Rect(0, 0, 0, 0)
         self._globalRect_updated = False
+        # index spatial à notifier des modifications du rect global (cf events) :
+        self.spatial_index = None
         # Rects internes : surfaces alouées au contenu et aux bordure/fond
         self._inner_rects_valide = False
         # les rect de contenu et bordure sont ils en coords locales ou globales
@@ -932,6 +936,8 @@ class BoxModelObject:
     def _set_globalRect(self, val):
         if isinstance(val, pygame.Rect):
             self._globalRect = val
+            if self.spatial_index != None:
+                self.spatial_index.discard_item(self)
 
     globalRect = property(
         _get_globalRect, _set_globalRect
@@ -941,6 +947,8 @@ class BoxModelObject:
         """
         Invalide le rect global.
         """
+        if self._globalRect_updated and self.spatial_index != None:
+            self.spatial_index.discard_item(self)
         self._globalRect_updated = False
 
     def update_globalRect(self):
@@ -3824,6 +3832,9 @@ class RootContainer(RealContainer, evt.GUIEventManager):
     FULLSCREEN_MODE_NEAREST = "FULLSCREEN_MODE_NEAREST"  #: résolution supportée la plus proche des dimensions originelles de l'interface
     # mode par défaut :
     FULLSCREEN_MODE_DEFAULT = FULLSCREEN_MODE_NEAREST  #: mode par défaut
+    # cadencement de la boucle GUI :
+    IDLE_TIMEOUT = 0.25  #: attente max (s) d'un événement lorsque rien n'est à traiter
+    FRAME_STATS_SIZE = 300  #: nombre de frames conservées pour les statistiques
     # méthodes
     def __init__(self, resizable=True, framerate=60, icon=None, caption="", **kwargs):
         """
@@ -3911,10 +3922,29 @@ class RootContainer(RealContainer, evt.GUIEventManager):
     #-----> Spécifique
     def _init_framerate(self):
         """
-        Initialise le framerate.
+        Initialise le framerate et le cadencement de la boucle GUI.
         """
         self.clock = pygame.time.Clock()
         self.clock.tick(self.framerate)
+        self.frame_period = 1 / self.framerate
+        # événements extraits lors de l'attente de fin de frame :
+        self._pending_events = list()
+        # réveil de la boucle depuis un autre thread (voir get_wakeup_event) :
+        self._wakeup_event = evt.WakeupEvent()
+        # statistiques par frame :
+        self._frame_stats = collections.deque(maxlen=RootContainer.FRAME_STATS_SIZE)
+        self._display_time = 0
+        self.idle_frames_count = 0
+
+    def set_framerate(self, framerate):
+        """
+        Modifie le framerate cible.
+        
+        Args:
+            framerate (int): nombre de frames par seconde
+        """
+        self.framerate = framerate
+        self.frame_period = 1 / framerate
 
     def _init_videomode(self):
         """
@@ -4098,6 +4128,7 @@ class RootContainer(RealContainer, evt.GUIEventManager):
         """
         # [Keep for debug] print("...\nROOT| handle_display self._display_updated=",self._display_updated)
         if not self._display_updated:
+            t0 = time.perf_counter()
             self._display_updated = True
             # Update éventuel de la surface de publication
             if self._publication_surface_discarded:
@@ -4115,6 +4146,7 @@ class RootContainer(RealContainer, evt.GUIEventManager):
             pygame.display.update(rects)
             # ré initialisations :
             self.child_to_redraw = list()
+            self._display_time += time.perf_counter() - t0
 
     def xget_childs(self, context="publication"):
         """
@@ -4142,15 +4174,114 @@ class RootContainer(RealContainer, evt.GUIEventManager):
 
     def run_GUI_process(self):
         """
-        Boucle de gestion de la GUI
+        Boucle de gestion de la GUI : une frame au plus toutes les
+        self.frame_period secondes, attente bloquante d'un événement pygame
+        lorsque rien n'est à afficher ni à traiter (voir wait_next_frame).
         """
         while self.gui_process_active:
+            t0 = time.perf_counter()
             # pré-traitements personnalisés :
             self.before_frame_processed()
+            t1 = time.perf_counter()
             # événements :
-            self.handle_events()
+            pending, self._pending_events = self._pending_events, list()
+            self.handle_events(pending)
+            t2 = time.perf_counter()
             # publication, propagation des updates, resize et display :
+            self._display_time = 0
             self.update()
+            t3 = time.perf_counter()
+            if not self.gui_process_active:
+                break
+            idle = self.is_GUI_idle()
+            self._frame_stats.append(
+                (t1 - t0, t2 - t1, t3 - t2 - self._display_time, self._display_time, idle)
+            )
+            # attente de la frame suivante :
+            self.wait_next_frame(t0, idle)
+
+    def wait_next_frame(self, framestart, idle):
+        """
+        Bloque jusqu'à la frame suivante ou jusqu'au prochain événement pygame.
+        
+        Args:
+            framestart (float): time.perf_counter() au début de la frame
+            idle (boolean): si True (rien à afficher ni à traiter) l'attente
+                n'est bornée que par get_idle_timeout()
+        """
+        if idle:
+            self.idle_frames_count += 1
+            timeout = self.get_idle_timeout()
+        else:
+            timeout = self.frame_period - (time.perf_counter() - framestart)
+        if timeout <= 0:
+            return
+        # Rq : pygame >= 2.0 (timeout en ms), wait(0) bloque sans limite
+        e = pygame.event.wait(max(1, math.ceil(timeout * 1000)))
+        if e.type != pygame.NOEVENT:
+            # événement traité en premier à la frame suivante :
+            self._pending_events.append(e)
+
+    def is_GUI_idle(self):
+        """
+        Indique si la boucle peut se bloquer en attente d'événement : affichage
+        à jour, pas de publication ni de layout en attente, pas de travail
+        signalé par has_pending_frame_work.
+        """
+        if not self._display_updated or not self._layout_updated:
+            return False
+        if len(self._publicationlist) > 0 or len(self.child_to_redraw) > 0:
+            return False
+        return not self.has_pending_frame_work()
+
+    def has_pending_frame_work(self):
+        """
+        Indique si des traitements (animation, tâches...) nécessitent des frames
+        à la cadence nominale, à subclasser.
+        """
+        return False
+
+    def get_idle_timeout(self):
+        """
+        Durée d'attente max (s) lorsque la GUI est inactive, à subclasser pour
+        tenir compte d'échéances connues (actions différées...).
+        """
+        return RootContainer.IDLE_TIMEOUT
+
+    def get_wakeup_event(self):
+        """
+        Retourne l'objet WakeupEvent réveillant la boucle en attente (méthode set
+        appelable depuis n'importe quel thread, compatible QueueManager.add_listener).
+        """
+        return self._wakeup_event
+
+    def get_frame_stats(self):
+        """
+        Statistiques sur les dernières frames (au plus RootContainer.FRAME_STATS_SIZE).
+        
+        Returns:
+            dict: {"frames":, "idle":, "idle_total":, "mean":{...}, "max":{...}} avec
+            des durées en ms par étape ("before", "events", "update", "display", "total")
+        """
+        stages = ["before", "events", "update", "display"]
+        frames = list(self._frame_stats)
+        result = {
+            "frames": len(frames),
+            "idle": len([f for f in frames if f[4]]),
+            "idle_total": self.idle_frames_count,
+            "mean": dict(),
+            "max": dict(),
+        }
+        if len(frames) == 0:
+            return result
+        for i in range(len(stages)):
+            values = [f[i] * 1000 for f in frames]
+            result["mean"][stages[i]] = sum(values) / len(values)
+            result["max"][stages[i]] = max(values)
+        totals = [sum(f[0:4]) * 1000 for f in frames]
+        result["mean"]["total"] = sum(totals) / len(totals)
+        result["max"]["total"] = max(totals)
+        return result
 
     def before_frame_processed(self):
         """
@@ -4176,7 +4307,7 @@ class RootContainer(RealContainer, evt.GUIEventManager):
         self.stop_GUI()
         # Evite l'erreur "video system not initialized" lors de l'appel à
         # pygame.event.get() dans la version initiale de handle_events :
-        self.handle_events = lambda: None
+        self.handle_events = lambda *args: None
         # Clôture de Pygame :
         pygame.quit()
 
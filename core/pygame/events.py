@@ -15,10 +15,12 @@ import pygame.locals
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = [
     "CustomEventManager",
+    "HitTestGrid",
     "GUIEventManager",
     "CustomBaseControl",
     "CustomBaseInput",
     "CustomBaseButton",
+    "WakeupEvent",
 ]
 # classes :
 class CustomEventManager:
@@ -132,6 +134,8 @@ class CustomEventManager:
     CE_UNREGISTER = pygame.USEREVENT + 2  #: événement désabonnement de contrôle
     # événement de demande de focus pour un input
     CE_ASK_INPUT_FOCUS = pygame.USEREVENT + 3  #: événement demande de focus d'input
+    # réveil de la boucle principale en attente d'événement (sans traitement) :
+    CE_WAKEUP = pygame.USEREVENT + 4  #: événement de réveil de la boucle GUI
     # types d'événements ciblés par un contrôle :
     MOUSE_CLIC = "MOUSE_CLIC"  #: événement souris
     MOUSE_OVER = "MOUSE_OVER"  #: événement souris
@@ -139,6 +143,8 @@ class CustomEventManager:
     MOUSE_MOVE = "MOUSE_MOVE"  #: événement souris
     KEY_PRESSED = "KEY_PRESSED"  #: événement touche
     KEY_RELEASED = "KEY_RELEASED"  #: événement touche
+    # optimisation : regroupement des séries de pygame.MOUSEMOTION
+    COALESCE_MOUSEMOTION = True  #: ne traite que le dernier MOUSEMOTION d'une série
     # méthodes
     def __init__(self, Mngr):
         """
@@ -149,6 +155,9 @@ class CustomEventManager:
         """
         # ref à la GUI :
         self.Mngr = Mngr
+        # regroupement des événements MOUSEMOTION :
+        self.coalesce_motion = CustomEventManager.COALESCE_MOUSEMOTION
+        self.coalesced_count = 0
         # initalisations :
         self._init_control_dict()
 
@@ -157,6 +166,8 @@ class CustomEventManager:
         Initialise le dict d'enregistrement des contrôles (boutons et inputs).
         """
         self.ctrl_dict = dict()
+        # index spatial des contrôles souris :
+        self.hit_index = HitTestGrid()
         self.ctrl_dict[CustomEventManager.MOUSE_CLIC] = list()
         self.ctrl_dict[CustomEventManager.MOUSE_MOVE] = list()
         self.ctrl_dict[CustomEventManager.KEY_PRESSED] = list()
@@ -164,12 +175,21 @@ class CustomEventManager:
         self.ctrl_dict["InputControls"] = list()
         self.ctrl_dict["ButtonOver"] = None
 
-    def handle_events(self):
+    def handle_events(self, pending=None):
         """
         Interface avec la GUI : méthode à appeler à chaque frame d'éxécution. 
         Dépile les événements pygame, applique les traitements internes, informe la GUI.
-        """
-        for e in pygame.event.get():
+        
+        Args:
+            pending (list): événements déjà extraits de la file pygame (par
+                exemple lors d'une attente pygame.event.wait), traités en premier
+        """
+        events = pygame.event.get()
+        if pending:
+            events = pending + events
+        if self.coalesce_motion:
+            events = self.coalesce_mouse_motion(events)
+        for e in events:
             if e.type == CustomEventManager.CE_REGISTER:
                 self._register_control(e)
             elif e.type == CustomEventManager.CE_UNREGISTER:
@@ -194,36 +214,43 @@ class CustomEventManager:
             elif e.type == pygame.ACTIVEEVENT:
                 self.Mngr.on_active_event(e)
 
+    def coalesce_mouse_motion(self, events):
+        """
+        Ne conserve que le dernier événement de chaque série consécutive de
+        pygame.MOUSEMOTION (l'ordre relatif aux autres événements est préservé).
+        """
+        coalesced = list()
+        for e in events:
+            if (
+                e.type == pygame.MOUSEMOTION
+                and len(coalesced) > 0
+                and coalesced[-1].type == pygame.MOUSEMOTION
+            ):
+                coalesced[-1] = e
+                self.coalesced_count += 1
+            else:
+                coalesced.append(e)
+        return coalesced
+
     def _handle_mouse_evt(self, evt):
         """
         Gestion interne des événements souris
         """
-        ctrllist = None
+        ctrlkey = None
         if evt.type == pygame.MOUSEBUTTONDOWN and evt.button == 1:
             # ie CustomEventManager.MOUSE_CLIC avec le bouton gauche
-            ctrllist = self.ctrl_dict[CustomEventManager.MOUSE_CLIC]
+            ctrlkey = CustomEventManager.MOUSE_CLIC
         elif evt.type == pygame.MOUSEBUTTONUP and evt.button == 1:
             # release soit CustomEventManager.MOUSE_OVER
-            ctrllist = self.ctrl_dict[CustomEventManager.MOUSE_MOVE]
+            ctrlkey = CustomEventManager.MOUSE_MOVE
         elif evt.type == pygame.MOUSEMOTION:
             # CustomEventManager.MOUSE_OVER ou CustomEventManager.MOUSE_OUT
-            ctrllist = self.ctrl_dict[CustomEventManager.MOUSE_MOVE]
-        if ctrllist == None:
+            ctrlkey = CustomEventManager.MOUSE_MOVE
+        if ctrlkey == None:
             return
-        # ctrl survolés ou non par la souris
-        colidelist = list()
-        noncolidelist = list()
-        for ctrl in ctrllist:
-            if ctrl.enabled and ctrl.visible:
-                if ctrl.globalRect.collidepoint(evt.pos):
-                    colidelist.append(ctrl)
-                else:
-                    noncolidelist.append(ctrl)
-        # Filtrage : on sélectionne le ctrl activé, visible et de plus grand z-index :
-        overctrl = None
+        # ctrl activé, visible, survolé par la souris et enregistré en premier :
+        overctrl = self.hit_index.get_item_at(evt.pos, ctrlkey)
         prevoverctrl = self.ctrl_dict["ButtonOver"]
-        if len(colidelist) > 0:
-            overctrl = colidelist[0]
         # contrôles survolés ou cliqués :
         if evt.type == pygame.MOUSEBUTTONDOWN:
             customevent = CustomEventManager.MOUSE_CLIC
@@ -285,12 +312,14 @@ class CustomEventManager:
             if evttype == CustomEventManager.MOUSE_CLIC:
                 if ctrl not in self.ctrl_dict[evttype]:
                     self.ctrl_dict[evttype].append(ctrl)
+                    self.hit_index.add_item(ctrl, evttype)
             elif evttype in [
                 CustomEventManager.MOUSE_OVER,
                 CustomEventManager.MOUSE_OUT,
             ]:
                 if ctrl not in self.ctrl_dict[CustomEventManager.MOUSE_MOVE]:
                     self.ctrl_dict[CustomEventManager.MOUSE_MOVE].append(ctrl)
+                    self.hit_index.add_item(ctrl, CustomEventManager.MOUSE_MOVE)
             elif evttype == CustomEventManager.KEY_PRESSED:
                 if ctrl not in self.ctrl_dict[CustomEventManager.KEY_PRESSED]:
                     self.ctrl_dict[CustomEventManager.KEY_PRESSED].append(ctrl)
@@ -313,12 +342,14 @@ class CustomEventManager:
             if evttype == CustomEventManager.MOUSE_CLIC:
                 if ctrl in self.ctrl_dict[CustomEventManager.MOUSE_CLIC]:
                     self.ctrl_dict[CustomEventManager.MOUSE_CLIC].remove(ctrl)
+                    self.hit_index.remove_item(ctrl, evttype)
             elif evttype in [
                 CustomEventManager.MOUSE_OVER,
                 CustomEventManager.MOUSE_OUT,
             ]:
                 if ctrl in self.ctrl_dict[CustomEventManager.MOUSE_MOVE]:
                     self.ctrl_dict[CustomEventManager.MOUSE_MOVE].remove(ctrl)
+                    self.hit_index.remove_item(ctrl, CustomEventManager.MOUSE_MOVE)
             elif evttype == CustomEventManager.KEY_PRESSED:
                 if ctrl in self.ctrl_dict[CustomEventManager.KEY_PRESSED]:
                     self.ctrl_dict[CustomEventManager.KEY_PRESSED].remove(ctrl)
@@ -327,6 +358,146 @@ class CustomEventManager:
                     self.ctrl_dict[CustomEventManager.KEY_RELEASED].remove(ctrl)
 
 
+class HitTestGrid:
+    """
+    Index spatial (grille uniforme) des rects globaux des contrôles, utilisé par
+    CustomEventManager pour les tests de collision souris.
+    
+    Les contrôles sont indexés par "liste" (MOUSE_CLIC, MOUSE_MOVE) avec leur
+    ordre d'enregistrement. Un contrôle indexé est notifié (attribut
+    spatial_index) des invalidations de son rect global, il est ré-indexé lors
+    de la requête suivante.
+    """
+
+    # statique :
+    CELL_SIZE = 64  #: taille des cellules de la grille (pixels)
+    # méthodes
+    def __init__(self, cellsize=None):
+        """
+        Constructeur
+        
+        Args:
+            cellsize (int): taille des cellules (HitTestGrid.CELL_SIZE par défaut)
+        """
+        if cellsize == None:
+            cellsize = HitTestGrid.CELL_SIZE
+        self.cellsize = cellsize
+        # cellule -> liste des contrôles intersectant la cellule :
+        self._cells = dict()
+        # contrôle -> cellules occupées :
+        self._items = dict()
+        # liste -> {contrôle: ordre d'enregistrement}
+        self._orders = dict()
+        self._seq = 0
+        # contrôles à ré-indexer :
+        self._dirty = set()
+
+    #-----> Enregistrement
+    def add_item(self, item, key):
+        """
+        Indexe item dans la liste key.
+        """
+        orders = self._orders.setdefault(key, dict())
+        if item in orders:
+            return
+        self._seq += 1
+        orders[item] = self._seq
+        if item not in self._items:
+            self._index_item(item)
+            item.spatial_index = self
+
+    def remove_item(self, item, key):
+        """
+        Retire item de la liste key (et de la grille s'il n'est plus référencé).
+        """
+        orders = self._orders.get(key, None)
+        if orders == None or item not in orders:
+            return
+        del orders[item]
+        for otherorders in self._orders.values():
+            if item in otherorders:
+                return
+        self._unindex_item(item)
+        self._dirty.discard(item)
+        if item.spatial_index == self:
+            item.spatial_index = None
+
+    def discard_item(self, item):
+        """
+        Notification : le rect global de item a été invalidé.
+        """
+        self._dirty.add(item)
+
+    #-----> Requête
+    def get_item_at(self, pos, key):
+        """
+        Retourne le contrôle de la liste key, activé, visible, dont le rect global
+        contient pos et enregistré en premier, ou None.
+        """
+        self._update_dirty_items()
+        orders = self._orders.get(key, None)
+        if not orders:
+            return None
+        cell = pos[0] // self.cellsize, pos[1] // self.cellsize
+        found = None
+        foundseq = None
+        for item in self._cells.get(cell, ()):
+            seq = orders.get(item, None)
+            if seq == None or (foundseq != None and seq > foundseq):
+                continue
+            if item.enabled and item.visible and item.globalRect.collidepoint(pos):
+                found = item
+                foundseq = seq
+        return found
+
+    def get_items_count(self):
+        """
+        Nombre de contrôles indexés.
+        """
+        return len(self._items)
+
+    #-----> Grille
+    def _update_dirty_items(self):
+        """
+        Ré-indexe les contrôles dont le rect global a été invalidé.
+        """
+        if len(self._dirty) == 0:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        for item in dirty:
+            if item in self._items:
+                self._unindex_item(item)
+                self._index_item(item)
+
+    def _index_item(self, item):
+        """
+        Ajoute item aux cellules couvertes par son rect global.
+        """
+        rect = item.globalRect
+        cells = list()
+        if rect.width > 0 and rect.height > 0:
+            cs = self.cellsize
+            for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                    self._cells.setdefault((cx, cy), list()).append(item)
+                    cells.append((cx, cy))
+        self._items[item] = cells
+
+    def _unindex_item(self, item):
+        """
+        Retire item de la grille.
+        """
+        cells = self._items.pop(item, None)
+        if cells == None:
+            return
+        for cell in cells:
+            celllist = self._cells[cell]
+            celllist.remove(item)
+            if len(celllist) == 0:
+                del self._cells[cell]
+
+
 class GUIEventManager:
     """
     "Interface" de la GUI utilisant par composition CustomEventManager.
@@ -339,11 +510,14 @@ class GUIEventManager:
         # Manager d'événement :
         self._eventMngr = CustomEventManager(self)
 
-    def handle_events(self):
+    def handle_events(self, pending=None):
         """
         Méthode à appeler à chaque frame d'exécution pour traiter les événements.
+        
+        Args:
+            pending (list): événements déjà extraits de la file pygame
         """
-        self._eventMngr.handle_events()
+        self._eventMngr.handle_events(pending)
 
     def on_resize_event(self, event):
         """
@@ -737,3 +911,23 @@ class CustomBaseButton(CustomBaseControl):
             if st != None:
                 self._show_state(st)
                 self.send_callback(st)
+
+
+class WakeupEvent:
+    """
+    Equivalent pygame d'un threading.Event pour une boucle GUI bloquée dans
+    pygame.event.wait : set() poste l'événement CustomEventManager.CE_WAKEUP.
+    Peut être enregistré comme listener de Queue (QueueManager.add_listener).
+    """
+
+    def set(self):
+        """
+        Réveille la boucle GUI (appelable depuis n'importe quel thread).
+        """
+        if not pygame.display.get_init():
+            return
+        try:
+            pygame.event.post(pygame.event.Event(CustomEventManager.CE_WAKEUP))
+        except pygame.error:
+            # file d'événements pleine : la boucle est de toute façon réveillée
+            pass
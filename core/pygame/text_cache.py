@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Cache de rendu des textes** des widgets Text (module :doc:`labpyproject.core.pygame.widgets`).
+
+Trois niveaux, bornés en mémoire (LRU) :
+
+* rendus complets : surface de texte et dimensions, par (texte, police, style,
+  couleurs, géométrie)
+* mises en page : lignes après wrap (pygame.font.Font)
+* mots (pygame.freetype.Font) : métriques et surfaces de rendu de chaque mot
+
+La clef de police intègre son style (taille, gras, italique...) : la
+modification du style d'une police invalide de fait les entrées associées.
+Les surfaces mises en cache sont partagées et ne doivent pas être modifiées.
+"""
+# imports :
+import collections
+import pygame.freetype
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["TextCache"]
+# classes :
+class _LRUStore:
+    """
+    Dictionnaire LRU borné en poids (octets estimés).
+    """
+
+    def __init__(self, maxbytes):
+        """
+        Constructeur
+        """
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self._items = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Retourne la valeur associée à key ou None.
+        """
+        item = self._items.get(key, None)
+        if item == None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value, nbytes):
+        """
+        Enregistre une valeur et évince au besoin les plus anciennes.
+        """
+        if nbytes > self.maxbytes:
+            return
+        previous = self._items.pop(key, None)
+        if previous != None:
+            self.bytes -= previous[1]
+        self._items[key] = (value, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.maxbytes and len(self._items) > 0:
+            key, item = self._items.popitem(last=False)
+            self.bytes -= item[1]
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Vide le store.
+        """
+        self._items = collections.OrderedDict()
+        self.bytes = 0
+
+    def get_stats(self):
+        """
+        Compteurs du store.
+        """
+        return {
+            "count": len(self._items),
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TextCache:
+    """
+    Cache partagé des rendus de texte, mises en page et mots.
+    """
+
+    # statique :
+    RENDER_MAX_BYTES = 16 * 1024 * 1024  #: budget des rendus complets (octets)
+    LAYOUT_MAX_BYTES = 1024 * 1024  #: budget des mises en page (octets estimés)
+    WORD_MAX_BYTES = 4 * 1024 * 1024  #: budget des mots freetype (octets)
+    # méthodes :
+    def __init__(self, render_maxbytes=None, layout_maxbytes=None, word_maxbytes=None):
+        """
+        Constructeur
+
+        Args:
+            render_maxbytes (int): budget des rendus complets
+            layout_maxbytes (int): budget des mises en page
+            word_maxbytes (int): budget des mots freetype
+        """
+        if render_maxbytes == None:
+            render_maxbytes = TextCache.RENDER_MAX_BYTES
+        if layout_maxbytes == None:
+            layout_maxbytes = TextCache.LAYOUT_MAX_BYTES
+        if word_maxbytes == None:
+            word_maxbytes = TextCache.WORD_MAX_BYTES
+        self._renders = _LRUStore(render_maxbytes)
+        self._layouts = _LRUStore(layout_maxbytes)
+        self._words = _LRUStore(word_maxbytes)
+
+    #-----> Clefs
+    def get_font_key(self, fontobj):
+        """
+        Retourne la clef d'une police, intégrant son style courant.
+
+        Args:
+            fontobj: pygame.font.Font ou pygame.freetype.Font
+
+        Returns:
+            tuple
+        """
+        if isinstance(fontobj, pygame.freetype.Font):
+            return (
+                fontobj,
+                fontobj.size,
+                fontobj.style,
+                fontobj.strength,
+                fontobj.antialiased,
+                fontobj.kerning,
+                fontobj.pad,
+            )
+        return (
+            fontobj,
+            fontobj.get_bold(),
+            fontobj.get_italic(),
+            fontobj.get_underline(),
+        )
+
+    def get_color_key(self, color):
+        """
+        Retourne une couleur sous forme de tuple (les pygame.Color ne sont pas
+        hashables avec pygame 2).
+        """
+        if color == None:
+            return None
+        return tuple(color)
+
+    #-----> Rendus complets
+    def get_render(self, key):
+        """
+        Retourne le rendu (surface, text_size) associé à key ou None.
+        """
+        return self._renders.get(key)
+
+    def put_render(self, key, surface, text_size):
+        """
+        Enregistre un rendu complet.
+        """
+        w, h = surface.get_size()
+        self._renders.put(key, (surface, text_size), w * h * surface.get_bytesize())
+
+    #-----> Mises en page
+    def get_layout(self, key):
+        """
+        Retourne la liste des lignes associée à key ou None.
+        """
+        return self._layouts.get(key)
+
+    def put_layout(self, key, lines):
+        """
+        Enregistre une mise en page (liste de lignes).
+        """
+        nbytes = 64 + sum([len(line) for line in lines]) * 2
+        self._layouts.put(key, list(lines), nbytes)
+
+    #-----> Mots freetype
+    def get_word(self, fontobj, fontkey, word, fgcolor):
+        """
+        Retourne le rendu d'un mot (freetype, origin=True).
+
+        Args:
+            fontobj (pygame.freetype.Font)
+            fontkey (tuple): voir get_font_key
+            word (str)
+            fgcolor (pygame.Color)
+
+        Returns:
+            tuple: (surface, rect) voir pygame.freetype.Font.render, rect donnant
+            les métriques du mot (rect.x : décalage horizontal, rect.y : hauteur
+            au dessus de la ligne de base)
+        """
+        key = (fontkey, word, self.get_color_key(fgcolor))
+        item = self._words.get(key)
+        if item == None:
+            if word == "":
+                # pygame.freetype refuse le rendu d'une chaine vide
+                item = (None, fontobj.get_rect(word))
+                nbytes = 64
+            else:
+                surf, rect = fontobj.render(word, fgcolor=fgcolor)
+                item = (surf, rect)
+                nbytes = surf.get_width() * surf.get_height() * surf.get_bytesize()
+            self._words.put(key, item, nbytes)
+        return item
+
+    #-----> Gestion
+    def clear(self):
+        """
+        Vide l'ensemble des caches.
+        """
+        self._renders.clear()
+        self._layouts.clear()
+        self._words.clear()
+
+    def get_stats(self):
+        """
+        Statistiques des caches.
+
+        Returns:
+            dict: {"renders":, "layouts":, "words":} voir _LRUStore.get_stats
+        """
+        return {
+            "renders": self._renders.get_stats(),
+            "layouts": self._layouts.get_stats(),
+            "words": self._words.get_stats(),
+        }
@@ -25,6 +25,7 @@ import math
 import pygame.freetype
 import labpyproject.core.pygame.events as evt
 import labpyproject.core.pygame.core as co
+from labpyproject.core.pygame.text_cache import TextCache
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
 __all__ = [
@@ -248,6 +249,8 @@ class Text(co.CustomSprite):
     LEFT_ALIGN = "left"  #: valeur d'alignement
     CENTER_ALIGN = "center"  #: valeur d'alignement
     RIGHT_ALIGN = "right"  #: valeur d'alignement
+    # cache de rendu partagé (None pour le désactiver) :
+    TEXT_CACHE = TextCache()  #: rendus, mises en page et mots (voir TextCache)
     # classes :
     def __init__(
         self,
@@ -405,34 +408,71 @@ class Text(co.CustomSprite):
 
     def render_text(self, txt=None):
         """
-        Rendu du texte sur la surface dédiée self.text_surface.
+        Rendu du texte sur la surface dédiée self.text_surface (partagée via
+        Text.TEXT_CACHE lorsque le même rendu a déjà été calculé).
         """
         if self.rect.w <= 0 or self.rect.h <= 0:
             self.discard_render()
             self.text_size = None, None
             return
-        # surface de rendu du texte :
-        self.create_text_surface()
         # affichage du texte :
         chaine = txt
         if txt == None:
             chaine = self._text
         if len(chaine) == 0:
             chaine = " "
+        if self._typefont not in ["freetype", "font"]:
+            self.create_text_surface()
+            self.text_size = None, None
+            self.dirty = 1
+            return
+        # rendu déja calculé :
+        cache = Text.TEXT_CACHE
+        key = None
+        if cache != None:
+            key = self.get_render_key(chaine)
+            cached = cache.get_render(key)
+            if cached != None:
+                self.text_surface, self.text_size = cached
+                self.dirty = 1
+                self._textrender_updated = True
+                return
+        # surface de rendu du texte :
+        self.create_text_surface()
         # wrap
         self.text_size = None, None
         if self._typefont == "freetype":
             self.text_size = self.wrap_text_freetype(self.text_surface, chaine)
-        elif self._typefont == "font":
-            self.text_size = self.wrap_text_font(self.text_surface, chaine)
         else:
-            self.dirty = 1
-            return
+            self.text_size = self.wrap_text_font(self.text_surface, chaine)
+        if cache != None:
+            cache.put_render(key, self.text_surface, self.text_size)
         # rendu
         self.dirty = 1
         # maj
         self._textrender_updated = True
 
+    def get_render_key(self, chaine):
+        """
+        Clef de cache du rendu de chaine avec les paramètres courants (police,
+        couleurs, géométrie).
+        """
+        cache = Text.TEXT_CACHE
+        bgcolor = None
+        if self._bgcolor != None and self._bgcolor.a == 255:
+            bgcolor = cache.get_color_key(self._bgcolor)
+        return (
+            chaine,
+            cache.get_font_key(self._fontobj),
+            cache.get_color_key(self.fgcolor),
+            bgcolor,
+            tuple(self.rect.size),
+            tuple(self.get_border_rect()),
+            tuple(self.get_content_rect()),
+            self._linespace,
+            self._textalign,
+        )
+
     def create_text_surface(self):
         """
         Crée la surface de rendu du texte.
@@ -468,11 +508,22 @@ class Text(co.CustomSprite):
         space = font.get_rect(" ")
         txtwidth = 0
         txtheight = y
+        # cache des mots (rendu et métriques) :
+        cache = Text.TEXT_CACHE
+        fontkey = None
+        if cache != None:
+            fontkey = cache.get_font_key(font)
         # wrap
         for line in lines:
             words = line.split(" ")
             for word in words:
-                bounds = font.get_rect(word)
+                wordsurf = None
+                if cache != None:
+                    wordsurf, bounds = cache.get_word(
+                        font, fontkey, word, self.fgcolor
+                    )
+                else:
+                    bounds = font.get_rect(word)
                 if x + bounds.width + bounds.x >= width:
                     x, y = xc, y + line_spacing
                     txtheight += line_spacing
@@ -480,7 +531,12 @@ class Text(co.CustomSprite):
                     break
                 if y + bounds.height - bounds.y >= height:
                     break
-                font.render_to(surf, (x, y), None, fgcolor=self.fgcolor)
+                if cache != None:
+                    if wordsurf != None:
+                        # équivalent de render_to avec origin=True
+                        surf.blit(wordsurf, (x + bounds.x, y - bounds.y))
+                else:
+                    font.render_to(surf, (x, y), None, fgcolor=self.fgcolor)
                 x += bounds.width + space.width
                 txtwidth = max(txtwidth, x)
             x, y = xc, y + line_spacing
@@ -503,6 +559,47 @@ class Text(co.CustomSprite):
         width, height = content_rect.w, content_rect.h
         xc, yc = content_rect.x, content_rect.y
         line_spacing = font.get_linesize() + self._linespace
+        # mise en page déja calculée :
+        cache = Text.TEXT_CACHE
+        layoutkey = None
+        cachedlines = None
+        if cache != None:
+            layoutkey = (txt, cache.get_font_key(font), width, height, line_spacing)
+            cachedlines = cache.get_layout(layoutkey)
+        if cachedlines != None:
+            lines = list(cachedlines)
+        else:
+            lines = self._compute_font_layout(lines, width, height, line_spacing)
+            if cache != None:
+                cache.put_layout(layoutkey, lines)
+        # rendu :
+        x, y = xc, yc
+        txtwidth = 0
+        txtheight = 0
+        bgcol = None
+        if self._bgcolor != None and self._bgcolor.a == 255:
+            bgcol = self._bgcolor
+        for line in lines:
+            surfline = font.render(line, True, self.fgcolor, bgcol)
+            sw = surfline.get_size()[0]
+            if self._textalign == Text.CENTER_ALIGN:
+                x = math.ceil((width - sw) / 2)
+            elif self._textalign == Text.RIGHT_ALIGN:
+                x = math.ceil(width - sw)
+            surf.blit(surfline, (x, y))
+            txtwidth = max(txtwidth, sw + x)
+            x, y = xc, y + line_spacing
+            txtheight = y
+            if line != lines[-1]:
+                txtheight += line_spacing
+        return txtwidth, txtheight
+
+    def _compute_font_layout(self, lines, width, height, line_spacing):
+        """
+        Découpe les lignes à la largeur width et tronque à la hauteur height
+        (pygame.font.Font).
+        """
+        font = self._fontobj
         # largeur :
         i = 0
         while i < len(lines):
@@ -536,27 +633,7 @@ class Text(co.CustomSprite):
                 if len(lastline) > 6:
                     lastline = lastline[0:-6] + "[...]"
                     lines[i - 1] = lastline
-        # rendu :
-        x, y = xc, yc
-        txtwidth = 0
-        txtheight = 0
-        bgcol = None
-        if self._bgcolor != None and self._bgcolor.a == 255:
-            bgcol = self._bgcolor
-        for line in lines:
-            surfline = font.render(line, True, self.fgcolor, bgcol)
-            sw = surfline.get_size()[0]
-            if self._textalign == Text.CENTER_ALIGN:
-                x = math.ceil((width - sw) / 2)
-            elif self._textalign == Text.RIGHT_ALIGN:
-                x = math.ceil(width - sw)
-            surf.blit(surfline, (x, y))
-            txtwidth = max(txtwidth, sw + x)
-            x, y = xc, y + line_spacing
-            txtheight = y
-            if line != lines[-1]:
-                txtheight += line_spacing
-        return txtwidth, txtheight
+        return lines
 
 
 class Entry(Text, evt.CustomBaseInput):
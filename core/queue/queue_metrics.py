@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+**Télémétrie des Queues** distribuées par `QueueManager`.
+
+Activée via `QueueManager.enable_metrics`, elle enregistre par keycode :
+
+* le nombre de commandes empilées / dépilées, globalement et par type d'échange
+  (attribut `typeexchange` de la commande, nom de sa classe à défaut)
+* la profondeur courante et max de la Queue, le nombre de commandes fusionnées
+  (coalescence des LaneQueue)
+* l'histogramme des latences d'attente : chaque commande est horodatée à l'empilement
+  (attribut `enqueue_time`), la latence étant mesurée au dépilement
+
+Une alerte est levée lorsqu'un canal s'engorge (profondeur ou latence au delà d'un
+seuil, voir `set_alert`). Comparer les latences des Queues APP -> GUI et
+APP -> BUSINESS permet par exemple de distinguer une interface affamée d'un
+thread métier saturé.
+
+**Exports :**
+
+* `get_snapshot` : dict sérialisable en JSON (débits calculés depuis le snapshot
+  précédent)
+* `write_snapshot` : écriture atomique dans un fichier
+* `start_periodic_export` : snapshot périodique (fichier et/ou handler) dans un
+  thread dédié
+"""
+# imports
+import time
+import json
+import threading
+import collections
+from labpyproject.core.metrics.metrics_tools import (
+    Histogram,
+    PeriodicExporter,
+    write_atomic,
+)
+
+# Evite l'ajout non désiré de certains imports à la doc sphinx
+__all__ = ["QueueMetrics"]
+# classes
+class QueueMetrics:
+    """
+    Registre de métriques des Queues, par keycode (thread safe).
+    """
+
+    # statique :
+    ALERT_DEPTH = "depth"  #: alerte de profondeur
+    ALERT_LATENCY = "latency"  #: alerte de latence
+    ALERTS_HISTORY = 20  #: nombre d'alertes conservées dans les snapshots
+    LATENCY_BUCKETS = [
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+    ]  #: bornes de l'histogramme des latences d'attente (s), +Inf implicite
+    # méthodes
+    def __init__(self, queuesizehandler=None):
+        """
+        Constructeur
+
+        Args:
+            queuesizehandler (function): fonction retournant un dict
+                {keycode: (profondeur, nombre de commandes fusionnées)}, appelée
+                à chaque snapshot
+        """
+        self.queuesizehandler = queuesizehandler
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+        self._queues = dict()
+        # seuils d'alerte :
+        self.depth_threshold = None
+        self.latency_threshold = None
+        self.alerthandler = None
+        self._alerts = collections.deque(maxlen=QueueMetrics.ALERTS_HISTORY)
+        # snapshot précédent (calcul des débits) :
+        self._prev_counts = None
+        self._prev_time = None
+        # export périodique :
+        self._exporter = PeriodicExporter("QueueMetrics_export_" + str(id(self)))
+
+    #-----> Alertes
+    def set_alert(self, depth=None, latency=None, handler=None):
+        """
+        Définit les seuils d'engorgement d'un canal. Une alerte n'est relevée
+        qu'une fois par épisode, jusqu'à ce que la profondeur (ou la latence)
+        repasse sous la moitié du seuil.
+
+        Args:
+            depth (int): profondeur max tolérée ou None
+            latency (float): latence d'attente max tolérée (s) ou None
+            handler (function): appelée avec le dict d'alerte, depuis le thread
+                empilant / dépilant la commande (doit être rapide)
+        """
+        self.depth_threshold = depth
+        self.latency_threshold = latency
+        self.alerthandler = handler
+
+    def _raise_alert(self, keycode, alerttype, value, threshold):
+        """
+        Enregistre et signale une alerte.
+        Rq : à appeler hors verrou.
+        """
+        alertdict = {
+            "keycode": keycode,
+            "type": alerttype,
+            "value": value,
+            "threshold": threshold,
+            "time": time.time(),
+        }
+        with self._lock:
+            self._alerts.append(alertdict)
+        if self.alerthandler != None:
+            self.alerthandler(alertdict)
+
+    #-----> Enregistrement
+    def _get_queue(self, keycode):
+        """
+        Retourne (en le créant au besoin) le dict de métriques de keycode.
+        Rq : à appeler sous verrou.
+        """
+        qdict = self._queues.get(keycode, None)
+        if qdict == None:
+            qdict = self._queues[keycode] = {
+                "puts": 0,
+                "gets": 0,
+                "max_depth": 0,
+                "types": dict(),
+                "latency": Histogram(QueueMetrics.LATENCY_BUCKETS),
+                "alerts": 0,
+                "backed_up": False,
+                "lagging": False,
+            }
+        return qdict
+
+    def _get_type_counts(self, qdict, cmd):
+        """
+        Retourne le dict de compteurs du type d'échange de cmd.
+        Rq : à appeler sous verrou.
+        """
+        typename = getattr(cmd, "typeexchange", None)
+        if typename == None:
+            typename = type(cmd).__name__
+        typedict = qdict["types"].get(typename, None)
+        if typedict == None:
+            typedict = qdict["types"][typename] = {"puts": 0, "gets": 0}
+        return typedict
+
+    def stamp(self, cmd):
+        """
+        Horodate cmd avant son empilement (sans effet sur un objet n'acceptant pas
+        de nouvel attribut).
+        """
+        try:
+            cmd.enqueue_time = time.perf_counter()
+        except (AttributeError, TypeError):
+            pass
+
+    def log_put(self, keycode, cmd, depth):
+        """
+        Commande empilée.
+
+        Args:
+            keycode (str)
+            cmd (object)
+            depth (int): profondeur de la Queue après empilement (None si elle
+                n'est pas mesurable)
+        """
+        alert = False
+        with self._lock:
+            qdict = self._get_queue(keycode)
+            qdict["puts"] += 1
+            self._get_type_counts(qdict, cmd)["puts"] += 1
+            if depth != None and depth > qdict["max_depth"]:
+                qdict["max_depth"] = depth
+            threshold = self.depth_threshold
+            if threshold != None and depth != None:
+                if not qdict["backed_up"] and depth >= threshold:
+                    qdict["backed_up"] = True
+                    qdict["alerts"] += 1
+                    alert = True
+        if alert:
+            self._raise_alert(keycode, QueueMetrics.ALERT_DEPTH, depth, threshold)
+
+    def log_get(self, keycode, cmd, depth):
+        """
+        Commande dépilée.
+
+        Args:
+            keycode (str)
+            cmd (object)
+            depth (int): profondeur de la Queue après dépilement
+        """
+        latency = None
+        enqueue_time = getattr(cmd, "enqueue_time", None)
+        if enqueue_time != None:
+            latency = time.perf_counter() - enqueue_time
+        alert = False
+        with self._lock:
+            qdict = self._get_queue(keycode)
+            qdict["gets"] += 1
+            self._get_type_counts(qdict, cmd)["gets"] += 1
+            if latency != None:
+                qdict["latency"].observe(latency)
+                threshold = self.latency_threshold
+                if threshold != None:
+                    if not qdict["lagging"] and latency > threshold:
+                        qdict["lagging"] = True
+                        qdict["alerts"] += 1
+                        alert = True
+                    elif qdict["lagging"] and latency <= threshold / 2:
+                        qdict["lagging"] = False
+            if qdict["backed_up"] and self.depth_threshold != None:
+                if depth <= self.depth_threshold // 2:
+                    qdict["backed_up"] = False
+        if alert:
+            self._raise_alert(keycode, QueueMetrics.ALERT_LATENCY, latency, threshold)
+
+    def reset(self):
+        """
+        Efface les métriques.
+        """
+        with self._lock:
+            self._queues = dict()
+            self._alerts.clear()
+            self._prev_counts = None
+            self._prev_time = None
+            self.start_time = time.time()
+
+    #-----> Exports
+    def get_snapshot(self):
+        """
+        Retourne l'état courant des métriques sous forme de dict sérialisable.
+
+        Returns:
+            dict: {"time", "uptime", "interval", "queues", "alerts"}
+        """
+        now = time.time()
+        depths = dict()
+        if self.queuesizehandler != None and callable(self.queuesizehandler):
+            depths = self.queuesizehandler()
+        queues = dict()
+        counts = dict()
+        with self._lock:
+            interval = None
+            if self._prev_time != None:
+                interval = now - self._prev_time
+            prev_counts = self._prev_counts
+            if prev_counts == None:
+                prev_counts = dict()
+            keycodes = set(self._queues.keys()) | set(depths.keys())
+            for keycode in keycodes:
+                qdict = self._get_queue(keycode)
+                depth, coalesced = depths.get(keycode, (None, None))
+                qout = {
+                    "depth": depth,
+                    "max_depth": qdict["max_depth"],
+                    "coalesced": coalesced,
+                    "puts": qdict["puts"],
+                    "gets": qdict["gets"],
+                    "puts_per_s": None,
+                    "gets_per_s": None,
+                    "backed_up": qdict["backed_up"],
+                    "lagging": qdict["lagging"],
+                    "alerts": qdict["alerts"],
+                    "latency": qdict["latency"].to_dict(),
+                    "types": dict(),
+                }
+                prevq = prev_counts.get(keycode, {"puts": 0, "gets": 0, "types": {}})
+                counts[keycode] = {
+                    "puts": qdict["puts"],
+                    "gets": qdict["gets"],
+                    "types": dict(),
+                }
+                for typename, typedict in qdict["types"].items():
+                    typeout = dict(typedict)
+                    prevt = prevq["types"].get(typename, {"puts": 0, "gets": 0})
+                    typeout["gets_per_s"] = self._get_rate(
+                        typedict["gets"], prevt["gets"], interval
+                    )
+                    qout["types"][typename] = typeout
+                    counts[keycode]["types"][typename] = dict(typedict)
+                qout["puts_per_s"] = self._get_rate(
+                    qdict["puts"], prevq["puts"], interval
+                )
+                qout["gets_per_s"] = self._get_rate(
+                    qdict["gets"], prevq["gets"], interval
+                )
+                queues[keycode] = qout
+            alerts = list(self._alerts)
+            self._prev_counts = counts
+            self._prev_time = now
+        return {
+            "time": now,
+            "uptime": now - self.start_time,
+            "interval": interval,
+            "queues": queues,
+            "alerts": alerts,
+        }
+
+    def _get_rate(cls, count, prevcount, interval):
+        """
+        Débit (par seconde) entre deux snapshots ou None.
+        """
+        if interval == None or interval <= 0:
+            return None
+        return (count - prevcount) / interval
+
+    _get_rate = classmethod(_get_rate)
+
+    def to_json(self):
+        """
+        Snapshot au format JSON.
+
+        Returns:
+            str
+        """
+        return json.dumps(self.get_snapshot(), indent=2)
+
+    def write_snapshot(self, path, snapshot=None):
+        """
+        Ecrit le snapshot JSON dans le fichier path (écriture atomique via un
+        fichier temporaire).
+
+        Args:
+            path (str): chemin du fichier
+            snapshot (dict): snapshot à écrire (None : snapshot courant)
+        """
+        if snapshot == None:
+            snapshot = self.get_snapshot()
+        write_atomic(path, json.dumps(snapshot, indent=2))
+
+    #-----> Export périodique
+    def start_periodic_export(self, path=None, interval=10, handler=None):
+        """
+        Lance un snapshot périodique dans un thread dédié.
+
+        Args:
+            path (str): fichier JSON réécrit à chaque snapshot ou None
+            interval (float): période en secondes
+            handler (function): appelée avec chaque snapshot (dict) ou None
+        """
+        self._exporter.start(
+            interval,
+            self.get_snapshot,
+            path=path,
+            formatter=lambda snapshot: json.dumps(snapshot, indent=2),
+            handler=handler,
+        )
+
+    def stop_periodic_export(self):
+        """
+        Arrête l'export périodique éventuel.
+        """
+        self._exporter.stop()
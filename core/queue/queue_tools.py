@@ -3,17 +3,109 @@
 """
 **Système de gestion de tâches (Queue) pour des applications multi-threads.**
 
-Todo:
-    A dériver pour des applications multi process (en supportant ProcessQueue)
+Les Queues distribuées par **QueueManager** sont des **LaneQueue** : files FIFO 
+réparties en voies de priorité, avec fusion optionnelle des commandes portant 
+la même clef de coalescence. Les commandes sont qualifiées par leurs attributs 
+optionnels `priority` et `coalesce_key` (FIFO de priorité normale par défaut).
+
+**Backend multi process** : une Queue locale peut être reliée à une 
+multiprocessing.Queue (voir `QueueManager.export_queue` et 
+`QueueManager.import_queue`). Chaque process conserve son propre QueueManager, 
+les commandes traversant la frontière sous forme sérialisée (pickle). Une 
+commande peut fournir une forme explicite via une méthode `to_transport` 
+retournant un tuple (classe, état), la classe implémentant la méthode de 
+classe `from_transport(state)`. L'API de QueueSimpleClient et QueueSwitcher 
+est inchangée.
+
+**Télémétrie** : optionnelle (voir `QueueManager.enable_metrics` et 
+:doc:`labpyproject.core.queue.queue_metrics`), latences d'attente, profondeurs et 
+débits par keycode. Pour une Queue exportée, le process émetteur enregistre les 
+empilements et la profondeur de la Queue inter process, les dépilements et 
+latences étant mesurés par le process destinataire (Queue locale importée).
 """
 # imports :
 import queue
+import collections
+import pickle
+import threading
 import labpyproject.core.patterns.design_patterns as dp
 from queue import Queue
+from labpyproject.core.queue.queue_metrics import QueueMetrics
 
 # Evite l'ajout non désiré de certains imports à la doc sphinx
-__all__ = ["QueueManager", "QueueSimpleClient", "QueueSwitcher"]
+__all__ = ["LaneQueue", "QueueManager", "QueueSimpleClient", "QueueSwitcher"]
 # classes :
+class LaneQueue(Queue):
+    """
+    Queue à voies de priorité et coalescence optionnelle.
+    
+    * une voie FIFO par niveau de priorité (attribut `priority` de la commande,
+      LaneQueue.PRIORITY_NORMAL par défaut), dépilées de la plus prioritaire à la 
+      moins prioritaire.
+    * anti famine : après LaneQueue.MAX_PRIORITY_BURST commandes consécutives 
+      dépilées alors qu'une voie moins prioritaire est en attente, une commande 
+      de celle-ci est servie.
+    * coalescence : une commande dont l'attribut `coalesce_key` n'est pas None 
+      remplace, à sa place dans la file, la commande en attente de même clef.
+    
+    L'ordre FIFO n'est garanti qu'au sein d'une voie : des commandes dépendantes
+    les unes des autres (flux d'un même émetteur) doivent partager la même 
+    priorité, seules des commandes indépendantes pouvant se doubler.
+    """
+
+    # statique :
+    PRIORITY_HIGH = 0  #: voie prioritaire (commandes utilisateur...)
+    PRIORITY_NORMAL = 1  #: voie par défaut
+    PRIORITY_LOW = 2  #: voie des mises à jour d'affichage, d'état...
+    LANES_COUNT = 3  #: nombre de voies
+    MAX_PRIORITY_BURST = 32  #: nombre max de commandes dépilées avant anti famine
+    # méthodes (surcharge des méthodes internes de Queue, appelées sous verrou)
+    def _init(self, maxsize):
+        self._lanes = [collections.deque() for i in range(LaneQueue.LANES_COUNT)]
+        # entrées en attente par clef de coalescence :
+        self._coalescedict = dict()
+        # nombre de commandes dépilées consécutivement au détriment d'autres voies :
+        self._burst = 0
+        # nombre de commandes fusionnées :
+        self.coalesced_count = 0
+
+    def _qsize(self):
+        return sum([len(lane) for lane in self._lanes])
+
+    def _put(self, item):
+        key = getattr(item, "coalesce_key", None)
+        if key != None and key in self._coalescedict.keys():
+            # remplace la commande en attente sans changer sa position :
+            self._coalescedict[key][1] = item
+            self.coalesced_count += 1
+            # Rq : Queue.put incrémente unfinished_tasks après cet appel
+            self.unfinished_tasks -= 1
+            return
+        priority = getattr(item, "priority", LaneQueue.PRIORITY_NORMAL)
+        if priority not in range(0, LaneQueue.LANES_COUNT):
+            priority = LaneQueue.PRIORITY_NORMAL
+        entry = [key, item]
+        self._lanes[priority].append(entry)
+        if key != None:
+            self._coalescedict[key] = entry
+
+    def _get(self):
+        pending = [i for i in range(0, LaneQueue.LANES_COUNT) if self._lanes[i]]
+        index = pending[0]
+        if len(pending) > 1:
+            self._burst += 1
+            if self._burst > LaneQueue.MAX_PRIORITY_BURST:
+                # anti famine : voie suivante
+                index = pending[1]
+                self._burst = 0
+        else:
+            self._burst = 0
+        key, item = self._lanes[index].popleft()
+        if key != None:
+            del self._coalescedict[key]
+        return item
+
+
 class QueueManager(metaclass=dp.Singleton):
     """
     Gestionnaire de Queue partagé dans toute l'application. 
@@ -26,6 +118,50 @@ class QueueManager(metaclass=dp.Singleton):
         Constructeur
         """
         self._queuedict = {}
+        # événements à signaler lors d'un ajout de commande, par keycode :
+        self._listenersdict = {}
+        # backend multi process : multiprocessing.Queue de sortie par keycode
+        self._exportdict = {}
+        # télémétrie (None : désactivée)
+        self._metrics = None
+
+    def add_listener(self, keycode, event):
+        """
+        Enregistre un événement (threading.Event) signalé à chaque ajout de commande
+        dans la Queue de code keycode (permet à un thread de se bloquer en attente
+        de tâches plutôt que de scruter la Queue).
+        
+        Args:
+            keycode (str)
+            event (threading.Event)
+        """
+        listeners = self._listenersdict.setdefault(keycode, list())
+        if event not in listeners:
+            listeners.append(event)
+
+    def remove_listener(self, keycode, event):
+        """
+        Supprime un événement enregistré via add_listener.
+        
+        Args:
+            keycode (str)
+            event (threading.Event)
+        """
+        listeners = self._listenersdict.get(keycode, list())
+        if event in listeners:
+            listeners.remove(event)
+
+    def has_cmd(self, keycode):
+        """
+        Indique si la Queue de code keycode contient (approximativement) des commandes.
+        
+        Args:
+            keycode (str)
+        
+        Returns:
+            boolean
+        """
+        return not self.get_queue(keycode).empty()
 
     def get_queue(self, keycode):
         """
@@ -38,7 +174,7 @@ class QueueManager(metaclass=dp.Singleton):
         try:
             q = self._queuedict[keycode]
         except KeyError:
-            q = self._queuedict[keycode] = Queue()
+            q = self._queuedict[keycode] = LaneQueue()
         return q
 
     def get(self, keycode, wait=False):
@@ -67,6 +203,8 @@ class QueueManager(metaclass=dp.Singleton):
                 pass
             else:
                 q.task_done()
+                if self._metrics != None:
+                    self._metrics.log_get(keycode, cmd, q.qsize())
         return cmd
 
     def put(self, cmd, keycode, wait=False):
@@ -76,10 +214,24 @@ class QueueManager(metaclass=dp.Singleton):
         Args:
             keycode (str)
             wait (boolean)
+        
+        Raises:
+            TypeError: commande non sérialisable à destination d'une Queue 
+                exportée (voir export_queue)
         """
         done = False
         if cmd != None:
+            if keycode in self._exportdict.keys():
+                # Queue déportée dans un autre process :
+                done = self._put_in_process_queue(cmd, keycode)
+                if self._metrics != None:
+                    depth = self._get_process_queue_size(keycode)
+                    self._metrics.log_put(keycode, cmd, depth)
+                return done
             q = self.get_queue(keycode)
+            metrics = self._metrics
+            if metrics != None:
+                metrics.stamp(cmd)
             try:
                 if wait:
                     q.put(cmd)
@@ -90,8 +242,176 @@ class QueueManager(metaclass=dp.Singleton):
                 pass
             else:
                 done = True
+                if metrics != None:
+                    metrics.log_put(keycode, cmd, q.qsize())
+                # réveil des threads en attente :
+                for event in self._listenersdict.get(keycode, ()):
+                    event.set()
         return done
 
+    #-----> Télémétrie
+    def enable_metrics(self, enabled=True):
+        """
+        Active ou désactive la télémétrie des Queues.
+        
+        Args:
+            enabled (boolean)
+        
+        Returns:
+            QueueMetrics or None: le registre actif (métriques conservées jusqu'à
+            la désactivation)
+        """
+        if enabled and self._metrics == None:
+            self._metrics = QueueMetrics(queuesizehandler=self.get_queues_state)
+        elif not enabled and self._metrics != None:
+            self._metrics.stop_periodic_export()
+            self._metrics = None
+        return self._metrics
+
+    def get_metrics(self):
+        """
+        Retourne le registre QueueMetrics actif ou None.
+        """
+        return self._metrics
+
+    def get_queues_state(self):
+        """
+        Etat courant des Queues locales et exportées.
+        
+        Returns:
+            dict: {keycode: (profondeur, nombre de commandes fusionnées)}, 
+            profondeur et fusions valant None s'ils ne sont pas mesurables
+        """
+        states = dict()
+        for keycode, q in list(self._queuedict.items()):
+            states[keycode] = (q.qsize(), q.coalesced_count)
+        for keycode in list(self._exportdict.keys()):
+            states[keycode] = (self._get_process_queue_size(keycode), None)
+        return states
+
+    #-----> Backend multi process
+    def export_queue(self, keycode, processqueue):
+        """
+        Redirige les commandes empilées sous keycode vers une Queue inter process
+        (lue dans l'autre process via import_queue).
+        
+        Args:
+            keycode (str)
+            processqueue (multiprocessing.Queue)
+        """
+        self._exportdict[keycode] = processqueue
+
+    def import_queue(self, keycode, processqueue):
+        """
+        Lance un thread (daemon) transférant les commandes reçues via une Queue 
+        inter process dans la Queue locale de code keycode (les threads en attente
+        sont réveillés comme pour un ajout local).
+        
+        Args:
+            keycode (str)
+            processqueue (multiprocessing.Queue)
+        
+        Returns:
+            Thread: le thread de transfert
+        """
+        pump = threading.Thread(
+            name="QueuePump_" + str(keycode),
+            target=self._pump_process_queue,
+            args=(keycode, processqueue),
+        )
+        pump.daemon = True
+        pump.start()
+        return pump
+
+    def release_queue(self, keycode):
+        """
+        Met fin à l'export de keycode, le thread de transfert distant est stoppé.
+        
+        Args:
+            keycode (str)
+        """
+        processqueue = self._exportdict.pop(keycode, None)
+        if processqueue != None:
+            processqueue.put(None)
+
+    def is_queue_exported(self, keycode):
+        """
+        Indique si les commandes de code keycode sont déportées dans un autre process.
+        
+        Args:
+            keycode (str)
+        
+        Returns:
+            boolean
+        """
+        return keycode in self._exportdict.keys()
+
+    def _put_in_process_queue(self, cmd, keycode):
+        """
+        Sérialise cmd et l'envoie dans la Queue inter process associée à keycode.
+        
+        Returns:
+            boolean: True
+        
+        Raises:
+            TypeError: si la commande n'est pas sérialisable (fonction locale...)
+        """
+        to_transport = getattr(cmd, "to_transport", None)
+        if callable(to_transport):
+            payload = to_transport()
+        else:
+            payload = (None, cmd)
+        try:
+            # Rq : sérialisation synchrone, multiprocessing.Queue.put masquant les
+            # erreurs de pickle dans son thread d'envoi
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            raise TypeError(
+                "Commande non sérialisable pour la Queue exportée "
+                + str(keycode)
+                + " : "
+                + type(cmd).__name__
+                + " ("
+                + str(error)
+                + ")"
+            ) from error
+        self._exportdict[keycode].put(data)
+        return True
+
+    def _get_process_queue_size(self, keycode):
+        """
+        Profondeur approximative de la Queue inter process associée à keycode 
+        (commandes pas encore transférées par le process distant), None si 
+        elle n'est pas mesurable.
+        """
+        processqueue = self._exportdict.get(keycode, None)
+        if processqueue == None:
+            return None
+        try:
+            return processqueue.qsize()
+        except NotImplementedError:
+            # sem_getvalue non implémenté (macOS)
+            return None
+
+    def _pump_process_queue(self, keycode, processqueue):
+        """
+        Boucle du thread de transfert lancé par import_queue (stoppée par None).
+        """
+        while True:
+            try:
+                data = processqueue.get()
+            except (EOFError, OSError):
+                # process distant clôturé
+                break
+            if data == None:
+                break
+            cls, state = pickle.loads(data)
+            if cls != None:
+                cmd = cls.from_transport(state)
+            else:
+                cmd = state
+            self.put(cmd, keycode)
+
 
 class QueueSimpleClient:
     """
@@ -144,6 +464,41 @@ class QueueSimpleClient:
             done = self._QueueMngr.put(cmd, self._keycode_out)
             return done
 
+    def has_pending_cmd(self):
+        """
+        Indique si des commandes sont en attente dans la queue entrante.
+        
+        Returns:
+            boolean
+        """
+        if self._queueactive:
+            return self._QueueMngr.has_cmd(self._keycode_in)
+        return False
+
+    def add_queue_listener(self, event):
+        """
+        Enregistre un événement signalé à chaque ajout de commande dans la queue
+        entrante.
+        
+        Args:
+            event (threading.Event)
+        """
+        if self._queueactive:
+            self._QueueMngr.add_listener(self._keycode_in, event)
+
+    def get_queues_size(self):
+        """
+        Retourne le nombre approximatif de tâches en attente dans les deux queues.
+        
+        Returns:
+            dict: {keycode_in: int, keycode_out: int} (vide si les queues sont inactives)
+        """
+        sizes = dict()
+        if self._queueactive:
+            for keycode in [self._keycode_in, self._keycode_out]:
+                sizes[keycode] = self._QueueMngr.get_queue(keycode).qsize()
+        return sizes
+
 
 class QueueSwitcher:
     """
@@ -164,6 +519,29 @@ class QueueSwitcher:
         for cht in queueswitchlist:
             self._channeldict[cht[0]] = {"in": cht[1], "out": cht[2]}
 
+    def has_pending_queuecmd(self):
+        """
+        Indique si des commandes sont en attente dans l'une des queues in des canaux.
+        
+        Returns:
+            boolean
+        """
+        for chdict in self._channeldict.values():
+            if self._QueueMngr.has_cmd(chdict["in"]):
+                return True
+        return False
+
+    def add_queue_listener(self, event):
+        """
+        Enregistre un événement signalé à chaque ajout de commande dans l'une des
+        queues in des canaux.
+        
+        Args:
+            event (threading.Event)
+        """
+        for chdict in self._channeldict.values():
+            self._QueueMngr.add_listener(chdict["in"], event)
+
     def get_queuecmd_from_channel(self, channelname):
         """
         Dépile une cmd de la queue in du canal de nom channelname ou retourne None.
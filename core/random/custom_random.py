@@ -3,6 +3,9 @@
 """
 Centralisation des choix (pseudos) aléatoires dans un helper statique. 
 Privilégie l'usage de secrets à celui de random.
+
+Pour des tirages reproductibles (benchmarks, tests), `CustomRandom.seed` bascule
+l'ensemble des fonctions sur un générateur random.Random initialisé.
 """
 # imports
 import secrets
@@ -16,6 +19,24 @@ class CustomRandom:
     Helper statique centralisant les fonctions aléatoires
     """
 
+    # générateur reproductible (None : secrets / random)
+    _RNG = None
+
+    def seed(cls, value):
+        """
+        Rend les tirages reproductibles (value non None) ou rétablit le mode par
+        défaut (value = None).
+        
+        Args:
+            value (int or None): graine
+        """
+        if value == None:
+            cls._RNG = None
+        else:
+            cls._RNG = random.Random(value)
+
+    seed = classmethod(seed)
+
     def choice(cls, l):
         """
         Retourne un élément choisit aléatoirement dans la liste l.
@@ -28,6 +49,8 @@ class CustomRandom:
         """
         if isinstance(l, set):
             l = list(l)
+        if cls._RNG != None:
+            return cls._RNG.choice(l)
         return secrets.choice(l)
 
     choice = classmethod(choice)
@@ -42,6 +65,8 @@ class CustomRandom:
         Returns:
             int
         """
+        if cls._RNG != None:
+            return cls._RNG.randrange(a, b)
         return secrets.choice(range(a, b))
 
     randrange = classmethod(randrange)
@@ -57,6 +82,8 @@ class CustomRandom:
         Returns:
             list
         """
+        if cls._RNG != None:
+            return cls._RNG.sample(l, k)
         return random.sample(l, k)
 
     sample = classmethod(sample)
@@ -73,6 +100,8 @@ class CustomRandom:
         """
         if isinstance(l, set):
             l = list(l)
+        if cls._RNG != None:
+            return cls._RNG.shuffle(l)
         return random.shuffle(l)
 
     shuffle = classmethod(shuffle)